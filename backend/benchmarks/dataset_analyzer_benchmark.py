@@ -0,0 +1,66 @@
+"""
+Files per second of the dataset builders' two analyzers on the same corpus:
+"full" (MidiService: fluidsynth + librosa tempo + music21) and "dataset"
+(MidiDatasetService: note arrays + MIDI tempo map).
+
+Also reports how often both analyzers agree on each column.
+
+Usage (from backend/):
+    python -m benchmarks.dataset_analyzer_benchmark --source ./midi_raw_files [--limit 200]
+"""
+import argparse
+import glob
+import os
+import time
+import numpy as np
+from src.services.XMIDIService import process_xmidi_file, parse_xmidi_filename
+from src.utils.MidiUtil import forte_class_table
+
+def run(paths: list, analyzer: str) -> tuple[dict, float]:
+    rows = {}
+    start = time.perf_counter()
+
+    for path in paths:
+        fname, row, _ = process_xmidi_file(path, analyzer=analyzer)
+        if row is not None:
+            rows[fname] = row
+
+    return rows, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default="./midi_raw_files")
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.source, "*.mid")) + glob.glob(os.path.join(args.source, "*.midi")))
+    paths = [p for p in paths if parse_xmidi_filename(os.path.basename(p))][:args.limit]
+
+    if not paths:
+        raise FileNotFoundError(f"No XMIDI files found in {args.source}")
+
+    # table build is a one-off, keep it out of the timing
+    forte_class_table()
+
+    full_rows, full_time = run(paths, "full")
+    dataset_rows, dataset_time = run(paths, "dataset")
+
+    print(f"📂 {len(paths)} files")
+    print(f"   full:    {full_time:8.2f} s  ({len(paths) / full_time:8.2f} files/s)")
+    print(f"   dataset: {dataset_time:8.2f} s  ({len(paths) / dataset_time:8.2f} files/s)")
+    print(f"   speedup: {full_time / dataset_time:8.1f}x")
+
+    common = sorted(set(full_rows) & set(dataset_rows))
+    if not common:
+        return
+
+    print(f"\n🔍 Agreement on {len(common)} files:")
+    for column in ("chord_sequence", "num_chords", "key", "tonic", "mode"):
+        same = sum(full_rows[f][column] == dataset_rows[f][column] for f in common)
+        print(f"   {column:<15} {same / len(common) * 100:6.2f}%")
+
+    bpm_diff = np.array([abs(full_rows[f]["bpm"] - dataset_rows[f]["bpm"]) for f in common])
+    print(f"   bpm             mean |diff| {bpm_diff.mean():.2f} (estimated vs tempo map)")
+
+if __name__ == "__main__":
+    main()
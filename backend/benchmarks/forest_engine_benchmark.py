@@ -0,0 +1,123 @@
+"""
+Serving cost of the random forest: the sklearn RandomForestClassifier vs
+its flattened FlatForest export (ForestUtil). Reports artifact size, load
+time and memory, single-row and batch latency, and how closely the
+probabilities agree.
+
+Runs on a forest fitted on synthetic LDA-like topic vectors, or on the
+published full RF when --model is given (its features are computed from
+--dataset, the full test set by default).
+
+Usage (from backend/):
+    python -m benchmarks.forest_engine_benchmark [--trees 300] [--rows 20000] [--topics 30]
+    python -m benchmarks.forest_engine_benchmark --model [--dataset src/final-dataset/full_test_dataset.parquet]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from src.utils.ForestUtil import FlatForest
+
+def synthetic_forest(trees: int, rows: int, topics: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    X = rng.dirichlet(np.full(topics, 0.3), size=rows)
+    y = np.argmax(X[:, :4] + rng.normal(0, 0.15, size=(rows, 4)), axis=1)
+
+    forest = RandomForestClassifier(n_estimators=trees, random_state=seed, n_jobs=-1).fit(X, y)
+    return forest, rng.dirichlet(np.full(topics, 0.3), size=2000)
+
+def published_forest(dataset_path: str) -> tuple:
+    import pandas as pd
+    from src.services.RFTrainingService import RFTrainingService, RF_FULL_MODEL_NAME, RF_FULL_PATH
+
+    service = RFTrainingService()
+    pipeline, version = service.registry.load(RF_FULL_MODEL_NAME, legacy_path=RF_FULL_PATH)
+    df = pd.read_parquet(dataset_path, columns=["chord_sequence", "mode"])
+    texts = (df["chord_sequence"].astype(str) + " | " + df["mode"].astype(str)).tolist()
+
+    print(f"📦 {RF_FULL_MODEL_NAME}@{version}, features of {len(texts)} rows")
+    X = service.feature_cache.transform(pipeline.steps[:-1], texts)
+    return pipeline.steps[-1][1], np.asarray(X.toarray() if hasattr(X, "toarray") else X)
+
+def load_cost(path: str) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    joblib.load(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+def single_row_latency(model, X: np.ndarray, calls: int) -> np.ndarray:
+    times = []
+
+    for i in range(calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - start)
+
+    return np.array(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", action="store_true")
+    parser.add_argument("--dataset", default="src/final-dataset/full_test_dataset.parquet")
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--topics", type=int, default=30)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.model:
+        forest, X = published_forest(args.dataset)
+    else:
+        forest, X = synthetic_forest(args.trees, args.rows, args.topics)
+
+    # single-threaded like one serving request
+    forest.set_params(n_jobs=1)
+
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(forest)
+    export_time = time.perf_counter() - start
+
+    node_count = sum(estimator.tree_.node_count for estimator in forest.estimators_)
+    print(f"🌲 {flat.n_estimators} trees, {node_count} nodes, max depth {flat.max_depth}, exported in {export_time:.2f}s")
+
+    with tempfile.TemporaryDirectory() as folder:
+        print("\n💾 Artifact / load:")
+        for label, model in (("sklearn", forest), ("flat", flat)):
+            path = os.path.join(folder, f"{label}.pkl")
+            joblib.dump(model, path)
+            load_time, peak = load_cost(path)
+            print(f"   {label:<8} {os.path.getsize(path) / 1e6:8.1f} MB on disk   load {load_time * 1000:8.1f} ms   peak {peak / 1e6:8.1f} MB")
+
+    print(f"   flat arrays in memory: {flat.nbytes / 1e6:.1f} MB")
+
+    print(f"\n⏱️ Single row ({args.calls} calls):")
+    for label, model in (("sklearn", forest), ("flat", flat)):
+        model.predict_proba(X[:1])
+        times = single_row_latency(model, X, args.calls)
+        print(f"   {label:<8} p50 {np.percentile(times, 50):8.2f} ms   p95 {np.percentile(times, 95):8.2f} ms")
+
+    batch = X[:args.batch]
+    print(f"\n⏱️ Batch of {len(batch)} rows:")
+    results = {}
+    for label, model in (("sklearn", forest), ("flat", flat)):
+        start = time.perf_counter()
+        results[label] = model.predict_proba(batch)
+        elapsed = time.perf_counter() - start
+        print(f"   {label:<8} {elapsed * 1000:8.1f} ms   ({len(batch) / elapsed:10.0f} rows/s)")
+
+    diff = np.abs(results["sklearn"] - results["flat"]).max()
+    agreement = np.mean(np.argmax(results["sklearn"], axis=1) == np.argmax(results["flat"], axis=1))
+    print(f"\n🔍 Max |p_sklearn - p_flat| {diff:.2e}, argmax agreement {agreement * 100:.2f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Peak memory of fitting the 1-5-gram featurizer of the full RF:
+CountVectorizer over strings, TokenNgramVectorizer over token ids and
+HashedNgramVectorizer (HashingUtil) streaming the same ids in chunks, all
+with max_features=24000. Token ids are memory-mapped from a temporary
+store like TokenStoreService does. Every vectorizer runs in its own
+process; reports the peak of traced allocations (numpy included) during
+fit and fit_transform, the growth of the process peak RSS, wall time,
+model size and, on a sample, how many of the exact top n-grams keep a
+hashed column and how far its count is from the exact one.
+
+Usage (from backend/):
+    python -m benchmarks.hashed_vectorizer_benchmark [--rows 200000] [--min-count 2]
+"""
+import argparse
+import os
+import pickle
+import resource
+import tempfile
+import time
+import tracemalloc
+import multiprocessing
+import numpy as np
+
+NGRAM_RANGE = (1, 5)
+MAX_FEATURES = 24000
+
+def synthetic_corpus(rows: int, directory: str):
+    from src.utils.TokenUtil import Vocabulary, TokenSequences
+
+    rng = np.random.default_rng(0)
+    # ~200 Forte class names, a few frequent ones like real progressions
+    forte = [f"{card}-{i}{side}" for card in range(1, 10) for i in range(1, 12) for side in ("A", "B")][:200]
+    weights = rng.zipf(1.6, size=len(forte)).astype(float)
+    weights /= weights.sum()
+
+    vocabulary = Vocabulary(forte + ["major", "minor"])
+    lengths = rng.integers(8, 40, size=rows)
+    chords = rng.choice(len(forte), size=int(lengths.sum()), p=weights) + 1
+    modes = rng.choice([vocabulary.id_of("major"), vocabulary.id_of("minor")], size=rows)
+
+    offsets = np.zeros(rows + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=offsets[1:])
+    tokens = np.empty(offsets[-1], dtype=np.uint16)
+    ends = offsets[1:] - 1
+    chord_positions = np.setdiff1d(np.arange(offsets[-1]), ends)
+    tokens[chord_positions] = chords
+    tokens[ends] = modes
+
+    np.save(os.path.join(directory, "tokens.npy"), tokens)
+    np.save(os.path.join(directory, "offsets.npy"), offsets)
+    vocabulary.save(os.path.join(directory, "vocabulary.json"))
+
+    with open(os.path.join(directory, "texts.txt"), "w", encoding="utf-8") as f:
+        for row in TokenSequences(tokens, offsets, vocabulary):
+            names = vocabulary.decode(row)
+            f.write(",".join(names[:-1]) + " | " + names[-1] + "\n")
+
+def load_input(kind: str, directory: str):
+    from src.utils.TokenUtil import Vocabulary, TokenSequences
+
+    if kind == "count":
+        with open(os.path.join(directory, "texts.txt"), encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+
+    return TokenSequences(
+        np.load(os.path.join(directory, "tokens.npy"), mmap_mode="r"),
+        np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r"),
+        Vocabulary.load(os.path.join(directory, "vocabulary.json"))
+    )
+
+def build(kind: str, min_count: int):
+    from sklearn.feature_extraction.text import CountVectorizer
+    from src.utils.TokenUtil import TokenNgramVectorizer, TOKEN_PATTERN
+    from src.utils.HashingUtil import HashedNgramVectorizer
+
+    if kind == "count":
+        return CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False, ngram_range=NGRAM_RANGE, max_features=MAX_FEATURES)
+    if kind == "token":
+        return TokenNgramVectorizer(ngram_range=NGRAM_RANGE, max_features=MAX_FEATURES)
+
+    return HashedNgramVectorizer(ngram_range=NGRAM_RANGE, max_features=MAX_FEATURES, min_count=min_count)
+
+def measure(kind: str, directory: str, min_count: int, queue):
+    X = load_input(kind, directory)
+    result = {"kind": kind}
+
+    for phase in ("fit", "fit_transform"):
+        vectorizer = build(kind, min_count)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        output = getattr(vectorizer, phase)(X)
+        result[f"{phase}_seconds"] = time.perf_counter() - start
+        result[f"{phase}_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        result[f"{phase}_rss_growth_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1e3
+
+    result["columns"] = output.shape[1]
+    result["nnz"] = int(output.nnz)
+    result["model_mb"] = len(pickle.dumps(vectorizer)) / 1e6
+
+    queue.put(result)
+
+def compare_columns(directory: str, rows: int, min_count: int) -> dict:
+    """
+    Share of the exact top n-grams (TokenNgramVectorizer) that have a
+    hashed column, and the relative error of that column's total count.
+    """
+    from src.utils.HashingUtil import token_hash
+    from src.utils.TimelineUtil import ngram_columns
+
+    X = load_input("token", directory)
+    X = X.take(np.arange(min(rows, len(X))))
+
+    exact = build("token", min_count)
+    exact_totals = np.asarray(exact.fit_transform(X).sum(axis=0)).ravel()
+    hashed = build("hashed", min_count)
+    hashed_totals = np.asarray(hashed.fit_transform(X).sum(axis=0)).ravel()
+
+    grams = [tuple(token_hash(t) for t in name.split(" ")) for name in exact.get_feature_names_out()]
+    columns = ngram_columns(hashed, grams)
+    found = columns >= 0
+    errors = np.abs(hashed_totals[columns[found]] - exact_totals[found]) / exact_totals[found]
+
+    return {
+        "rows": len(X),
+        "coverage": float(found.mean()),
+        "median_error": float(np.median(errors)),
+        "p95_error": float(np.percentile(errors, 95))
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--kinds", default="count,token,hashed")
+    parser.add_argument("--compare-rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic_corpus(args.rows, directory)
+        tokens = np.load(os.path.join(directory, "tokens.npy"), mmap_mode="r")
+        print(f"📂 {args.rows} rows, {len(tokens)} tokens ({tokens.nbytes / 1e6:.0f} MB of ids on disk)")
+
+        results = {}
+        for kind in args.kinds.split(","):
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(kind, directory, args.min_count, queue))
+            process.start()
+            results[kind] = queue.get()
+            process.join()
+
+        comparison = compare_columns(directory, args.compare_rows, args.min_count)
+
+    print(f"   {'vectorizer':>10} {'fit MB':>8} {'fit RSS+':>9} {'fit s':>7} {'fit_transform MB':>17} {'RSS+':>7} {'s':>7} {'model MB':>9} {'nnz':>11}")
+    for kind, r in results.items():
+        print(
+            f"   {kind:>10} {r['fit_peak_mb']:8.1f} {r['fit_rss_growth_mb']:9.1f} {r['fit_seconds']:7.2f} "
+            f"{r['fit_transform_peak_mb']:17.1f} {r['fit_transform_rss_growth_mb']:7.1f} {r['fit_transform_seconds']:7.2f} "
+            f"{r['model_mb']:9.2f} {r['nnz']:>11}"
+        )
+
+    print(
+        f"🔁 exact top {MAX_FEATURES} n-grams on {comparison['rows']} rows: {comparison['coverage'] * 100:.1f}% keep a hashed column, "
+        f"count error median {comparison['median_error'] * 100:.2f}% / p95 {comparison['p95_error'] * 100:.2f}%"
+    )
+
+if __name__ == "__main__":
+    main()
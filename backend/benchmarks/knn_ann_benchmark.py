@@ -0,0 +1,114 @@
+"""
+KNN backends of KNNService: the exact KNeighborsClassifier over sparse
+n-gram counts vs the IVF index (AnnUtil) over SVD-reduced, normalized
+vectors. Reports recall@k of the index against the exact brute-force
+neighbours in the same reduced space, query latency for each n_probe,
+index build time, and accuracy / agreement of both classifiers.
+
+Runs on synthetic Forte class progressions, or on the KNN train/test CSVs
+when --train and --test are informed.
+
+Usage (from backend/):
+    python -m benchmarks.knn_ann_benchmark [--train-rows 50000] [--probes 1,4,8,16,32]
+    python -m benchmarks.knn_ann_benchmark --train src/dataset/train_dataset.csv --test src/dataset/test_dataset.csv
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import Normalizer
+from src.utils.AnnUtil import AnnKNeighborsClassifier, brute_force_search
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A",
+                "3-4A", "3-4B", "4-19A", "4-27B", "5-35", "3-8A", "4-18B", "5-Z17"]
+
+def synthetic_split(train_rows: int, test_rows: int) -> tuple:
+    rng = np.random.default_rng(0)
+    styles = rng.dirichlet(np.full(len(FORTE_SAMPLE), 0.15), size=40)
+    style = rng.integers(0, len(styles), size=train_rows + test_rows)
+    X = [",".join(rng.choice(FORTE_SAMPLE, size=rng.integers(4, 24), p=styles[s])) for s in style]
+    y = np.array(["happy", "sad", "angry", "calm"])[style % 4]
+
+    return X[:train_rows], y[:train_rows], X[train_rows:], y[train_rows:]
+
+def csv_split(train_path: str, test_path: str) -> tuple:
+    frames = []
+    for path in (train_path, test_path):
+        df = pd.read_csv(path).dropna(subset=["forteclass_sequence"])
+        df = df[df["forteclass_sequence"].str.len() > 0]
+        frames.append(df)
+
+    return (frames[0]["forteclass_sequence"].tolist(), frames[0]["emotion"].to_numpy(),
+            frames[1]["forteclass_sequence"].tolist(), frames[1]["emotion"].to_numpy())
+
+def per_query_ms(fn, rows) -> np.ndarray:
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+
+    return np.array(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", default=None)
+    parser.add_argument("--test", default=None)
+    parser.add_argument("--train-rows", type=int, default=50000)
+    parser.add_argument("--test-rows", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--components", type=int, default=64)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--probes", default="1,4,8,16,32")
+    args = parser.parse_args()
+
+    if args.train and args.test:
+        X_train, y_train, X_test, y_test = csv_split(args.train, args.test)
+    else:
+        X_train, y_train, X_test, y_test = synthetic_split(args.train_rows, args.test_rows)
+
+    vect = CountVectorizer(token_pattern=r'[^,]+', lowercase=False)
+    counts_train = vect.fit_transform(X_train)
+    counts_test = vect.transform(X_test)
+    print(f"📂 {counts_train.shape[0]} train / {counts_test.shape[0]} test rows, {counts_train.shape[1]} features")
+
+    exact = KNeighborsClassifier(n_neighbors=args.k, weights="distance").fit(counts_train, y_train)
+    exact_pred = exact.predict(counts_test)
+    exact_ms = per_query_ms(lambda i: exact.predict(counts_test[i:i + 1]), range(min(args.queries, counts_test.shape[0])))
+    print(f"🐢 exact sparse KNN: accuracy {np.mean(exact_pred == y_test) * 100:.2f}%, p50 {np.percentile(exact_ms, 50):.2f} ms/query")
+
+    components = min(args.components, counts_train.shape[1] - 1)
+    reducer = [TruncatedSVD(n_components=components, random_state=42), Normalizer()]
+    reduced_train = reducer[1].fit_transform(reducer[0].fit_transform(counts_train)).astype(np.float32)
+    reduced_test = reducer[1].transform(reducer[0].transform(counts_test)).astype(np.float32)
+
+    start = time.perf_counter()
+    ann = AnnKNeighborsClassifier(n_neighbors=args.k, weights="distance").fit(reduced_train, y_train)
+    build_time = time.perf_counter() - start
+
+    queries = reduced_test[:args.queries]
+    _, truth = brute_force_search(reduced_train, queries, args.k)
+    brute_ms = per_query_ms(lambda q: brute_force_search(reduced_train, q[None, :], args.k), queries)
+
+    print(f"🗂️ IVF index: {len(ann.index_.centroids_)} lists, built in {build_time:.2f}s")
+    print(f"   brute force ({components}-dim): p50 {np.percentile(brute_ms, 50):.3f} ms/query")
+    print(f"   {'n_probe':>7} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8} {'accuracy':>9} {'vs exact':>9}")
+
+    for n_probe in (int(p) for p in args.probes.split(",")):
+        ann.set_params(n_probe=n_probe)
+
+        _, found = ann.kneighbors(queries)
+        recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+        times = per_query_ms(lambda q: ann.kneighbors(q[None, :]), queries)
+        pred = ann.predict(reduced_test)
+
+        print(
+            f"   {n_probe:>7} {recall * 100:8.2f}% {np.percentile(times, 50):8.3f} {np.percentile(times, 95):8.3f} "
+            f"{np.mean(pred == y_test) * 100:8.2f}% {np.mean(pred == exact_pred) * 100:8.2f}%"
+        )
+
+if __name__ == "__main__":
+    main()
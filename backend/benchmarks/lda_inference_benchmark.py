@@ -0,0 +1,105 @@
+"""
+Serve-time LDA inference settings (max_doc_update_iter, mean_change_tol,
+see RF_LDA_MAX_DOC_UPDATE_ITER / RF_LDA_MEAN_CHANGE_TOL in
+RandomForestService) vs the training settings: LDA time per row (single
+rows and batch), topic drift and agreement of the forest's predictions
+with the full-precision ones, plus accuracy when labels are known.
+
+Runs on a synthetic vectorizer + LDA + forest pipeline, or on the published
+full RF and its test split with --model.
+
+Usage (from backend/):
+    python -m benchmarks.lda_inference_benchmark [--iters 100,50,20,10,5] [--tols 0.001,0.01,0.05]
+    python -m benchmarks.lda_inference_benchmark --model [--rows 5000]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.base import clone
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from src.utils.ForestUtil import FlatForest
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A"]
+
+def synthetic_setup(rows: int) -> tuple:
+    rng = np.random.default_rng(0)
+    # progressions drawn from a few "styles", so the topics carry the label
+    styles = rng.dirichlet(np.full(len(FORTE_SAMPLE), 0.2), size=8)
+    style = rng.integers(0, len(styles), size=rows + 4000)
+    texts = [
+        ",".join(rng.choice(FORTE_SAMPLE, size=rng.integers(8, 40), p=styles[s])) + " | " + rng.choice(["major", "minor"])
+        for s in style
+    ]
+    y = np.array(["happy", "sad", "angry", "calm"])[style % 4]
+
+    vect = CountVectorizer(token_pattern=r"[0-9A-Za-z\-]+", ngram_range=(1, 3), max_features=5000)
+    counts = vect.fit_transform(texts)
+    lda = LatentDirichletAllocation(n_components=30, max_iter=10, learning_method="online", random_state=0)
+    topics = lda.fit_transform(counts[:4000])
+    forest = RandomForestClassifier(n_estimators=200, max_depth=25, min_samples_leaf=2, random_state=0).fit(topics, y[:4000])
+
+    return counts[4000:], y[4000:], lda, FlatForest.from_sklearn(forest)
+
+def published_setup(rows: int) -> tuple:
+    from src.services.RFTrainingService import (
+        RFTrainingService, RF_FULL_MODEL_NAME, RF_FULL_PATH, FULL_DATASET_TEST_DATASET_PATH
+    )
+
+    service = RFTrainingService()
+    pipeline, version = service.registry.load(RF_FULL_MODEL_NAME, legacy_path=RF_FULL_PATH)
+
+    df = service.storage.read(FULL_DATASET_TEST_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"], tokens="list")
+    df = df.dropna(subset=["forteclass_sequence", "emotion", "mode"]).iloc[:rows]
+    X = service.token_store.model_input(pipeline, FULL_DATASET_TEST_DATASET_PATH, df.index.to_numpy())
+
+    # n-gram counts of the steps before the LDA, from the feature cache when available
+    counts = service.feature_cache.transform(pipeline.steps[:-2], X)
+    print(f"📦 {RF_FULL_MODEL_NAME}@{version}, {counts.shape[0]} test rows")
+
+    return counts, df["emotion"].astype(str).to_numpy(), pipeline.steps[-2][1], FlatForest.from_sklearn(pipeline.steps[-1][1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", action="store_true")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--single", type=int, default=200)
+    parser.add_argument("--iters", default="100,50,20,10,5")
+    parser.add_argument("--tols", default="0.001,0.01,0.05")
+    args = parser.parse_args()
+
+    counts, y, trained_lda, forest = published_setup(args.rows) if args.model else synthetic_setup(args.rows)
+    trained_lda.set_params(n_jobs=1)
+
+    reference_topics = trained_lda.transform(counts)
+    reference = forest.predict(reference_topics)
+
+    print(f"🎛️ training settings: max_doc_update_iter={trained_lda.max_doc_update_iter}, mean_change_tol={trained_lda.mean_change_tol}")
+    print(f"   {'iter':>5} {'tol':>7} {'1 row ms':>9} {'batch ms/row':>13} {'max |dtopic|':>13} {'agreement':>10} {'accuracy':>9}")
+
+    for max_iter in (int(v) for v in args.iters.split(",")):
+        for tol in (float(v) for v in args.tols.split(",")):
+            lda = clone(trained_lda)
+            lda.__dict__.update({k: v for k, v in trained_lda.__dict__.items() if k.endswith("_")})
+            lda.set_params(max_doc_update_iter=max_iter, mean_change_tol=tol, n_jobs=1)
+
+            lda.transform(counts[:1])
+            start = time.perf_counter()
+            for i in range(min(args.single, counts.shape[0])):
+                lda.transform(counts[i:i + 1])
+            single_ms = (time.perf_counter() - start) / min(args.single, counts.shape[0]) * 1000
+
+            start = time.perf_counter()
+            topics = lda.transform(counts)
+            batch_ms = (time.perf_counter() - start) / counts.shape[0] * 1000
+
+            predicted = forest.predict(topics)
+            print(
+                f"   {max_iter:>5} {tol:>7g} {single_ms:9.3f} {batch_ms:13.4f} "
+                f"{np.abs(topics - reference_topics).max():13.4f} {np.mean(predicted == reference) * 100:9.2f}% "
+                f"{np.mean(predicted == y) * 100:8.2f}%"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Throughput and latency of concurrent single-row emotion predictions, each
+caller running its own predict_proba vs callers micro-batched
+(BatchUtil.MicroBatcher, as in RandomForestService.predict_full_ngrams).
+
+Runs on a synthetic vectorizer + LDA + forest pipeline (flattened like the
+served model, --engine sklearn keeps the sklearn forest).
+
+Usage (from backend/):
+    python -m benchmarks.micro_batch_benchmark [--clients 1,8,32] [--requests 40] [--windows 2,5]
+"""
+import argparse
+import threading
+import time
+import numpy as np
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.pipeline import Pipeline
+from src.services.RandomForestService import warm_up, predict_rows
+from src.utils.BatchUtil import MicroBatcher
+from src.utils.ForestUtil import flatten_pipeline
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A"]
+
+def synthetic_texts(rows: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        ",".join(rng.choice(FORTE_SAMPLE, size=rng.integers(8, 40))) + " | " + rng.choice(["major", "minor"]) + " | C"
+        for _ in range(rows)
+    ]
+
+def synthetic_pipeline(trees: int, engine: str) -> Pipeline:
+    texts = synthetic_texts(4000)
+    y = np.random.default_rng(1).choice(["happy", "sad", "angry", "calm"], size=len(texts))
+
+    pipeline = Pipeline([
+        ("vect", CountVectorizer(token_pattern=r"[0-9A-Za-z\-]+", ngram_range=(1, 3), max_features=5000)),
+        ("lda", LatentDirichletAllocation(n_components=30, max_iter=10, learning_method="online", random_state=0)),
+        ("clf", RandomForestClassifier(n_estimators=trees, max_depth=25, min_samples_leaf=2, n_jobs=-1, random_state=0))
+    ]).fit(texts, y)
+
+    return flatten_pipeline(pipeline) if engine == "flat" else pipeline
+
+def run(predict, texts: list, clients: int, requests: int) -> tuple[float, np.ndarray]:
+    latencies = [[] for _ in range(clients)]
+
+    def client(c: int):
+        for r in range(requests):
+            text = texts[(c * requests + r) % len(texts)]
+            start = time.perf_counter()
+            predict(text)
+            latencies[c].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - start, np.concatenate(latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--engine", choices=["flat", "sklearn"], default="flat")
+    parser.add_argument("--clients", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--windows", default="2,5")
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+
+    model = synthetic_pipeline(args.trees, args.engine)
+    warm_up(model)
+    texts = synthetic_texts(1000, seed=2)
+
+    modes = [("unbatched", lambda text: predict_rows([(model, text)])[0])]
+    for window in (float(w) for w in args.windows.split(",")):
+        batcher = MicroBatcher(predict_rows, window, args.max_batch)
+        modes.append((f"batched {window:g}ms", lambda text, b=batcher: b.submit((model, text))))
+
+    print(f"🌲 {args.engine} engine, {args.trees} trees, {args.requests} requests per client")
+
+    for clients in (int(c) for c in args.clients.split(",")):
+        print(f"\n👥 {clients} concurrent clients:")
+        for label, predict in modes:
+            elapsed, latencies = run(predict, texts, clients, args.requests)
+            print(
+                f"   {label:<14} {len(latencies) / elapsed:8.1f} req/s   "
+                f"p50 {np.percentile(latencies, 50):7.2f} ms   p95 {np.percentile(latencies, 95):7.2f} ms"
+            )
+
+if __name__ == "__main__":
+    main()
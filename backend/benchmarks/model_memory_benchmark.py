@@ -0,0 +1,99 @@
+"""
+Memory of N worker processes serving the same model, loaded as private
+copies vs memory-mapped (ModelRegistryService.load(mmap_mode="r")).
+Reports per-worker unique and shared resident memory; with mmap the model
+pages are shared through the page cache.
+
+Runs on a synthetic forest (sklearn and its FlatForest export, published to
+a temporary registry), or on the published model given by --model.
+
+Usage (from backend/):
+    python -m benchmarks.model_memory_benchmark [--workers 4] [--trees 300]
+    python -m benchmarks.model_memory_benchmark --model random_forest_full_flat
+"""
+import argparse
+import multiprocessing
+import tempfile
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from src.services.ModelRegistryService import ModelRegistryService, MODELS_DIR
+from src.utils.ForestUtil import FlatForest
+from src.utils.MemoryUtil import process_memory
+
+def warm_up(model):
+    if hasattr(model, "steps"):
+        model.predict_proba(["3-11,4-20,3-11 | major | C"] * 200)
+    else:
+        rng = np.random.default_rng(0)
+        model.predict_proba(rng.dirichlet(np.full(model.n_features_in_, 0.3), size=2000))
+
+def worker(models_dir: str, name: str, mode: str, ready, stop):
+    if mode != "none":
+        model, _ = ModelRegistryService(models_dir).load(name, mmap_mode="r" if mode == "mmap" else None)
+        warm_up(model)
+
+    ready.put(True)
+    stop.wait()
+
+def synthetic_models(models_dir: str, trees: int, rows: int, topics: int) -> list:
+    rng = np.random.default_rng(0)
+    X = rng.dirichlet(np.full(topics, 0.3), size=rows)
+    y = np.argmax(X[:, :4] + rng.normal(0, 0.15, size=(rows, 4)), axis=1)
+    forest = RandomForestClassifier(n_estimators=trees, random_state=0, n_jobs=-1).fit(X, y)
+
+    registry = ModelRegistryService(models_dir)
+    registry.publish("synthetic_sklearn", forest)
+    registry.publish("synthetic_flat", FlatForest.from_sklearn(forest))
+
+    return ["synthetic_sklearn", "synthetic_flat"]
+
+def measure(models_dir: str, name: str, mode: str, workers: int) -> list:
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    stop = context.Event()
+    processes = [context.Process(target=worker, args=(models_dir, name, mode, ready, stop)) for _ in range(workers)]
+
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    # measured while every worker holds the model
+    report = [process_memory(process.pid) for process in processes]
+
+    stop.set()
+    for process in processes:
+        process.join()
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--topics", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        if args.model:
+            models_dir, names = str(MODELS_DIR), [args.model]
+        else:
+            models_dir, names = folder, synthetic_models(folder, args.trees, args.rows, args.topics)
+
+        baseline = measure(models_dir, names[0], "none", args.workers)
+        print(f"🧮 {args.workers} workers, MB per worker (unique / shared / pss), baseline without model:")
+        print(f"   {'none':<28} {baseline[0]['unique'] / 1e6:8.1f} / {baseline[0]['shared'] / 1e6:8.1f} / {baseline[0]['pss'] / 1e6:8.1f}")
+
+        for name in names:
+            for mode in ("copy", "mmap"):
+                report = measure(models_dir, name, mode, args.workers)
+                unique = np.mean([r["unique"] for r in report]) / 1e6
+                shared = np.mean([r["shared"] for r in report]) / 1e6
+                pss = np.mean([r["pss"] for r in report]) / 1e6
+                total = sum(r["pss"] for r in report) / 1e6
+                print(f"   {name + ' ' + mode:<28} {unique:8.1f} / {shared:8.1f} / {pss:8.1f}   (host total pss {total:8.1f})")
+
+if __name__ == "__main__":
+    main()
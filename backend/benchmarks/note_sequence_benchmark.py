@@ -0,0 +1,106 @@
+"""
+Throughput of MidiService.extract_note_sequence on dense piano MIDI.
+
+Compares the vectorized extractor with the previous per-note
+librosa + music21 implementation and checks both return the same sequence.
+
+Usage (from backend/):
+    python -m benchmarks.note_sequence_benchmark [--midi path.mid] [--notes 20000] [--repeat 5]
+"""
+import argparse
+import time
+import numpy as np
+import pretty_midi
+import librosa
+from music21 import pitch as m21Pitch
+from src.services.MidiService import MidiService
+
+def build_dense_piano_midi(num_notes: int, seconds: float = 120.0, seed: int = 42) -> pretty_midi.PrettyMIDI:
+    rng = np.random.default_rng(seed)
+    midi = pretty_midi.PrettyMIDI()
+    piano = pretty_midi.Instrument(program=0)
+
+    starts = np.round(rng.uniform(0, seconds, num_notes) / 0.01) * 0.01
+    durations = rng.choice([0.03, 0.125, 0.25, 0.5, 1.0], num_notes)
+    pitches = rng.integers(21, 109, num_notes)
+    velocities = rng.integers(20, 127, num_notes)
+
+    for start, duration, note_pitch, velocity in zip(starts, durations, pitches, velocities):
+        piano.notes.append(pretty_midi.Note(int(velocity), int(note_pitch), float(start), float(start + duration)))
+
+    midi.instruments.append(piano)
+    return midi
+
+def legacy_extract_note_sequence(midi_data, valid_range=("E2", "E6"), min_duration: float = 0.05) -> list[str]:
+    low_pitch = m21Pitch.Pitch(valid_range[0]).midi
+    high_pitch = m21Pitch.Pitch(valid_range[1]).midi
+
+    sequence = []
+    last_time = -1
+    last_note = None
+
+    for instrument in midi_data.instruments:
+        if instrument.is_drum:
+            continue
+
+        for note in sorted(instrument.notes, key=lambda n: n.start):
+            note_name = librosa.midi_to_note(note.pitch).replace("♯", "#").replace("♭", "b")
+
+            try:
+                midi_num = m21Pitch.Pitch(note_name).midi
+                if not (low_pitch <= midi_num <= high_pitch):
+                    continue
+            except Exception:
+                continue
+
+            if note.end - note.start < min_duration:
+                continue
+
+            if last_note == note_name and (note.start - last_time) < 0.005:
+                continue
+
+            sequence.append(note_name[:-1])
+            last_note = note_name
+            last_time = note.start
+
+    return sequence
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--midi", help="MIDI file to benchmark (default: synthetic dense piano)")
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.midi:
+        midi_data = pretty_midi.PrettyMIDI(args.midi)
+    else:
+        midi_data = build_dense_piano_midi(args.notes)
+
+    total_notes = sum(len(i.notes) for i in midi_data.instruments if not i.is_drum)
+    midi_service = MidiService(midi_data=midi_data, bpm=120)
+
+    legacy = legacy_extract_note_sequence(midi_data)
+    vectorized = midi_service.extract_note_sequence()
+
+    if legacy != vectorized:
+        raise AssertionError(f"Sequences differ: legacy={len(legacy)} vectorized={len(vectorized)}")
+
+    legacy_time = measure(lambda: legacy_extract_note_sequence(midi_data), args.repeat)
+    vectorized_time = measure(midi_service.extract_note_sequence, args.repeat)
+
+    print(f"🎹 {total_notes:,} notes in, {len(vectorized):,} notes out (identical sequences)")
+    print(f"   legacy:     {legacy_time * 1000:9.2f} ms  ({total_notes / legacy_time:12,.0f} notes/s)")
+    print(f"   vectorized: {vectorized_time * 1000:9.2f} ms  ({total_notes / vectorized_time:12,.0f} notes/s)")
+    print(f"   speedup:    {legacy_time / vectorized_time:9.1f}x")
+
+if __name__ == "__main__":
+    main()
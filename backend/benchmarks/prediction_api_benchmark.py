@@ -0,0 +1,96 @@
+"""
+Cost of the emotion prediction API per model: the former predict +
+predict_proba pair (two passes) vs PredictionUtil.predict_emotions (one
+pass, label derived from the probabilities), for single rows and batches.
+Also checks that the derived labels match predict.
+
+Runs on synthetic Forte class progressions with the pipelines of the NB,
+KNN, SVM and full RF services (the RF one flattened like the served model).
+
+Usage (from backend/):
+    python -m benchmarks.prediction_api_benchmark [--rows 200] [--batch 500] [--trees 300]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+from src.utils.ForestUtil import flatten_pipeline
+from src.utils.PredictionUtil import predict_emotions
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A"]
+EMOTIONS = ["happy", "sad", "angry", "calm"]
+
+def synthetic_sequences(rows: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    return [",".join(rng.choice(FORTE_SAMPLE, size=rng.integers(8, 40))) for _ in range(rows)]
+
+def synthetic_models(trees: int) -> dict:
+    X = synthetic_sequences(4000, seed=0)
+    y = np.random.default_rng(1).choice(EMOTIONS, size=len(X))
+    X_rf = [f"{s} | major" for s in X]
+
+    def vect(**params):
+        return CountVectorizer(token_pattern=r'[^,]+', lowercase=False, **params)
+
+    rf = Pipeline([
+        ("vect", CountVectorizer(token_pattern=r"[0-9A-Za-z\-]+", ngram_range=(1, 3), max_features=5000)),
+        ("lda", LatentDirichletAllocation(n_components=30, max_iter=10, learning_method="online", random_state=0)),
+        ("clf", RandomForestClassifier(n_estimators=trees, max_depth=25, min_samples_leaf=2, random_state=0))
+    ]).fit(X_rf, y)
+
+    return {
+        "NB": (Pipeline([("vect", vect()), ("clf", MultinomialNB(alpha=1.0))]).fit(X, y), False),
+        "KNN": (Pipeline([("vect", vect()), ("clf", KNeighborsClassifier(n_neighbors=5, weights="distance"))]).fit(X, y), False),
+        "SVM": (Pipeline([("vect", vect(max_features=10000)), ("clf", LinearSVC(C=1.0, random_state=42, max_iter=20000))]).fit(X, y), False),
+        "RF": (flatten_pipeline(rf), True)
+    }
+
+def two_pass(model, X):
+    labels = model.predict(X)
+    # LinearSVC has no predict_proba, the services only called predict on it
+    probs = model.predict_proba(X) if hasattr(model, "predict_proba") else None
+    return labels, probs
+
+def timed(fn, calls) -> float:
+    start = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - start) / len(calls) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--trees", type=int, default=300)
+    args = parser.parse_args()
+
+    models = synthetic_models(args.trees)
+    sequences = synthetic_sequences(max(args.rows, args.batch), seed=2)
+
+    print(f"⏱️ ms per call: {args.rows} single-row calls, batches of {args.batch}")
+    print(f"   {'model':<6} {'1 row 2-pass':>13} {'1 row 1-pass':>13} {'batch 2-pass':>13} {'batch 1-pass':>13} {'labels match':>13}")
+
+    for name, (model, with_mode) in models.items():
+        X = [f"{s} | major" for s in sequences] if with_mode else sequences
+        singles = [(model, [x]) for x in X[:args.rows]]
+        batch = [(model, X[:args.batch])]
+
+        two_pass(model, X[:1])
+        single_two = timed(two_pass, singles)
+        single_one = timed(predict_emotions, singles)
+        batch_two = timed(two_pass, batch)
+        batch_one = timed(predict_emotions, batch)
+
+        derived = [r["emotion"] for r in predict_emotions(model, X[:args.batch])]
+        agreement = np.mean(np.asarray(derived) == model.predict(X[:args.batch]))
+
+        print(f"   {name:<6} {single_two:13.2f} {single_one:13.2f} {batch_two:13.1f} {batch_one:13.1f} {agreement * 100:12.2f}%")
+
+if __name__ == "__main__":
+    main()
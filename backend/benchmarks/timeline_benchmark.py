@@ -0,0 +1,108 @@
+"""
+Emotion timeline of one song (RandomForestService.predict_timeline): the
+windows' n-gram counts built incrementally (TimelineUtil) and scored in one
+batched call, vs re-vectorizing and predicting every window on its own, vs a
+single whole-song prediction. Checks that both timelines are identical.
+
+Runs on a synthetic TokenNgramVectorizer + LDA + forest pipeline, or on the
+published full RF with --model.
+
+Usage (from backend/):
+    python -m benchmarks.timeline_benchmark [--chords 64,256,1024] [--window 16] [--step 4]
+    python -m benchmarks.timeline_benchmark --model
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from src.utils.ForestUtil import FlatForest
+from src.utils.PredictionUtil import class_probabilities
+from src.utils.TimelineUtil import sliding_ngram_counts
+from src.utils.TokenUtil import TokenNgramVectorizer
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A"]
+
+def synthetic_pipeline() -> Pipeline:
+    rng = np.random.default_rng(0)
+    styles = rng.dirichlet(np.full(len(FORTE_SAMPLE), 0.2), size=8)
+    style = rng.integers(0, len(styles), size=4000)
+    texts = [
+        ",".join(rng.choice(FORTE_SAMPLE, size=rng.integers(8, 40), p=styles[s]))
+        + " | " + rng.choice(["major", "minor"]) + " | " + rng.choice(["C", "D", "G"])
+        for s in style
+    ]
+    y = np.array(["happy", "sad", "angry", "calm"])[style % 4]
+
+    pipeline = Pipeline([
+        ("vect", TokenNgramVectorizer(ngram_range=(1, 5), max_features=24000)),
+        ("lda", LatentDirichletAllocation(n_components=30, max_iter=10, learning_method="online", random_state=0, n_jobs=1)),
+        ("clf", RandomForestClassifier(n_estimators=200, max_depth=25, min_samples_leaf=2, random_state=0))
+    ]).fit(texts, y)
+    pipeline.steps[-1] = ("clf", FlatForest.from_sklearn(pipeline.steps[-1][1]))
+
+    return pipeline
+
+def published_pipeline() -> Pipeline:
+    from src.services.RandomForestService import full_model
+
+    pipeline, version = full_model().get()
+    print(f"📦 served RF@{version}")
+
+    return pipeline
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", action="store_true")
+    parser.add_argument("--chords", default="64,256,1024")
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--step", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pipeline = published_pipeline() if args.model else synthetic_pipeline()
+    vectorizer = pipeline.steps[0][1]
+    suffix = " | major | C"
+    rng = np.random.default_rng(1)
+
+    print(f"🎞️ window {args.window}, step {args.step}")
+    print(f"   {'chords':>6} {'windows':>7} {'song ms':>8} {'per-window ms':>14} {'timeline ms':>12} {'counts ms':>10} {'speedup':>8}")
+
+    for n_chords in (int(c) for c in args.chords.split(",")):
+        sequence = ",".join(rng.choice(FORTE_SAMPLE, size=n_chords))
+        chords = sequence.split(",")
+
+        def whole_song():
+            return pipeline.predict_proba([sequence + suffix])
+
+        def per_window():
+            _, windows = sliding_ngram_counts(vectorizer, sequence, suffix, args.window, args.step)
+            return np.vstack([pipeline.predict_proba([",".join(chords[s:e]) + suffix]) for s, e in windows])
+
+        def timeline():
+            counts, _ = sliding_ngram_counts(vectorizer, sequence, suffix, args.window, args.step)
+            return class_probabilities(pipeline[1:], counts)
+
+        def best_ms(fn) -> float:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            return min(times) * 1000
+
+        if not np.allclose(per_window(), timeline()):
+            raise AssertionError("Incremental timeline differs from per-window predictions.")
+
+        counts, windows = sliding_ngram_counts(vectorizer, sequence, suffix, args.window, args.step)
+        song_ms, window_ms, timeline_ms = best_ms(whole_song), best_ms(per_window), best_ms(timeline)
+        counts_ms = best_ms(lambda: sliding_ngram_counts(vectorizer, sequence, suffix, args.window, args.step))
+
+        print(
+            f"   {n_chords:>6} {len(windows):>7} {song_ms:8.2f} {window_ms:14.2f} {timeline_ms:12.2f} "
+            f"{counts_ms:10.2f} {window_ms / timeline_ms:7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+N-gram vectorization of the full model input: CountVectorizer over the
+"sequence | mode" strings vs TokenNgramVectorizer over interned token ids.
+
+Runs on a synthetic corpus, or on a dataset when --dataset is informed
+(its token store is built/reused next to it). Checks both produce the same
+n-grams and counts.
+
+Usage (from backend/):
+    python -m benchmarks.token_vectorizer_benchmark [--rows 20000] [--length 120]
+    python -m benchmarks.token_vectorizer_benchmark --dataset src/final-dataset/full_train_dataset.parquet
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from src.utils.TokenUtil import Vocabulary, TokenSequences, TokenNgramVectorizer, TOKEN_PATTERN
+
+FORTE_SAMPLE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1", "2-4", "3-9", "4-22A"]
+
+def synthetic_corpus(rows: int, length: int, seed: int = 0) -> tuple[list, TokenSequences]:
+    rng = np.random.default_rng(seed)
+    texts = []
+
+    for _ in range(rows):
+        chords = rng.choice(FORTE_SAMPLE, size=rng.integers(length // 2, length * 2))
+        texts.append(",".join(chords) + " | " + rng.choice(["major", "minor"]))
+
+    vocabulary = Vocabulary()
+    sequences = TokenSequences.from_arrays([vocabulary.encode_text(t, grow=True) for t in texts], vocabulary)
+
+    return texts, sequences
+
+def dataset_corpus(path: str) -> tuple[list, TokenSequences]:
+    from src.services.DatasetStorageService import DatasetStorageService
+    from src.services.TokenStoreService import TokenStoreService
+
+    df = DatasetStorageService().read(path, columns=["ngrams_input"])
+
+    return df["ngrams_input"].fillna("").tolist(), TokenStoreService().open(path)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=120)
+    parser.add_argument("--dataset", default=None)
+    parser.add_argument("--max-features", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.dataset:
+        texts, sequences = dataset_corpus(args.dataset)
+    else:
+        texts, sequences = synthetic_corpus(args.rows, args.length)
+
+    string_vect = CountVectorizer(lowercase=False, token_pattern=TOKEN_PATTERN, ngram_range=(1, 5), max_features=args.max_features)
+    id_vect = TokenNgramVectorizer(ngram_range=(1, 5), max_features=args.max_features)
+
+    start = time.perf_counter()
+    string_matrix = string_vect.fit_transform(texts)
+    string_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    id_matrix = id_vect.fit_transform(sequences)
+    id_time = time.perf_counter() - start
+
+    print(f"📊 {len(texts)} rows, {len(sequences.tokens)} tokens, {id_matrix.shape[1]} n-gram features")
+    print(f"   CountVectorizer (strings): {string_time:8.2f} s  ({len(texts) / string_time:10.0f} rows/s)")
+    print(f"   TokenNgramVectorizer (ids): {id_time:7.2f} s  ({len(texts) / id_time:10.0f} rows/s)")
+    print(f"   speedup: {string_time / id_time:8.1f}x")
+
+    if args.max_features is None:
+        # same n-grams, columns in a different order
+        string_order = np.argsort(string_vect.get_feature_names_out())
+        id_order = np.argsort(id_vect.get_feature_names_out())
+        same = abs(string_matrix[:, string_order] - id_matrix[:, id_order]).sum() == 0
+        print(f"   identical counts: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
 import json
-from fastapi import FastAPI, UploadFile, File, Form
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.controllers import AudioController as audio_controller
 from src.services.ModelTrainingService import ModelTrainingService
-from src.services.RandomForestService import RandomForestService
-from src.services.RFTrainingService import RFTrainingService
+from src.services.RandomForestService import RandomForestService, prediction_cache
+from src.services.RFTrainingService import RFTrainingService, RF_FULL_MODEL_NAME
 from src.services.XMIDIService import XMIDIService
+from src.services.JobService import JobService
+from src.services.ModelRegistryService import ModelRegistryService
+from src.services.ModelPoolService import model_pool
+from src.services.AIService import AIService
+from src.utils.MemoryUtil import process_memory
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # emotion models load in the background, requests are served meanwhile
+    model_pool().start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,36 +30,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# sync: transcription and analysis block, so they run in the threadpool
 @app.post("/upload-file")
-async def transcribe(
+def transcribe(
     uploaded_file: UploadFile = File(...),
-    is_recorded: int = Form(...)
+    is_recorded: int = Form(...),
+    timeline: int = Form(0),
+    timeline_window: int = Form(None),
+    timeline_step: int = Form(None)
 ):
-    return audio_controller.transcribe(uploaded_file, is_recorded)
+    return audio_controller.transcribe(uploaded_file, is_recorded, timeline == 1, timeline_window, timeline_step)
 
+# sync: runs in the threadpool, so concurrent predictions can be micro-batched
 @app.post("/get-progression-info")
-async def get_progression_info(
+def get_progression_info(
     chordProgression: str = Form(...),
     tempo: int = Form(...),
-    uploaded_file: UploadFile = File(...)
+    uploaded_file: UploadFile = File(...),
+    timeline: int = Form(0),
+    timeline_window: int = Form(None),
+    timeline_step: int = Form(None)
 ):  
-    return audio_controller.progression_info(chordProgression, tempo, uploaded_file)
+    return audio_controller.progression_info(chordProgression, tempo, uploaded_file, timeline == 1, timeline_window, timeline_step)
+
+@app.post("/predict-ensemble")
+def predict_ensemble(
+    forteclass_sequence: str = Form(...),
+    mode: str = Form(...),
+    tonic: str = Form(None)
+):
+    try:
+        return AIService().ensemble_predict(forteclass_sequence, mode, tonic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-# @app.post("/download-midi")
-# async def download_midi(uploaded_file: UploadFile):
-#     return await audio_controller.get_midi_to_download(uploaded_file)
+@app.get("/models/status")
+def models_status():
+    return model_pool().status()
 
-# @app.post("/download-sheet")
-# async def download_sheet(uploaded_file: UploadFile):
-#     return await audio_controller.get_musical_sheet_to_download(uploaded_file)
+@app.post("/download-midi")
+async def download_midi(
+    uploaded_file: UploadFile = File(None),
+    content_hash: str = Form(None)
+):
+    return await audio_controller.get_midi_to_download(uploaded_file, content_hash)
+
+@app.post("/download-sheet")
+async def download_sheet(
+    uploaded_file: UploadFile = File(None),
+    content_hash: str = Form(None)
+):
+    return await audio_controller.get_musical_sheet_to_download(uploaded_file, content_hash)
 
 @app.get("/test-evaluation")
 def test_evaluation():
-    service = RFTrainingService();
-    full = service.evaluate_final_rf()
+    service = JobService()
+    job = service.submit("evaluate-full")
 
     return {
-        "full": full,
+        "job": job
     }
 
 # @app.get("/build-chunked-dataset")
@@ -107,9 +151,177 @@ def test_evaluation():
 
 @app.get("/train-full-dataset")
 def train_full_dataset():
-    service = RFTrainingService();
-    service.train_full_dataset()
+    service = JobService()
+    job = service.submit("train-full")
+
+    return {
+        "message": "training full random forest in the background",
+        "job": job
+    }
+
+@app.get("/rf-truncation-curve")
+def rf_truncation_curve(tree_counts: str = None, depths: str = None):
+    service = JobService()
+    job = service.submit(
+        "truncation-curve",
+        tree_counts=tree_counts.split(",") if tree_counts else None,
+        depths=depths.split(",") if depths else None
+    )
+
+    return {
+        "job": job
+    }
+
+@app.post("/rf-export-engines")
+def rf_export_engines():
+    # flat (and reduced) serving copies of the current full RF
+    service = JobService()
+    job = service.submit("export-engines")
+
+    return {
+        "job": job
+    }
+
+@app.post("/rf-reduced-model")
+def rf_reduced_model(n_estimators: int = Form(None), max_depth: int = Form(None)):
+    service = JobService()
+    job = service.submit("export-reduced", n_estimators=n_estimators, max_depth=max_depth)
+
+    return {
+        "message": "exporting the reduced random forest in the background",
+        "job": job
+    }
+
+@app.post("/rf-incremental-update")
+def rf_incremental_update(
+    batch: UploadFile = File(None),
+    batch_name: str = Form(None),
+    n_trees: int = Form(100),
+    replay_rows: int = Form(20000),
+    max_estimators: int = Form(None),
+    compare_full: int = Form(0)
+):
+    # an uploaded batch, or the name of one uploaded before
+    training = RFTrainingService()
+
+    try:
+        if batch is not None:
+            batch_name = training.save_batch(batch.filename, batch.file)
+        training.batch_path(batch_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    service = JobService()
+    job = service.submit(
+        "incremental-update",
+        batch=batch_name,
+        n_trees=n_trees,
+        replay_rows=replay_rows,
+        max_estimators=max_estimators,
+        compare_full=compare_full == 1
+    )
+
+    return {
+        "message": "applying the labeled batch to the full random forest in the background",
+        "batch": batch_name,
+        "job": job
+    }
+
+@app.get("/run-pipeline")
+def run_pipeline(name: str = "all", force: bool = False):
+    service = JobService()
+    job = service.submit("pipeline", name=name, force=force)
+
+    return {
+        "pipeline": name,
+        "job": job
+    }
+
+@app.get("/jobs")
+def list_jobs():
+    service = JobService()
 
     return {
-        "message": "trained full random forest"
-    }
\ No newline at end of file
+        "jobs": service.list()
+    }
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    service = JobService()
+
+    try:
+        return service.get(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    service = JobService()
+
+    try:
+        return service.cancel(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/jobs/{job_id}/logs")
+def job_logs(job_id: str, offset: int = 0, follow: bool = False):
+    service = JobService()
+
+    try:
+        if follow:
+            service.get(job_id)
+            return StreamingResponse(service.follow_log(job_id), media_type="text/plain")
+
+        return service.read_log(job_id, offset)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/memory")
+def worker_memory():
+    # answered by whichever worker got the request, see its pid
+    return process_memory()
+
+@app.get("/prediction-cache")
+def prediction_cache_stats():
+    cache = prediction_cache()
+
+    return {
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {})
+    }
+
+@app.get("/models/{name}/versions")
+def model_versions(name: str):
+    service = ModelRegistryService()
+
+    try:
+        current = service.current(name)["version"]
+    except FileNotFoundError:
+        current = None
+
+    return {
+        "current": current,
+        "versions": service.versions(name)
+    }
+
+@app.post("/models/{name}/current")
+def set_current_model(name: str, version: str = Form(...)):
+    service = ModelRegistryService()
+
+    try:
+        service.set_current(name, version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    result = {
+        "name": name,
+        "current": version
+    }
+
+    # the flat (and reduced) forests follow the sklearn pipeline
+    if name == RF_FULL_MODEL_NAME:
+        result["job"] = JobService().submit("export-engines", version=version)
+
+    return result
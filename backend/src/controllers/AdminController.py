@@ -1,11 +1,11 @@
 from src.services.DatasetService import DatasetService
 
-def create_dataset():
+def create_dataset(incremental: bool = False):
     midi_dir = "/app/midi_raw_files" # from Docker container
     output_csv = r"src/dataset/midi_dataset_remake.csv"
 
     service = DatasetService(midi_dir, output_csv)
-    service.process()
+    service.process(incremental=incremental)
     
     return {
         "message": "new dataset created"
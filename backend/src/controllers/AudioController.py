@@ -2,13 +2,14 @@ from src.validators import FileValidator
 from src.services.MidiService import MidiService
 from src.services.AIService import AIService
 from src.services.AudioService import AudioService
+from src.services.ExportService import ExportService
 from datetime import date
 from fastapi.responses import StreamingResponse
 from src.utils import FileUtil
 from src.utils.StringUtil import classify_tempo, clean_chord_name
 import io
 
-def transcribe(file, is_recorded):
+def transcribe(file, is_recorded, timeline=False, timeline_window=None, timeline_step=None):
     errors = FileValidator.validate(file)
 
     if len(errors) <= 0:
@@ -19,12 +20,13 @@ def transcribe(file, is_recorded):
 
             if redirect_action == 'transcribe':
                 audio_service = AudioService(file, is_recorded=(is_recorded == 1))
-                midi_file = audio_service.create_midi_file()
-                midi_service = MidiService(midi_data=midi_file, wav_path=audio_service.get_wav_path())
-                
-                bpm, tempo_name = classify_tempo(midi_service.find_tempo())
+                try:
+                    midi_file = audio_service.create_midi_file()
+                    midi_service = MidiService(midi_data=midi_file, wav_path=audio_service.get_wav_path())
 
-                audio_service.cleanup()
+                    bpm, tempo_name = classify_tempo(midi_service.find_tempo())
+                finally:
+                    audio_service.cleanup()
             else:
                 midi_service = MidiService(file=file)
 
@@ -34,13 +36,25 @@ def transcribe(file, is_recorded):
                 errors.append({"message": "Something went wrong. We couldn't extract chord progression."})
                 return {"errors": errors}
 
-            return {
+            result = {
                 "progression": progression,
                 "tempo": {
                     "time": bpm,
                     "name": tempo_name,
                 },
+                "content_hash": ExportService().remember(midi_service)
             }
+
+            if timeline:
+                key_info = midi_service.find_estimate_key()
+                key_info = midi_service.correct_key_with_first_event(key_info, progression)
+                chordsForteClass = midi_service.extract_chord_progression_forteclass()
+
+                result["timeline"] = AIService().rf_timeline(
+                    chordsForteClass[:-1], key_info["mode"], key_info["tonic"], timeline_window, timeline_step
+                )
+
+            return result
         except Exception as e:
                 errors.append({"message": f"{e}"})
 
@@ -48,7 +62,7 @@ def transcribe(file, is_recorded):
         "errors": errors
     }
 
-def progression_info(chord_progression, tempo, file):
+def progression_info(chord_progression, tempo, file, timeline=False, timeline_window=None, timeline_step=None):
     errors = []
 
     if not tempo:
@@ -86,7 +100,7 @@ def progression_info(chord_progression, tempo, file):
 
             emotion = ai_service.rf_predict(chordsForteClass[:-1], key_info["mode"], key_info["tonic"])
 
-            return {
+            result = {
                 "progression": progression,
                 "emotion": emotion,
                 "scales": {
@@ -98,8 +112,16 @@ def progression_info(chord_progression, tempo, file):
                     "name": tempo_name,
                 },
                 "key_name": key_info['key'],
-                "tonic": key_info['tonic']
-            }    
+                "tonic": key_info['tonic'],
+                "content_hash": ExportService().remember(midi_service)
+            }
+
+            if timeline:
+                result["timeline"] = ai_service.rf_timeline(
+                    chordsForteClass[:-1], key_info["mode"], key_info["tonic"], timeline_window, timeline_step
+                )
+
+            return result
         except Exception as e:
             errors.append({"message": f"{e}"})
         
@@ -107,16 +129,41 @@ def progression_info(chord_progression, tempo, file):
         "errors": errors
     }
 
-async def get_midi_to_download(file):
+def find_midi_service_to_download(file, content_hash=None):
+    export_service = ExportService()
+    midi_service = export_service.find(content_hash)
+
+    if midi_service is not None:
+        return midi_service
+
+    if file is None:
+        raise ValueError("Analysis not found. Send the file again to download it.")
+
+    # same upload analysed before: skip transcription / MIDI analysis
+    upload_key = export_service.upload_key(file)
+    midi_service = export_service.find_upload(upload_key)
+
+    if midi_service is not None:
+        return midi_service
+
+    if FileUtil.redirectByFileType(file) == 'transcribe':
+        audio_service = AudioService(file)
+        try:
+            midi_file = audio_service.create_midi_file()
+            midi_service = MidiService(midi_data=midi_file, wav_path=audio_service.get_wav_path())
+        finally:
+            audio_service.cleanup()
+    else:
+        midi_service = MidiService(file=file)
+
+    return export_service.resolve(midi_service, upload_key)
+
+async def get_midi_to_download(file, content_hash=None):
     errors = []
     try:
-        midi_service = MidiService()
-
-        midi_data = midi_service.process(file)
+        midi_service = find_midi_service_to_download(file, content_hash)
 
-        midi_io = io.BytesIO()
-        midi_data.write(midi_io)
-        midi_io.seek(0)
+        midi_io = io.BytesIO(midi_service.export_midi())
         today = date.today()
         filename=f"{today}_played_progression.mid"
 
@@ -134,15 +181,12 @@ async def get_midi_to_download(file):
         "errors": errors
     }
     
-async def get_musical_sheet_to_download(file):
+async def get_musical_sheet_to_download(file, content_hash=None):
     errors = []
     try:
-        midi_service = MidiService(file=file)
+        midi_service = find_midi_service_to_download(file, content_hash)
 
-        xml_content = midi_service.export_musicxml()
-
-        sheet_io = io.BytesIO(xml_content.encode("utf-8"))
-        sheet_io.seek(0)
+        sheet_io = io.BytesIO(midi_service.export_musicxml())
 
         today = date.today()
         filename = f"{today}_musical_sheet.musicxml"
@@ -161,7 +205,3 @@ async def get_musical_sheet_to_download(file):
     return {
         "errors": errors
     }
-
-
-
-
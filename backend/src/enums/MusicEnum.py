@@ -58,3 +58,8 @@ class HarmonicFunctions(Enum):
         ("VI", "Submediant"),
         ("VII", "Leading Tone")
     ]
+
+
+class Notes(Enum):
+    # same spelling librosa.midi_to_note uses (sharps), without octave
+    PITCH_CLASSES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
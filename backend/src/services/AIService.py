@@ -2,13 +2,14 @@ from src.services.NaiveBayesService import NaiveBayesService
 from src.services.RandomForestService import RandomForestService
 from src.services.KNNService import KNNService
 from src.services.SVMService import SVMService
+from src.services.ModelPoolService import model_pool
 from src.utils.StringUtil import get_emotion, get_emotion_description
 
 class AIService: 
     def rf_predict(self, forte_sequence: str, mode: str, tonic: str = None) -> str:
         rf_service = RandomForestService() 
         emotion = rf_service.predict_full_ngrams(forte_sequence, mode)
-        evaluation = rf_service.evaluate_full_ngrams() 
+        evaluation = rf_service.full_ngrams_evaluation()
 
         return {
             "model_used": "Random Forest",
@@ -18,8 +19,18 @@ class AIService:
             "emotion_proba": emotion["probabilities"]
         }
     
+    def rf_timeline(self, forte_sequence: str, mode: str, tonic: str = None, window: int = None, step: int = None) -> list:
+        rf_service = RandomForestService()
+        options = {k: v for k, v in (("window", window), ("step", step)) if v}
+        timeline = rf_service.predict_timeline(forte_sequence, mode, tonic, **options)
+
+        return [
+            {**entry, "content": get_emotion(entry["emotion"])}
+            for entry in timeline
+        ]
+
     def nb_predict(self, forte_sequence: str) -> str:
-        nb_service = NaiveBayesService()
+        nb_service = NaiveBayesService(model=model_pool().model("nb"))
         emotion = nb_service.predict(forte_sequence)
         evaluation = nb_service.evaluate() 
 
@@ -30,7 +41,7 @@ class AIService:
         }
     
     def knn_predict(self, forte_sequence: str) -> str:
-        knn_service = KNNService()
+        knn_service = KNNService(model=model_pool().model("knn"))
         emotion = knn_service.predict(forte_sequence)
         # evaluation = knn_service.evaluate() 
 
@@ -40,8 +51,20 @@ class AIService:
             # "evaluation": evaluation
         }
     
+    def ensemble_predict(self, forte_sequence: str, mode: str, tonic: str = None) -> dict:
+        result = model_pool().predict_ensemble(forte_sequence, mode, tonic)
+        emotion = result["ensemble"]["emotion"]
+
+        return {
+            "model_used": "Ensemble",
+            "content": get_emotion(emotion),
+            "description": get_emotion_description(emotion),
+            "emotion_proba": result["ensemble"]["probabilities"],
+            **result
+        }
+
     def svm_predict(self, forte_sequence: str) -> str:
-        svm_service = SVMService()
+        svm_service = SVMService(model=model_pool().model("svm"))
         emotion = svm_service.predict(forte_sequence)
         evaluation = svm_service.evaluate() 
 
@@ -9,64 +9,69 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.decomposition import TruncatedSVD, LatentDirichletAllocation
 from sklearn.pipeline import FeatureUnion
 import joblib
+from src.services.DatasetStorageService import DatasetStorageService
+from src.services.ChunkingService import ChunkingService
+from src.utils.SamplingUtil import balanced_rows
 
 BASE_DIR = Path(__file__).resolve().parent
 MODELS_DIR = (BASE_DIR / '..' / 'TrainedModels').resolve()
 DATASET_DIR = (BASE_DIR / '..' / 'lucas-dataset').resolve()
 
-RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.csv')  
-TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'train_dataset.csv')
-TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'test_dataset.csv')
+RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.parquet')  
+TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'train_dataset.parquet')
+TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'test_dataset.parquet')
 RF_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_v1.pkl')
 
-CHUNK_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_dataset.csv')  
-CHUNK_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunk_train_dataset.csv')
-CHUNK_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunk_test_dataset.csv')
+CHUNK_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_dataset.parquet')  
+CHUNK_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunk_train_dataset.parquet')
+CHUNK_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunk_test_dataset.parquet')
 RF_CHUNKED_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_chunked_v1.pkl')
 
-NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_dataset.csv')
-NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_train_dataset.csv')
-NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_test_dataset.csv')
+NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_dataset.parquet')
+NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_train_dataset.parquet')
+NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'ngrams_test_dataset.parquet')
 RF_NGRAMS_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_ngrams_v1.pkl')
 
-FULL_NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_dataset.csv')  
-FULL_NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_train_dataset.csv')
-FULL_NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_test_dataset.csv')
+FULL_NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_dataset.parquet')  
+FULL_NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_train_dataset.parquet')
+FULL_NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_ngrams_test_dataset.parquet')
 RF_FULL_NGRAMS_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_full_ngrams_v1.pkl')
 
-BALANCED_CHUNK_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_dataset.csv')  
-BALANCED_CHUNK_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_train_dataset.csv')
-BALANCED_CHUNK_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_test_dataset.csv')
+BALANCED_CHUNK_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_dataset.parquet')  
+BALANCED_CHUNK_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_train_dataset.parquet')
+BALANCED_CHUNK_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_test_dataset.parquet')
 RF_BALANCED_CHUNK_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_balanced_chunked_v1.pkl')
 
-BALANCED_NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_dataset.csv')  
-BALANCED_NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_train_dataset.csv')
-BALANCED_NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_test_dataset.csv')
+BALANCED_NGRAMS_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_dataset.parquet')  
+BALANCED_NGRAMS_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_train_dataset.parquet')
+BALANCED_NGRAMS_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_ngrams_test_dataset.parquet')
 RF_BALANCED_NGRAMS_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_balanced_ngrams_v1.pkl')
 
-CHUNKED_50_PATH = os.path.join(DATASET_DIR, 'chunked_50_dataset.csv')  
-CHUNKED_50_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_50_train_dataset.csv')
-CHUNKED_50_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_50_test_dataset.csv')
+CHUNKED_50_PATH = os.path.join(DATASET_DIR, 'chunked_50_dataset.parquet')  
+CHUNKED_50_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_50_train_dataset.parquet')
+CHUNKED_50_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_50_test_dataset.parquet')
 RF_CHUNKED_50_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_chunked_50_v1.pkl')
 
-BALANCED_CHUNKED_50_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_dataset.csv')  
-BALANCED_CHUNKED_50_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_train_dataset.csv')
-BALANCED_CHUNKED_50_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_test_dataset.csv')
+BALANCED_CHUNKED_50_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_dataset.parquet')  
+BALANCED_CHUNKED_50_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_train_dataset.parquet')
+BALANCED_CHUNKED_50_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_50_test_dataset.parquet')
 RF_BALANCED_CHUNKED_50_MODEL_PATH = os.path.join(MODELS_DIR, 'random_forest_balanced_chunked_50_v1.pkl')
 
 class AITrainingService:
 
     def __init__(self, action: str = None):
         self.rf_model_path = os.path.abspath(RF_MODEL_PATH)
+        self.storage = DatasetStorageService()
+        self.chunker = ChunkingService()
 
     # -------------------------------------------------------------
     # SPLIT RAW DATASET
     # -------------------------------------------------------------
     def split_raw_dataset(self, test_size=0.15, random_state=42) -> dict:
-        if not os.path.exists(RAW_DATASET_PATH):
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(f"Raw dataset not found: {RAW_DATASET_PATH}")
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded RAW dataset: {df.shape[0]} samples")
         print(f"📤 Splitting into train/test ({int((1 - test_size) * 100)}% / {int(test_size * 100)}%)")
@@ -78,8 +83,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(TEST_DATASET_PATH, index=False)
+        self.storage.write_view(TRAIN_DATASET_PATH, RAW_DATASET_PATH, train_df.index)
+        self.storage.write_view(TEST_DATASET_PATH, RAW_DATASET_PATH, test_df.index)
 
         print(f"✅ Train dataset saved: {TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 Test dataset saved:  {TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -93,11 +98,11 @@ class AITrainingService:
     # TRAIN
     # -------------------------------------------------------------
     def train_model(self):
-        if not os.path.exists(TRAIN_DATASET_PATH):
+        if not self.storage.exists(TRAIN_DATASET_PATH):
             print("⚠️ Training dataset missing — splitting raw first.")
             self.split_raw_dataset()
 
-        train_df = pd.read_csv(TRAIN_DATASET_PATH)
+        train_df = self.storage.read(TRAIN_DATASET_PATH)
         print(f"📚 Training with {train_df.shape[0]} samples...")
 
         # ---------- FEATURES ----------
@@ -160,13 +165,13 @@ class AITrainingService:
     # EVALUATE
     # -------------------------------------------------------------
     def evaluate(self) -> dict:
-        if not os.path.exists(TEST_DATASET_PATH):
+        if not self.storage.exists(TEST_DATASET_PATH):
             raise FileNotFoundError(f"Test dataset missing: {TEST_DATASET_PATH}")
 
         if not hasattr(self, "_emotion_model"):
             self.load_model()
 
-        test_df = pd.read_csv(TEST_DATASET_PATH)
+        test_df = self.storage.read(TEST_DATASET_PATH)
         print(f"🧪 Evaluating on {test_df.shape[0]} samples...")
 
         X_test = test_df["forteclass_sequence"] + " | " + test_df["mode"]
@@ -192,10 +197,10 @@ class AITrainingService:
     # CHUNK DATASET BASED ON FORTECLASS AVERAGE
     # -------------------------------------------------------------
     def chunk_dataset_based_on_forteclasses_average(self, min_chunk=12, max_chunk=20) -> str:
-        if not os.path.exists(RAW_DATASET_PATH):
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(f"Raw dataset not found: {RAW_DATASET_PATH}")
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["num_classes"])
 
         if "num_classes" not in df.columns:
             raise ValueError("raw_dataset.csv must contain a num_classes column.")
@@ -230,52 +235,17 @@ class AITrainingService:
 
         print(f"\n📐 Using chunk_size = {chunk_size}")
 
-        new_rows = []
-
         # -------------------------------------------------
-        # Walk through the dataset row by row
+        # Small rows are kept unchanged, long ones split into
+        # chunks of chunk_size (the remainder included)
         # -------------------------------------------------
-        for idx, row in df.iterrows():
-            full_seq = row["forteclass_sequence"]
-            emotion = row["emotion"]
-            mode = row["mode"]
-
-            # Split forteclass string into list
-            tokens = [t for t in full_seq.split(",") if t.strip() != ""]
-
-            # If small, keep row unchanged
-            if len(tokens) <= chunk_size:
-                new_rows.append({
-                    "forteclass_sequence": ",".join(tokens),
-                    "num_classes": len(tokens),
-                    "mode": mode,
-                    "emotion": emotion
-                })
-                continue
-
-            # If long → split into chunks
-            for i in range(0, len(tokens), chunk_size):
-                sub = tokens[i:i + chunk_size]
-                if len(sub) == 0:
-                    continue
-
-                new_rows.append({
-                    "forteclass_sequence": ",".join(sub),
-                    "num_classes": len(sub),
-                    "mode": mode,
-                    "emotion": emotion
-                })
-
-        # Convert to dataframe
-        out_df = pd.DataFrame(new_rows)
-
-        CHUNKED_PATH = os.path.join(DATASET_DIR, "chunked_dataset.csv")
-        out_df.to_csv(CHUNKED_PATH, index=False)
+        CHUNKED_PATH = os.path.join(DATASET_DIR, "chunked_dataset.parquet")
+        stats = self.chunker.chunk_dataset(RAW_DATASET_PATH, CHUNKED_PATH, chunk_size, mode="fixed")
 
         print(f"\n✅ Chunking complete!")
         print(f"📄 New dataset saved: {CHUNKED_PATH}")
-        print(f"🆕 Total rows: {out_df.shape[0]} (was {df.shape[0]})")
-        print(f"📉 Average num_classes AFTER chunking: {out_df['num_classes'].mean():.2f}")
+        print(f"🆕 Total rows: {stats['rows_out']} (was {stats['rows_in']})")
+        print(f"📉 Average num_classes AFTER chunking: {stats['avg_num_classes']:.2f}")
 
         return CHUNKED_PATH
     
@@ -283,10 +253,10 @@ class AITrainingService:
     # SPLIT CHUNK DATASET
     # -------------------------------------------------------------
     def split_chunk_dataset(self, test_size=0.2, random_state=42) -> dict:
-        if not os.path.exists(CHUNK_DATASET_PATH):
+        if not self.storage.exists(CHUNK_DATASET_PATH):
             raise FileNotFoundError(f"Chunk dataset not found: {CHUNK_DATASET_PATH}")
 
-        df = pd.read_csv(CHUNK_DATASET_PATH)
+        df = self.storage.read(CHUNK_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded CHUNK dataset: {df.shape[0]} samples")
         print(f"📤 Splitting into train/test ({int((1 - test_size) * 100)}% / {int(test_size * 100)}%)")
@@ -298,8 +268,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(CHUNK_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(CHUNK_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(CHUNK_TRAIN_DATASET_PATH, CHUNK_DATASET_PATH, train_df.index)
+        self.storage.write_view(CHUNK_TEST_DATASET_PATH, CHUNK_DATASET_PATH, test_df.index)
 
         print(f"✅ Train dataset saved: {CHUNK_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 Test dataset saved:  {CHUNK_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -313,13 +283,13 @@ class AITrainingService:
     # TRAIN CHUNKED MODEL
     # -------------------------------------------------------------
     def train_chunk_model(self):
-        if not os.path.exists(CHUNK_TRAIN_DATASET_PATH):
+        if not self.storage.exists(CHUNK_TRAIN_DATASET_PATH):
             raise FileNotFoundError(
                 f"Chunked train dataset missing: {CHUNK_TRAIN_DATASET_PATH}\n"
                 f"➡️ Run split_chunk_dataset() first."
             )
 
-        train_df = pd.read_csv(CHUNK_TRAIN_DATASET_PATH)
+        train_df = self.storage.read(CHUNK_TRAIN_DATASET_PATH)
 
         print(f"📚 Training CHUNKED model with {train_df.shape[0]} samples...")
 
@@ -372,37 +342,33 @@ class AITrainingService:
     def build_ngrams_dataset(self) -> str:
         """
         Uses the chunked dataset to build the N-grams/LDA-ready dataset.
-        Basically just copies chunked_dataset.csv into a new file but prepares the
-        sequence string in the correct format.
+        Stored as a view over every chunked row; the sequence string in the
+        correct format (ngrams_input) is derived on read.
         """
-        if not os.path.exists(CHUNK_DATASET_PATH):
+        if not self.storage.exists(CHUNK_DATASET_PATH):
             raise FileNotFoundError(
                 f"Chunk dataset missing: {CHUNK_DATASET_PATH}\n"
                 f"➡️ Run chunk_dataset_based_on_forteclasses_average() first."
             )
 
-        df = pd.read_csv(CHUNK_DATASET_PATH)
+        df = self.storage.read(CHUNK_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Building N-GRAMS dataset from {df.shape[0]} chunked samples...")
 
-        # Build the combined token sequence
-        df["ngrams_input"] = df["forteclass_sequence"] + " | " + df["mode"]
-
-        # Save
-        df.to_csv(NGRAMS_DATASET_PATH, index=False)
+        self.storage.write_view(NGRAMS_DATASET_PATH, CHUNK_DATASET_PATH, df.index)
 
         print(f"✅ N-GRAMS dataset saved: {NGRAMS_DATASET_PATH}")
 
         return NGRAMS_DATASET_PATH
     
     def split_ngrams_dataset(self, test_size=0.2, random_state=42) -> dict:
-        if not os.path.exists(NGRAMS_DATASET_PATH):
+        if not self.storage.exists(NGRAMS_DATASET_PATH):
             raise FileNotFoundError(
                 f"N-grams dataset missing: {NGRAMS_DATASET_PATH}\n"
                 f"➡️ Run build_ngrams_dataset() first."
             )
 
-        df = pd.read_csv(NGRAMS_DATASET_PATH)
+        df = self.storage.read(NGRAMS_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded N-GRAMS dataset: {df.shape[0]} samples")
         print(f"📤 Splitting ({100 - int(test_size*100)}% train / {int(test_size*100)}% test)")
@@ -414,8 +380,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(NGRAMS_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(NGRAMS_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(NGRAMS_TRAIN_DATASET_PATH, NGRAMS_DATASET_PATH, train_df.index)
+        self.storage.write_view(NGRAMS_TEST_DATASET_PATH, NGRAMS_DATASET_PATH, test_df.index)
 
         print(f"✅ N-GRAMS train saved: {NGRAMS_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 N-GRAMS test saved:  {NGRAMS_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -427,7 +393,7 @@ class AITrainingService:
     
     def train_ngrams_model(self):
         print("📘 Loading dataset...")
-        df = pd.read_csv(NGRAMS_TRAIN_DATASET_PATH)
+        df = self.storage.read(NGRAMS_TRAIN_DATASET_PATH)
         df = df.dropna(subset=["ngrams_input", "emotion"])
 
         X = df["ngrams_input"].astype(str)
@@ -491,34 +457,31 @@ class AITrainingService:
         print(f"✅ Training complete. Saved pipeline to:\n{RF_NGRAMS_MODEL_PATH}")
 
     def build_full_ngrams_dataset(self) -> str:
-        if not os.path.exists(RAW_DATASET_PATH):
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(
                 f"Chunk dataset missing: {RAW_DATASET_PATH}\n"
                 f"➡️ Run chunk_dataset_based_on_forteclasses_average() first."
             )
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Building FULL N-GRAMS dataset from {df.shape[0]} samples...")
 
-        # Build the combined token sequence
-        df["ngrams_input"] = df["forteclass_sequence"] + " | " + df["mode"]
-
-        # Save
-        df.to_csv(FULL_NGRAMS_DATASET_PATH, index=False)
+        # Every raw row; ngrams_input (sequence | mode) is derived on read
+        self.storage.write_view(FULL_NGRAMS_DATASET_PATH, RAW_DATASET_PATH, df.index)
 
         print(f"✅ N-GRAMS dataset saved: {FULL_NGRAMS_DATASET_PATH}")
 
         return FULL_NGRAMS_DATASET_PATH
     
     def split_full_ngrams_dataset(self, test_size=0.15, random_state=42) -> dict:
-        if not os.path.exists(FULL_NGRAMS_DATASET_PATH):
+        if not self.storage.exists(FULL_NGRAMS_DATASET_PATH):
             raise FileNotFoundError(
                 f"N-grams dataset missing: {FULL_NGRAMS_DATASET_PATH}\n"
                 f"➡️ Run build_full_ngrams_dataset() first."
             )
 
-        df = pd.read_csv(FULL_NGRAMS_DATASET_PATH)
+        df = self.storage.read(FULL_NGRAMS_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded FULL N-GRAMS dataset: {df.shape[0]} samples")
         print(f"📤 Splitting ({100 - int(test_size*100)}% train / {int(test_size*100)}% test)")
@@ -530,8 +493,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(FULL_NGRAMS_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(FULL_NGRAMS_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(FULL_NGRAMS_TRAIN_DATASET_PATH, FULL_NGRAMS_DATASET_PATH, train_df.index)
+        self.storage.write_view(FULL_NGRAMS_TEST_DATASET_PATH, FULL_NGRAMS_DATASET_PATH, test_df.index)
 
         print(f"✅ FULL N-GRAMS train saved: {FULL_NGRAMS_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 FULL N-GRAMS test saved:  {FULL_NGRAMS_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -543,7 +506,7 @@ class AITrainingService:
     
     def train_full_ngrams_model(self):
         print("📘 Loading dataset...")
-        df = pd.read_csv(FULL_NGRAMS_TRAIN_DATASET_PATH)
+        df = self.storage.read(FULL_NGRAMS_TRAIN_DATASET_PATH)
         df = df.dropna(subset=["ngrams_input", "emotion"])
 
         X = df["ngrams_input"].astype(str)
@@ -585,10 +548,10 @@ class AITrainingService:
         print(f"✅ Training complete. Saved pipeline to:\n{RF_FULL_NGRAMS_MODEL_PATH}")
 
     def create_balanced_chunk_dataset(self) -> str:
-        if not os.path.exists(CHUNK_DATASET_PATH):
+        if not self.storage.exists(CHUNK_DATASET_PATH):
             raise FileNotFoundError(f"Chunk dataset not found: {CHUNK_DATASET_PATH}")
 
-        df = pd.read_csv(CHUNK_DATASET_PATH)
+        df = self.storage.read(CHUNK_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded CHUNK dataset: {df.shape[0]} samples")
         print("🔍 Counting emotion frequencies...")
@@ -601,19 +564,9 @@ class AITrainingService:
 
         print("✂️ Undersampling all classes to minimum count...")
 
-        balanced_parts = []
+        balanced_df = df.iloc[balanced_rows(df["emotion"], random_state=42, sort_classes=True)]
 
-        for emotion, emotion_df in df.groupby("emotion"):
-            sampled = emotion_df.sample(
-                n=min_count,
-                replace=False,
-                random_state=42
-            )
-            balanced_parts.append(sampled)
-
-        balanced_df = pd.concat(balanced_parts, axis=0).sample(frac=1, random_state=42)
-
-        balanced_df.to_csv(BALANCED_CHUNK_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNK_DATASET_PATH, CHUNK_DATASET_PATH, balanced_df.index)
 
         print(f"\n✅ Balanced dataset created!")
         print(f"📄 Saved at: {BALANCED_CHUNK_DATASET_PATH}")
@@ -622,10 +575,10 @@ class AITrainingService:
         return BALANCED_CHUNK_DATASET_PATH
     
     def split_balanced_chunk_dataset(self, test_size=0.2, random_state=42) -> dict:
-        if not os.path.exists(BALANCED_CHUNK_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNK_DATASET_PATH):
             raise FileNotFoundError(f"Balanced chunk dataset not found: {BALANCED_CHUNK_DATASET_PATH}")
 
-        df = pd.read_csv(BALANCED_CHUNK_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNK_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded BALANCED dataset: {df.shape[0]} samples")
         print(f"📤 Splitting into train/test ({100 - int(test_size*100)}% / {int(test_size*100)}%)")
@@ -637,8 +590,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(BALANCED_CHUNK_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(BALANCED_CHUNK_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNK_TRAIN_DATASET_PATH, BALANCED_CHUNK_DATASET_PATH, train_df.index)
+        self.storage.write_view(BALANCED_CHUNK_TEST_DATASET_PATH, BALANCED_CHUNK_DATASET_PATH, test_df.index)
 
         print(f"✅ Balanced TRAIN saved: {BALANCED_CHUNK_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 Balanced TEST saved:  {BALANCED_CHUNK_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -649,13 +602,13 @@ class AITrainingService:
         }
     
     def train_balanced_chunk_model(self):
-        if not os.path.exists(BALANCED_CHUNK_TRAIN_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNK_TRAIN_DATASET_PATH):
             raise FileNotFoundError(
                 f"Balanced chunk train dataset missing: {BALANCED_CHUNK_TRAIN_DATASET_PATH}\n"
                 f"➡️ Run split_balanced_chunk_dataset() first."
             )
 
-        df = pd.read_csv(BALANCED_CHUNK_TRAIN_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNK_TRAIN_DATASET_PATH)
 
         print(f"📚 Training BALANCED CHUNK model with {df.shape[0]} samples...")
 
@@ -698,10 +651,10 @@ class AITrainingService:
         self._balanced_chunk_model = pipeline
 
     def create_balanced_dataset_ngrams_lda(self):
-        if not os.path.exists(BALANCED_CHUNK_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNK_DATASET_PATH):
             raise FileNotFoundError(f"Raw dataset not found: {BALANCED_CHUNK_DATASET_PATH}")
 
-        df = pd.read_csv(BALANCED_CHUNK_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNK_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"])
         df = df.dropna(subset=["forteclass_sequence", "emotion", "mode"])
         df = df[df["forteclass_sequence"].str.len() > 0]
 
@@ -710,7 +663,6 @@ class AITrainingService:
         df_balanced = (
             df.groupby("emotion")
             .sample(n=min_count, random_state=42)
-            .reset_index(drop=True)
         )
 
         # Create ngrams_input = sequence | mode
@@ -718,17 +670,17 @@ class AITrainingService:
             df_balanced["forteclass_sequence"] + " | " + df_balanced["mode"]
         )
 
-        df_balanced.to_csv(BALANCED_NGRAMS_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_NGRAMS_DATASET_PATH, BALANCED_CHUNK_DATASET_PATH, df_balanced.index)
 
         print("✅ Balanced dataset for NGRAMS + LDA generated!")
         print(df_balanced["emotion"].value_counts())
         return df_balanced
     
     def split_balanced_dataset_ngrams_lda(self, test_size=0.20):
-        if not os.path.exists(BALANCED_NGRAMS_DATASET_PATH):
+        if not self.storage.exists(BALANCED_NGRAMS_DATASET_PATH):
             raise FileNotFoundError(f"Balanced dataset missing: {BALANCED_NGRAMS_DATASET_PATH}")
 
-        df = pd.read_csv(BALANCED_NGRAMS_DATASET_PATH)
+        df = self.storage.read(BALANCED_NGRAMS_DATASET_PATH, columns=["emotion"])
 
         train_df, test_df = train_test_split(
             df,
@@ -737,8 +689,8 @@ class AITrainingService:
             random_state=42
         )
 
-        train_df.to_csv(BALANCED_NGRAMS_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(BALANCED_NGRAMS_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_NGRAMS_TRAIN_DATASET_PATH, BALANCED_NGRAMS_DATASET_PATH, train_df.index)
+        self.storage.write_view(BALANCED_NGRAMS_TEST_DATASET_PATH, BALANCED_NGRAMS_DATASET_PATH, test_df.index)
 
         print("📌 Balanced NGRAMS+LDA train/test split done!")
         print("Train size:", len(train_df), " Test size:", len(test_df))
@@ -746,10 +698,10 @@ class AITrainingService:
         return train_df, test_df
     
     def train_model_ngrams_lda_balanced(self):
-        if not os.path.exists(BALANCED_NGRAMS_TRAIN_DATASET_PATH):
+        if not self.storage.exists(BALANCED_NGRAMS_TRAIN_DATASET_PATH):
             raise FileNotFoundError("Dataset missing. Run create_balanced_dataset_ngrams_lda().")
 
-        df = pd.read_csv(BALANCED_NGRAMS_TRAIN_DATASET_PATH)
+        df = self.storage.read(BALANCED_NGRAMS_TRAIN_DATASET_PATH)
 
         X = df["ngrams_input"].astype(str).tolist()
         y = df["emotion"].astype(str).tolist()
@@ -788,51 +740,23 @@ class AITrainingService:
         return pipeline
 
     def chunk_50_dataset(self, chunk_size=50) -> str:
-        if not os.path.exists(RAW_DATASET_PATH):
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(f"Raw dataset not found: {RAW_DATASET_PATH}")
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["num_classes"])
 
         if "num_classes" not in df.columns:
             raise ValueError("raw_dataset.csv must contain a num_classes column.")
 
         print(f"📊 Loaded RAW dataset: {df.shape[0]} samples")
 
-        new_rows = []
-
-        for idx, row in df.iterrows():
-            full_seq = row["forteclass_sequence"]
-            emotion = row["emotion"]
-            mode = row["mode"]
-
-            tokens = [t for t in full_seq.split(",") if t.strip()]
-
-            # Skip rows that are smaller than chunk_size (cannot produce any valid chunk)
-            if len(tokens) < chunk_size:
-                continue
-
-            # Split into perfect chunks of 50
-            for i in range(0, len(tokens), chunk_size):
-                sub = tokens[i:i + chunk_size]
-
-                # Only accept perfect chunks
-                if len(sub) == chunk_size:
-                    new_rows.append({
-                        "forteclass_sequence": ",".join(sub),
-                        "num_classes": chunk_size,
-                        "mode": mode,
-                        "emotion": emotion
-                    })
-
-        # Convert to dataframe
-        out_df = pd.DataFrame(new_rows)
-
-        out_df.to_csv(CHUNKED_50_PATH, index=False)
+        # Only perfect chunks of 50, rows smaller than chunk_size produce none
+        stats = self.chunker.chunk_dataset(RAW_DATASET_PATH, CHUNKED_50_PATH, chunk_size, mode="strict")
 
         print(f"\n✅ Chunking complete!")
         print(f"📄 New dataset saved: {CHUNKED_50_PATH}")
-        print(f"🆕 Total rows: {out_df.shape[0]} (was {df.shape[0]})")
-        print(f"📉 Average num_classes AFTER chunking: {out_df['num_classes'].mean():.2f}")
+        print(f"🆕 Total rows: {stats['rows_out']} (was {stats['rows_in']})")
+        print(f"📉 Average num_classes AFTER chunking: {stats['avg_num_classes']:.2f}")
 
         return CHUNKED_50_PATH
     
@@ -841,18 +765,15 @@ class AITrainingService:
         Split CHUNKED_50_PATH into CHUNKED_50_TRAIN_DATASET_PATH and CHUNKED_50_TEST_DATASET_PATH.
         Each row will have 'ngrams_input' = forteclass_sequence + " | " + mode (same format used elsewhere).
         """
-        if not os.path.exists(CHUNKED_50_PATH):
+        if not self.storage.exists(CHUNKED_50_PATH):
             raise FileNotFoundError(f"Chunked-50 dataset not found: {CHUNKED_50_PATH}\n➡️ Run chunk_50_dataset() first.")
 
-        df = pd.read_csv(CHUNKED_50_PATH)
+        df = self.storage.read(CHUNKED_50_PATH, columns=["forteclass_sequence", "mode", "emotion"])
         print(f"📊 Loaded CHUNKED-50 dataset: {df.shape[0]} samples")
 
         df = df.dropna(subset=["forteclass_sequence", "mode", "emotion"])
         df = df[df["forteclass_sequence"].str.len() > 0]
 
-        # create the input column used by the pipeline
-        df["ngrams_input"] = df["forteclass_sequence"] + " | " + df["mode"]
-
         print("📤 Splitting into train/test (stratified by emotion)...")
         train_df, test_df = train_test_split(
             df,
@@ -861,8 +782,8 @@ class AITrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(CHUNKED_50_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(CHUNKED_50_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(CHUNKED_50_TRAIN_DATASET_PATH, CHUNKED_50_PATH, train_df.index)
+        self.storage.write_view(CHUNKED_50_TEST_DATASET_PATH, CHUNKED_50_PATH, test_df.index)
 
         print(f"✅ CHUNKED_50 train saved: {CHUNKED_50_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 CHUNKED_50 test saved:  {CHUNKED_50_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -876,15 +797,15 @@ class AITrainingService:
           CountVectorizer -> LatentDirichletAllocation -> RandomForestClassifier
         Saves the *full pipeline* (so RandomForestService can joblib.load a pipeline) to RF_CHUNKED_50_MODEL_PATH.
         """
-        if not os.path.exists(CHUNKED_50_TRAIN_DATASET_PATH):
+        if not self.storage.exists(CHUNKED_50_TRAIN_DATASET_PATH):
             raise FileNotFoundError(
                 f"Chunked-50 train dataset not found: {CHUNKED_50_TRAIN_DATASET_PATH}\n"
                 f"➡️ Run split_chunked_50_dataset() first."
             )
 
         print("📘 Loading CHUNKED_50 train/test...")
-        train_df = pd.read_csv(CHUNKED_50_TRAIN_DATASET_PATH)
-        test_df = pd.read_csv(CHUNKED_50_TEST_DATASET_PATH) if os.path.exists(CHUNKED_50_TEST_DATASET_PATH) else None
+        train_df = self.storage.read(CHUNKED_50_TRAIN_DATASET_PATH)
+        test_df = self.storage.read(CHUNKED_50_TEST_DATASET_PATH) if self.storage.exists(CHUNKED_50_TEST_DATASET_PATH) else None
 
         # Ensure columns exist
         train_df = train_df.dropna(subset=["ngrams_input", "emotion"])
@@ -956,12 +877,12 @@ class AITrainingService:
         return pipeline
 
     def count_emotions_in_50_chunk_dataset(self):
-        if not os.path.exists(CHUNKED_50_TRAIN_DATASET_PATH):
+        if not self.storage.exists(CHUNKED_50_TRAIN_DATASET_PATH):
             raise FileNotFoundError(
                 f"Dataset not found: {CHUNKED_50_TRAIN_DATASET_PATH}"
             )
 
-        df = pd.read_csv(CHUNKED_50_TRAIN_DATASET_PATH)
+        df = self.storage.read(CHUNKED_50_TRAIN_DATASET_PATH)
 
         if "emotion" not in df.columns:
             raise ValueError("Dataset must contain an 'emotion' column.")
@@ -976,10 +897,10 @@ class AITrainingService:
         return counts
 
     def create_balanced_50_dataset(self) -> str:
-        if not os.path.exists(CHUNKED_50_PATH):
+        if not self.storage.exists(CHUNKED_50_PATH):
             raise FileNotFoundError(f"chunked_50_dataset not found: {CHUNKED_50_PATH}")
 
-        df = pd.read_csv(CHUNKED_50_PATH)
+        df = self.storage.read(CHUNKED_50_PATH, columns=["emotion"])
 
         if "emotion" not in df.columns:
             raise ValueError("Dataset must contain an 'emotion' column.")
@@ -995,20 +916,10 @@ class AITrainingService:
 
         print(f"\n➡️ Balancing using minority class size: {min_size}")
 
-        balanced_parts = []
-        for emotion in counts.index:
-            part = df[df["emotion"] == emotion].sample(
-                n=min_size,
-                replace=False,
-                random_state=42
-            )
-            balanced_parts.append(part)
-
-        balanced_df = pd.concat(balanced_parts, ignore_index=True)
-        balanced_df = balanced_df.sample(frac=1, random_state=42).reset_index(drop=True)
+        balanced_df = df.iloc[balanced_rows(df["emotion"], random_state=42)]
 
         os.makedirs(os.path.dirname(BALANCED_CHUNKED_50_PATH), exist_ok=True)
-        balanced_df.to_csv(BALANCED_CHUNKED_50_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNKED_50_PATH, CHUNKED_50_PATH, balanced_df.index)
 
         print("\n✅ Balanced dataset created!")
         print(f"📄 Saved: {BALANCED_CHUNKED_50_PATH}")
@@ -1019,10 +930,10 @@ class AITrainingService:
         return BALANCED_CHUNKED_50_PATH
 
     def split_balanced_50_dataset(self, test_ratio=0.20):
-        if not os.path.exists(BALANCED_CHUNKED_50_PATH):
+        if not self.storage.exists(BALANCED_CHUNKED_50_PATH):
             raise FileNotFoundError(f"Balanced chunked dataset missing: {BALANCED_CHUNKED_50_PATH}")
 
-        df = pd.read_csv(BALANCED_CHUNKED_50_PATH)
+        df = self.storage.read(BALANCED_CHUNKED_50_PATH, columns=["emotion"])
 
         print(f"📄 Loaded balanced dataset: {df.shape[0]} samples")
 
@@ -1031,8 +942,8 @@ class AITrainingService:
 
         os.makedirs(os.path.dirname(BALANCED_CHUNKED_50_TRAIN_DATASET_PATH), exist_ok=True)
 
-        train_df.to_csv(BALANCED_CHUNKED_50_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(BALANCED_CHUNKED_50_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNKED_50_TRAIN_DATASET_PATH, BALANCED_CHUNKED_50_PATH, train_df.index)
+        self.storage.write_view(BALANCED_CHUNKED_50_TEST_DATASET_PATH, BALANCED_CHUNKED_50_PATH, test_df.index)
 
         print("\n✅ Balanced dataset split!")
         print(f"📄 Train: {BALANCED_CHUNKED_50_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
@@ -1041,10 +952,10 @@ class AITrainingService:
         return BALANCED_CHUNKED_50_TRAIN_DATASET_PATH, BALANCED_CHUNKED_50_TEST_DATASET_PATH
     
     def train_balanced_50_dataset(self):
-            if not os.path.exists(BALANCED_CHUNKED_50_PATH):
+            if not self.storage.exists(BALANCED_CHUNKED_50_PATH):
                 raise FileNotFoundError(f"Dataset not found: {BALANCED_CHUNKED_50_PATH}")
 
-            df = pd.read_csv(BALANCED_CHUNKED_50_PATH)
+            df = self.storage.read(BALANCED_CHUNKED_50_PATH)
             df = df.dropna(subset=['forteclass_sequence', 'mode', 'emotion'])
             df = df[df['forteclass_sequence'].str.len() > 0]
 
@@ -0,0 +1,100 @@
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.services.DatasetStorageService import DatasetStorageService, ROW_GROUP_SIZE
+from src.utils.ChunkUtil import chunk_bounds, ragged_positions
+
+SEQUENCE_COLUMN = "forteclass_sequence"
+
+# columns copied from the source row to each of its chunks
+CARRIED_COLUMNS = ("mode", "emotion")
+
+class ChunkingService:
+    """
+    Splits the forteclass sequences of a dataset into chunks, batch by
+    batch. Works on the Arrow list<string> column: chunk bounds come from
+    NumPy index arithmetic (ChunkUtil.chunk_bounds) and the tokens are
+    gathered with a single take per batch, then each batch is streamed to
+    the Parquet writer.
+    """
+    def __init__(self):
+        self.storage = DatasetStorageService()
+
+    def chunk_table(self, table: pa.Table, chunk_size: int, mode: str = "strict", min_size: int = None, max_size: int = None, rng=None) -> pa.Table:
+        sequences = table.column(SEQUENCE_COLUMN).combine_chunks()
+
+        if pa.types.is_string(sequences.type) or pa.types.is_large_string(sequences.type):
+            sequences = pc.split_pattern(sequences.cast(pa.string()), ",")
+
+        sequences = sequences.fill_null(pa.scalar([], type=sequences.type))
+        tokens = pc.list_flatten(sequences)
+        offsets = np.asarray(sequences.offsets, dtype=np.int64)
+        offsets = offsets - offsets[0]
+
+        # blank tokens ("a,,b") never made it into a chunk
+        kept = np.flatnonzero(np.asarray(pc.fill_null(pc.not_equal(pc.utf8_trim_whitespace(tokens), ""), False)))
+        token_rows = np.repeat(np.arange(len(sequences)), np.diff(offsets))
+        lengths = np.bincount(token_rows[kept], minlength=len(sequences))
+
+        kept_offsets = np.cumsum(lengths) - lengths
+        rows, starts, chunk_lengths = chunk_bounds(lengths, chunk_size, mode, min_size, max_size, rng)
+
+        positions = kept[ragged_positions(kept_offsets[rows] + starts, chunk_lengths)]
+        chunk_offsets = np.zeros(len(rows) + 1, dtype=np.int32)
+        np.cumsum(chunk_lengths, out=chunk_offsets[1:])
+
+        chunked = pa.ListArray.from_arrays(pa.array(chunk_offsets), tokens.take(pa.array(positions)))
+        carried = table.select([c for c in CARRIED_COLUMNS if c in table.column_names]).take(pa.array(rows))
+
+        return pa.table({
+            SEQUENCE_COLUMN: chunked,
+            "num_classes": pa.array(chunk_lengths, type=pa.int32()),
+            **{name: carried.column(name) for name in carried.column_names}
+        })
+
+    def chunk_dataset(
+        self,
+        source_path,
+        target_path,
+        chunk_size: int,
+        mode: str = "strict",
+        min_size: int = None,
+        max_size: int = None,
+        batch_size: int = ROW_GROUP_SIZE,
+        seed: int = 42
+    ) -> dict:
+        """
+        Chunks source_path into target_path and returns the run stats
+        (rows in/out, average chunk length, rows per second).
+        """
+        rng = np.random.default_rng(seed)
+        columns = [SEQUENCE_COLUMN, *CARRIED_COLUMNS]
+
+        rows_in = 0
+        total_tokens = 0
+        start = time.perf_counter()
+
+        with self.storage.writer(target_path, row_group_size=batch_size) as writer:
+            for table in self.storage.iter_tables(source_path, columns=columns, batch_size=batch_size):
+                chunks = self.chunk_table(table, chunk_size, mode, min_size, max_size, rng)
+
+                rows_in += table.num_rows
+                total_tokens += int(pc.sum(chunks.column("num_classes")).as_py() or 0)
+
+                if chunks.num_rows or writer.rows == 0:
+                    writer.write_table(chunks)
+
+        seconds = time.perf_counter() - start
+        rows_per_second = rows_in / seconds if seconds > 0 else 0.0
+
+        print(f"⚡ Chunked {rows_in} rows into {writer.rows} chunks in {seconds:.2f}s ({rows_per_second:.0f} rows/s)")
+
+        return {
+            "path": writer.target,
+            "rows_in": rows_in,
+            "rows_out": writer.rows,
+            "avg_num_classes": total_tokens / writer.rows if writer.rows else 0.0,
+            "seconds": seconds,
+            "rows_per_second": rows_per_second
+        }
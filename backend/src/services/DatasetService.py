@@ -5,11 +5,16 @@ import pretty_midi
 from pathlib import Path
 from io import BytesIO
 from tqdm import tqdm
+from src.utils.ManifestUtil import load_manifest, save_manifest, diff_files
+
+# bump when _extract_chords_by_guitar_type changes, so incremental runs reprocess every file
+EXTRACTOR_VERSION = "guitar-chords-1"
 
 class DatasetService:
     def __init__(self, midi_folder: str, output_path: str):
         self.midi_folder = Path(midi_folder)
         self.output_path = Path(output_path)
+        self.manifest_path = f"{self.output_path}.manifest.json"
         self.general_midi_guitar_names = {
             24: "Acoustic Guitar (nylon)",
             25: "Acoustic Guitar (steel)",
@@ -21,14 +26,25 @@ class DatasetService:
             31: "Guitar Harmonics"
         }
 
-    def process(self):
+    def process(self, incremental: bool = False):
         all_data = []
+        failed = set()
 
-        for file_name in tqdm(os.listdir(self.midi_folder), desc="Processing MIDI files"):
-            if not (file_name.endswith(".mid") or file_name.endswith(".midi")):
-                continue
+        midi_files = sorted(
+            file_name for file_name in os.listdir(self.midi_folder)
+            if file_name.endswith(".mid") or file_name.endswith(".midi")
+        )
+        midi_paths = [str(self.midi_folder / file_name) for file_name in midi_files]
+
+        incremental = incremental and self.output_path.exists()
+        previous_files = load_manifest(self.manifest_path).get("files", {}) if incremental else {}
+
+        changed, deleted, fingerprints = diff_files(midi_paths, previous_files, EXTRACTOR_VERSION, hash_contents=incremental)
+        if incremental:
+            print(f"🧮 Incremental run: {len(changed)} new/changed, {len(deleted)} removed, {len(midi_paths) - len(changed)} unchanged files.")
 
-            full_path = self.midi_folder / file_name
+        for full_path in tqdm(changed, desc="Processing MIDI files"):
+            file_name = os.path.basename(full_path)
 
             try:
                 with open(full_path, "rb") as f:
@@ -44,13 +60,29 @@ class DatasetService:
                         })
 
             except Exception as e:
+                failed.add(file_name)
                 print(f"Error to process: {file_name}: {e}")
 
-        if all_data:
-            df = pd.DataFrame(all_data)
+        df = pd.DataFrame(all_data, columns=["file", "program", "instrument", "chords"])
+
+        if incremental:
+            # keep rows of unchanged files, replace the ones reprocessed or removed from disk
+            stale = {os.path.basename(path) for path in changed} | set(deleted)
+            previous_df = pd.read_csv(self.output_path)
+            df = pd.concat([previous_df[~previous_df["file"].isin(stale)], df], ignore_index=True)
+
+        # an incremental run always writes: rows of deleted files must not survive
+        if len(df) > 0 or incremental:
             self.output_path.parent.mkdir(parents=True, exist_ok=True)
             df.to_csv(self.output_path, index=False)
-            print(f"Dataset saved on: {self.output_path}")
+            # files that failed are left out, so the next incremental run retries them
+            save_manifest(self.manifest_path, {
+                "files": {
+                    file_name: {**current, "extractor": EXTRACTOR_VERSION}
+                    for file_name, current in fingerprints.items() if file_name not in failed
+                }
+            })
+            print(f"Dataset saved on: {self.output_path} ({len(df)} rows)")
         else:
             print("Empty data extracted!.")
 
@@ -0,0 +1,342 @@
+import os
+import hashlib
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.utils.ManifestUtil import load_manifest, save_manifest, fingerprint
+from src.utils.SamplingUtil import BalancedBatchSampler
+
+# comma-joined Forte class strings, stored as list<string> columns
+TOKEN_COLUMNS = ("forteclass_sequence", "chord_sequence")
+TOKEN_SEPARATOR = ","
+
+INT_COLUMNS = ("num_classes", "num_chords")
+FLOAT_COLUMNS = ("bpm",)
+
+# derived on read from forteclass_sequence + mode, never stored
+NGRAMS_INPUT_COLUMN = "ngrams_input"
+
+ROW_GROUP_SIZE = 50_000
+
+# a view is <name>.view.json (base dataset + its fingerprint) and <name>.rows.npy (row indices)
+VIEW_SUFFIX = ".view.json"
+ROWS_SUFFIX = ".rows.npy"
+
+class DatasetWriter:
+    """
+    Writes a Parquet dataset batch by batch (one row group per table), so
+    producers can stream their output instead of building one DataFrame.
+    The file only replaces the target when the writer is closed without error.
+    """
+    def __init__(self, target: str, row_group_size: int = ROW_GROUP_SIZE):
+        self.target = target
+        self.tmp_path = f"{target}.tmp"
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writer = None
+
+    def write_table(self, table: pa.Table):
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.target), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.tmp_path, table.schema, compression="zstd")
+        elif not table.schema.equals(self._writer.schema):
+            table = table.cast(self._writer.schema)
+
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is None:
+            raise ValueError(f"Nothing written to {self.target}.")
+
+        self._writer.close()
+        os.replace(self.tmp_path, self.target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+class DatasetStorageService:
+    """
+    Columnar (Parquet) storage for the training datasets.
+
+    Datasets keep being addressed by their path constants; a dataset is
+    stored as <name>.parquet and a legacy <name>.csv sibling is migrated
+    once, the first time it is read. Token columns are list<string>,
+    counters int32 and bpm float32, so reads can project columns and skip
+    row groups through pyarrow filters, e.g. [("emotion", "=", "sad")].
+
+    Splits and balanced subsets are stored as views: row indices over one
+    materialized base dataset, read through the same path constants.
+    """
+    def parquet_path(self, path) -> str:
+        return str(Path(path).with_suffix(".parquet"))
+
+    def csv_path(self, path) -> str:
+        return str(Path(path).with_suffix(".csv"))
+
+    def exists(self, path) -> bool:
+        return os.path.exists(self.parquet_path(path)) or os.path.exists(self.csv_path(path)) or self.is_view(path)
+
+    def view_paths(self, path) -> tuple[str, str]:
+        stem = Path(path).with_suffix("")
+        return f"{stem}{VIEW_SUFFIX}", f"{stem}{ROWS_SUFFIX}"
+
+    def is_view(self, path) -> bool:
+        return os.path.exists(self.view_paths(path)[0])
+
+    def remove_view(self, path):
+        for view_file in self.view_paths(path):
+            if os.path.exists(view_file):
+                os.remove(view_file)
+
+    def write_view(self, path, source_path, rows) -> str:
+        """
+        Stores the given rows of source_path (positions, in the order they
+        should be read) as a view at path. Views of views are flattened, so
+        every view points at a materialized base dataset.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if self.is_view(source_path):
+            base, base_rows = self.load_view(source_path)
+            rows = np.asarray(base_rows)[rows]
+        else:
+            base = self.resolve(source_path)[0]
+
+        meta_path, rows_path = self.view_paths(path)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        with open(f"{rows_path}.tmp", "wb") as f:
+            np.save(f, rows)
+        os.replace(f"{rows_path}.tmp", rows_path)
+
+        save_manifest(meta_path, {
+            "base": os.path.relpath(base, os.path.dirname(meta_path)),
+            "base_fingerprint": fingerprint(base),
+            "rows": len(rows),
+            "rows_hash": hashlib.sha256(rows.tobytes()).hexdigest()
+        })
+
+        # a view replaces a materialized copy with the same name
+        if os.path.exists(self.parquet_path(path)):
+            os.remove(self.parquet_path(path))
+
+        return meta_path
+
+    def load_view(self, path) -> tuple[str, np.ndarray]:
+        """
+        Returns (base dataset path, memory-mapped row indices) of a view.
+        """
+        meta_path, rows_path = self.view_paths(path)
+        meta = load_manifest(meta_path)
+        base = os.path.normpath(os.path.join(os.path.dirname(meta_path), meta["base"]))
+
+        if not os.path.exists(base):
+            raise FileNotFoundError(f"Base dataset of view {meta_path} not found: {base}")
+
+        if fingerprint(base, meta["base_fingerprint"])["hash"] != meta["base_fingerprint"]["hash"]:
+            raise ValueError(f"View {meta_path} is stale: {base} changed after it was created.")
+
+        return base, np.load(rows_path, mmap_mode="r")
+
+    def to_table(self, df: pd.DataFrame) -> pa.Table:
+        df = df.reset_index(drop=True)
+
+        if NGRAMS_INPUT_COLUMN in df.columns and {"forteclass_sequence", "mode"} <= set(df.columns):
+            df = df.drop(columns=[NGRAMS_INPUT_COLUMN])
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        for i, name in enumerate(table.column_names):
+            column = table.column(i)
+
+            if name in TOKEN_COLUMNS and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+                column = pc.split_pattern(column.cast(pa.string()), TOKEN_SEPARATOR)
+            elif name in INT_COLUMNS:
+                column = column.cast(pa.int32())
+            elif name in FLOAT_COLUMNS:
+                column = column.cast(pa.float32())
+            else:
+                continue
+
+            table = table.set_column(i, name, column)
+
+        # pandas metadata would still describe token columns as strings
+        return table.replace_schema_metadata(None)
+
+    def write(self, df: pd.DataFrame, path, row_group_size: int = ROW_GROUP_SIZE) -> str:
+        target = self.parquet_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        tmp_path = f"{target}.tmp"
+        pq.write_table(self.to_table(df), tmp_path, row_group_size=row_group_size, compression="zstd")
+        os.replace(tmp_path, target)
+        self.remove_view(path)
+
+        return target
+
+    def writer(self, path, row_group_size: int = ROW_GROUP_SIZE) -> DatasetWriter:
+        self.remove_view(path)
+        return DatasetWriter(self.parquet_path(path), row_group_size=row_group_size)
+
+    def resolve(self, path, columns=None) -> tuple[str, list]:
+        """
+        Parquet path of a dataset (migrating a legacy CSV first) and the
+        stored columns to load for the requested ones.
+        """
+        source = self.parquet_path(path)
+
+        if not os.path.exists(source):
+            if not os.path.exists(self.csv_path(path)):
+                raise FileNotFoundError(f"Dataset not found: {source}")
+            self.migrate_csv(self.csv_path(path))
+
+        if columns is None:
+            return source, None
+
+        stored = set(pq.read_schema(source).names)
+        wanted = [c for c in columns if c in stored]
+
+        # ngrams_input is rebuilt from its sources
+        if NGRAMS_INPUT_COLUMN in columns and NGRAMS_INPUT_COLUMN not in stored:
+            wanted += [c for c in ("forteclass_sequence", "mode") if c not in wanted]
+
+        return source, wanted
+
+    def read_table(self, path, columns=None, filters=None) -> pa.Table:
+        if self.is_view(path):
+            base, rows = self.load_view(path)
+
+            # filters may use columns outside the projection, to_frame selects afterwards
+            table = self.read_table(base, columns=None if filters else columns).take(pa.array(rows))
+            return table.filter(pq.filters_to_expression(filters)) if filters else table
+
+        source, wanted = self.resolve(path, columns)
+        return pq.read_table(source, columns=wanted, filters=filters)
+
+    def iter_tables(self, path, columns=None, filters=None, batch_size: int = ROW_GROUP_SIZE):
+        """
+        Streams the dataset as Arrow tables of at most batch_size rows,
+        without loading the whole file.
+        """
+        if self.is_view(path):
+            for batch in self.read_table(path, columns=columns, filters=filters).to_batches(max_chunksize=batch_size):
+                if batch.num_rows:
+                    yield pa.Table.from_batches([batch])
+            return
+
+        source, wanted = self.resolve(path, columns)
+        expression = pq.filters_to_expression(filters) if filters else None
+
+        for batch in ds.dataset(source, format="parquet").to_batches(columns=wanted, filter=expression, batch_size=batch_size):
+            if batch.num_rows:
+                yield pa.Table.from_batches([batch])
+
+    def read(self, path, columns=None, filters=None, tokens: str = "string") -> pd.DataFrame:
+        """
+        tokens="string" returns token columns comma-joined (the CSV format the
+        training code expects), tokens="list" keeps them as lists.
+        """
+        table = self.read_table(path, columns=columns, filters=filters)
+        return self.to_frame(table, columns=columns, tokens=tokens)
+
+    def iter_batches(self, path, columns=None, filters=None, batch_size: int = ROW_GROUP_SIZE, tokens: str = "string"):
+        for table in self.iter_tables(path, columns=columns, filters=filters, batch_size=batch_size):
+            yield self.to_frame(table, columns=columns, tokens=tokens)
+
+    def take_rows(self, path, rows, columns=None) -> pa.Table:
+        """
+        Rows of a dataset or view in the given order, read row group by row
+        group: only the groups holding them are decoded, one at a time.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if self.is_view(path):
+            base, view_rows = self.load_view(path)
+            return self.take_rows(base, view_rows[rows], columns=columns)
+
+        source, wanted = self.resolve(path, columns)
+        parquet = pq.ParquetFile(source)
+        starts = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)])
+
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        groups = np.searchsorted(starts, sorted_rows, side="right") - 1
+
+        parts = [
+            parquet.read_row_group(int(group), columns=wanted).take(pa.array(sorted_rows[groups == group] - starts[group]))
+            for group in np.unique(groups)
+        ]
+        if not parts:
+            return parquet.schema_arrow.empty_table().select(wanted or parquet.schema_arrow.names)
+
+        # back from row order to the requested order
+        return pa.concat_tables(parts).take(pa.array(np.argsort(order)))
+
+    def iter_balanced_batches(self, path, batch_size: int, label_column: str = "emotion", columns=None, replacement: bool = False, seed: int = 42, tokens: str = "string"):
+        """
+        Class-balanced batches drawn on the fly from a dataset or view, see
+        BalancedBatchSampler. Only the label column is read up front, every
+        batch reads its own rows (take_rows).
+        """
+        labels = self.read(path, columns=[label_column])[label_column].to_numpy()
+
+        for rows in BalancedBatchSampler(labels, batch_size, replacement=replacement, seed=seed):
+            yield self.to_frame(self.take_rows(path, rows, columns=columns), columns=columns, tokens=tokens)
+
+    def to_frame(self, table: pa.Table, columns=None, tokens: str = "string") -> pd.DataFrame:
+        if tokens not in ("string", "list"):
+            raise ValueError("tokens must be 'string' or 'list'.")
+
+        sequence_as_string = None
+
+        for i, name in enumerate(table.column_names):
+            if name in TOKEN_COLUMNS and (pa.types.is_list(table.column(i).type) or pa.types.is_large_list(table.column(i).type)):
+                joined = pc.binary_join(table.column(i), TOKEN_SEPARATOR)
+
+                if name == "forteclass_sequence":
+                    sequence_as_string = joined
+
+                if tokens == "string":
+                    table = table.set_column(i, name, joined)
+
+        df = table.to_pandas()
+
+        wants_ngrams = columns is None or NGRAMS_INPUT_COLUMN in columns
+        if wants_ngrams and NGRAMS_INPUT_COLUMN not in df.columns and sequence_as_string is not None and "mode" in df.columns:
+            df[NGRAMS_INPUT_COLUMN] = pd.Series(sequence_as_string.to_pandas()) + " | " + df["mode"]
+
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+
+        return df
+
+    def migrate_csv(self, csv_path) -> str:
+        print(f"📦 Migrating {csv_path} to Parquet...")
+        df = pd.read_csv(csv_path)
+        target = self.write(df, csv_path)
+        print(f"✅ Saved: {target}")
+
+        return target
+
+    def migrate_directory(self, directory) -> list:
+        migrated = []
+
+        for csv_path in sorted(Path(directory).glob("*.csv")):
+            if not os.path.exists(self.parquet_path(csv_path)):
+                migrated.append(self.migrate_csv(csv_path))
+
+        return migrated
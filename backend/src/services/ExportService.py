@@ -0,0 +1,165 @@
+import os
+import re
+import json
+from pathlib import Path
+from src.services.MidiService import MidiService
+from src.utils.CacheUtil import LRUCache, content_hash
+
+BASE_DIR = Path(__file__).resolve().parent
+
+EXPORT_CACHE_SIZE = int(os.getenv("EXPORT_CACHE_SIZE", "32"))
+# MIDI bytes of the analyses, shared by every worker of the host: the memory
+# cache below is per process, so a content_hash issued by one uvicorn worker
+# is answered by another one from here (re-parsing the MIDI, no transcription)
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", str((BASE_DIR / '..' / 'export-cache').resolve()))
+EXPORT_CACHE_DISK_SIZE = int(os.getenv("EXPORT_CACHE_DISK_SIZE", "256"))
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# analysed MidiService instances keyed by the sha256 of their MIDI bytes.
+# MidiService memoizes its music21 score and MusicXML rendering, so a download
+# after an analysis only pays for the conversion once.
+_analysis_cache = LRUCache(maxsize=EXPORT_CACHE_SIZE)
+# sha256 of an uploaded file -> content hash of its analysis
+_upload_index = LRUCache(maxsize=EXPORT_CACHE_SIZE * 4)
+
+class ExportService:
+    def __init__(self, cache_dir: str = EXPORT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def disk_paths(self, key: str) -> dict:
+        return {
+            "midi": os.path.join(self.cache_dir, f"{key}.mid"),
+            "meta": os.path.join(self.cache_dir, f"{key}.json"),
+            "upload": os.path.join(self.cache_dir, f"{key}.upload")
+        }
+
+    def upload_key(self, file) -> str:
+        """
+        sha256 of an uploaded file's bytes, so an upload analysed before is
+        found without building its MidiService again.
+        """
+        file.file.seek(0)
+        key = content_hash(file.file.read())
+        file.file.seek(0)
+
+        return key
+
+    def remember(self, midi_service: MidiService, upload_key: str = None) -> str:
+        key = midi_service.get_content_hash()
+
+        if key not in _analysis_cache:
+            _analysis_cache.set(key, midi_service)
+            self._save(key, midi_service)
+
+        if upload_key:
+            _upload_index.set(upload_key, key)
+            self._write(self.disk_paths(upload_key)["upload"], key.encode("utf-8"))
+
+        return key
+
+    def find(self, content_hash: str):
+        if not content_hash or not _HASH_RE.match(content_hash):
+            return None
+
+        midi_service = _analysis_cache.get(content_hash)
+        if midi_service is None:
+            midi_service = self._load(content_hash)
+
+        return midi_service
+
+    def find_upload(self, upload_key: str):
+        if not upload_key or not _HASH_RE.match(upload_key):
+            return None
+
+        key = _upload_index.get(upload_key)
+
+        if key is None:
+            path = self.disk_paths(upload_key)["upload"]
+            if not os.path.exists(path):
+                return None
+
+            with open(path, "r", encoding="utf-8") as f:
+                key = f.read().strip()
+            _upload_index.set(upload_key, key)
+
+        return self.find(key)
+
+    def resolve(self, midi_service: MidiService, upload_key: str = None) -> MidiService:
+        # Reuse an already analysed service for the same MIDI content, if any
+        cached = self.find(midi_service.get_content_hash())
+
+        if cached is not None:
+            if upload_key:
+                self.remember(cached, upload_key)
+            return cached
+
+        self.remember(midi_service, upload_key)
+        return midi_service
+
+    def stats(self) -> dict:
+        return _analysis_cache.stats()
+
+    def _save(self, key: str, midi_service: MidiService):
+        paths = self.disk_paths(key)
+
+        if os.path.exists(paths["midi"]):
+            return
+
+        try:
+            self._write(paths["meta"], json.dumps({"bpm": midi_service.get_estimated_bpm()}).encode("utf-8"))
+            # written last: marks the entry as complete
+            self._write(paths["midi"], midi_service.to_midi_bytes())
+            self._prune()
+        except OSError as e:
+            print(f"⚠️ Could not save analysis {key[:12]} to {self.cache_dir}: {e}")
+
+    def _load(self, key: str):
+        paths = self.disk_paths(key)
+
+        if not os.path.exists(paths["midi"]):
+            return None
+
+        with open(paths["midi"], "rb") as f:
+            midi_bytes = f.read()
+
+        bpm = None
+        if os.path.exists(paths["meta"]):
+            with open(paths["meta"], "r", encoding="utf-8") as f:
+                bpm = json.load(f).get("bpm")
+
+        # the stored bpm skips the synthesis-based tempo estimation
+        midi_service = MidiService(midi_data=midi_bytes, bpm=bpm)
+        _analysis_cache.set(key, midi_service)
+
+        return midi_service
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _prune(self):
+        # oldest analyses beyond EXPORT_CACHE_DISK_SIZE, with their metadata
+        entries = sorted(
+            (os.path.getmtime(os.path.join(self.cache_dir, name)), name[:-len(".mid")])
+            for name in os.listdir(self.cache_dir) if name.endswith(".mid")
+        )
+
+        stale = [self.disk_paths(key) for _, key in entries[:max(0, len(entries) - EXPORT_CACHE_DISK_SIZE)]]
+        stale = [path for paths in stale for path in (paths["midi"], paths["meta"])]
+
+        uploads = sorted(
+            (os.path.getmtime(os.path.join(self.cache_dir, name)), name)
+            for name in os.listdir(self.cache_dir) if name.endswith(".upload")
+        )
+        stale += [os.path.join(self.cache_dir, name) for _, name in uploads[:max(0, len(uploads) - EXPORT_CACHE_DISK_SIZE * 4)]]
+
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
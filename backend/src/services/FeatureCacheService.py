@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+import numpy as np
+import joblib
+import scipy.sparse as sp
+from sklearn.base import clone
+from src.utils.TokenUtil import TokenSequences, Vocabulary
+from src.utils.JobUtil import report_stage
+
+BASE_DIR = Path(__file__).resolve().parent
+FEATURE_CACHE_DIR = os.getenv(
+    "FEATURE_CACHE_DIR",
+    str((BASE_DIR / '..' / 'final-dataset' / 'feature-cache').resolve())
+)
+
+# oldest entries are removed past this size, 0 disables the limit
+FEATURE_CACHE_MAX_MB = int(os.getenv("FEATURE_CACHE_MAX_MB", "4096"))
+
+# params that change how a transformer runs, not what it produces
+IGNORED_PARAMS = ("n_jobs", "verbose", "copy", "chunk_rows")
+
+class FeatureCacheService:
+    """
+    Persists the fitted transformers of a pipeline (vectorizer, LDA) and the
+    matrices they produce, so refitting only the classifier, or evaluating it
+    again, does not recompute the features.
+
+    Entries are content-addressed: a fitted step is keyed by the hash of its
+    input data plus the class and params of every step up to it, so changing
+    the LDA params reuses the cached n-gram counts. A transform of new data
+    (the test set) is keyed by the fitted step's key, its current params
+    (e.g. serve-time LDA inference settings) and the key of its input.
+    Each entry is <key>.joblib (fitted step) and <key>.npz / <key>.npy
+    (sparse / dense output).
+    """
+    def __init__(self, cache_dir: str = FEATURE_CACHE_DIR, max_mb: int = FEATURE_CACHE_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def data_hash(self, X) -> str:
+        digest = hashlib.sha256()
+
+        if isinstance(X, TokenSequences):
+            digest.update(b"tokens")
+            digest.update(np.ascontiguousarray(X.tokens).tobytes())
+            digest.update(np.ascontiguousarray(X.offsets).tobytes())
+            # ids are append-only, so the same ids mean the same tokens
+            digest.update(str(len(X.vocabulary) if X.vocabulary is not None else 0).encode())
+        elif sp.issparse(X):
+            X = X.tocsr()
+            digest.update(f"csr{X.shape}{X.dtype}".encode())
+            for part in (X.data, X.indices, X.indptr):
+                digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(X, np.ndarray) and X.dtype != object:
+            digest.update(f"array{X.shape}{X.dtype}".encode())
+            digest.update(np.ascontiguousarray(X).tobytes())
+        else:
+            digest.update(b"text")
+            for value in X:
+                digest.update(str(value).encode("utf-8"))
+                digest.update(b"\x00")
+
+        return digest.hexdigest()
+
+    def step_params(self, step) -> dict:
+        params = {}
+
+        for name, value in step.get_params(deep=False).items():
+            if name in IGNORED_PARAMS:
+                continue
+            # objects (e.g. a Vocabulary) have no stable repr, use their content
+            if isinstance(value, Vocabulary):
+                value = hashlib.sha256("\x00".join(value.tokens).encode("utf-8")).hexdigest()
+            params[name] = value
+
+        return params
+
+    def step_key(self, previous_key: str, step) -> str:
+        payload = json.dumps({
+            "input": previous_key,
+            "class": f"{type(step).__module__}.{type(step).__name__}",
+            "params": self.step_params(step)
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def transform_key(self, step, input_key: str) -> str:
+        params = json.dumps(self.step_params(step), sort_keys=True, default=str)
+        return hashlib.sha256(f"transform:{step.feature_cache_key_}:{params}:{input_key}".encode("utf-8")).hexdigest()
+
+    def entry_paths(self, key: str) -> dict:
+        stem = os.path.join(self.cache_dir, key[:2], key)
+        return {"step": f"{stem}.joblib", "sparse": f"{stem}.npz", "dense": f"{stem}.npy"}
+
+    def has_output(self, key: str) -> bool:
+        paths = self.entry_paths(key)
+        return os.path.exists(paths["sparse"]) or os.path.exists(paths["dense"])
+
+    def load_output(self, key: str):
+        paths = self.entry_paths(key)
+
+        for kind in ("sparse", "dense"):
+            if os.path.exists(paths[kind]):
+                os.utime(paths[kind])
+                return sp.load_npz(paths[kind]) if kind == "sparse" else np.load(paths[kind])
+
+        return None
+
+    def save_output(self, key: str, output):
+        paths = self.entry_paths(key)
+        os.makedirs(os.path.dirname(paths["sparse"]), exist_ok=True)
+
+        kind = "sparse" if sp.issparse(output) else "dense"
+        tmp_path = f"{paths[kind]}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            if kind == "sparse":
+                sp.save_npz(f, output.tocsr(), compressed=False)
+            else:
+                np.save(f, np.asarray(output))
+        os.replace(tmp_path, paths[kind])
+
+    def load_step(self, key: str):
+        path = self.entry_paths(key)["step"]
+
+        if not os.path.exists(path):
+            return None
+
+        os.utime(path)
+        return joblib.load(path)
+
+    def save_step(self, key: str, step):
+        path = self.entry_paths(key)["step"]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        joblib.dump(step, tmp_path)
+        os.replace(tmp_path, path)
+
+    def fit_transform(self, steps: list, X, y=None) -> tuple[list, object]:
+        """
+        Fits the (name, transformer) steps in order on X, reusing cached fits
+        and outputs. Returns (fitted steps, output of the last step). Fitted
+        steps carry feature_cache_key_ so transform() can cache their outputs.
+        """
+        keys = []
+        key = self.data_hash(X)
+        for _, step in steps:
+            key = self.step_key(key, step)
+            keys.append(key)
+
+        # deepest step whose fit (and the fits before it) and output are cached;
+        # only its output is loaded, the earlier ones are not needed
+        cached = 0
+        while cached < len(steps) and os.path.exists(self.entry_paths(keys[cached])["step"]):
+            cached += 1
+        while cached > 0 and not self.has_output(keys[cached - 1]):
+            cached -= 1
+
+        fitted = [(name, self.load_step(key)) for (name, _), key in zip(steps[:cached], keys)]
+        current = X
+
+        if cached:
+            print(f"♻️ [{steps[cached - 1][0]}] features loaded from cache ({keys[cached - 1][:12]})")
+            report_stage(steps[cached - 1][0], cached=True)
+            current = self.load_output(keys[cached - 1])
+
+        for (name, step), key in zip(steps[cached:], keys[cached:]):
+            print(f"🔧 [{name}] fitting...")
+            report_stage(name, cached=False)
+            start = time.perf_counter()
+            step = clone(step)
+            current = step.fit_transform(current, y)
+            step.feature_cache_key_ = key
+            print(f"✅ [{name}] fitted in {time.perf_counter() - start:.1f}s")
+
+            self.save_step(key, step)
+            self.save_output(key, current)
+            fitted.append((name, step))
+
+        self.prune()
+        return fitted, current
+
+    def transform(self, steps: list, X):
+        """
+        Runs X through fitted (name, transformer) steps, reusing the outputs
+        cached for the same data. Steps fitted outside the cache are just run.
+        """
+        # chained: a step's output changes when any step before it does
+        keys = []
+        key = self.data_hash(X)
+        for _, step in steps:
+            key = self.transform_key(step, key) if key is not None and hasattr(step, "feature_cache_key_") else None
+            keys.append(key)
+
+        # resume after the deepest cached output (uncached steps cannot be skipped)
+        start = 0
+        for i, key in enumerate(keys):
+            if key is None:
+                break
+            if self.has_output(key):
+                start = i + 1
+
+        current = X
+        if start:
+            print(f"♻️ [{steps[start - 1][0]}] features loaded from cache ({keys[start - 1][:12]})")
+            report_stage(steps[start - 1][0], cached=True)
+            current = self.load_output(keys[start - 1])
+
+        for (name, step), key in zip(steps[start:], keys[start:]):
+            report_stage(name, cached=False)
+            current = step.transform(current)
+
+            if key is not None:
+                self.save_output(key, current)
+
+        self.prune()
+        return current
+
+    def size(self) -> int:
+        total = 0
+
+        for root, _, files in os.walk(self.cache_dir):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+
+        return total
+
+    def prune(self):
+        """
+        Removes the least recently used entries while the cache is over its
+        size limit.
+        """
+        if self.max_bytes <= 0 or not os.path.isdir(self.cache_dir):
+            return
+
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                os.remove(os.path.join(root, name))
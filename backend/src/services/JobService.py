@@ -0,0 +1,365 @@
+import os
+import sys
+import json
+import fcntl
+import time
+import uuid
+import signal
+import importlib
+import threading
+import multiprocessing
+from pathlib import Path
+from contextlib import contextmanager
+from src.utils.JobUtil import set_reporter, job_cores
+
+BASE_DIR = Path(__file__).resolve().parent
+JOBS_DIR = os.getenv("JOBS_DIR", str((BASE_DIR / '..' / 'jobs').resolve()))
+
+# cores kept for the serving workers, jobs never run on them
+SERVING_RESERVED_CORES = int(os.getenv("SERVING_RESERVED_CORES", "2"))
+# max cores per job (0 = every non-reserved core)
+JOB_CPU_BUDGET = int(os.getenv("JOB_CPU_BUDGET", "0"))
+JOB_NICE = int(os.getenv("JOB_NICE", "10"))
+# running jobs per host, shared by every serving worker (lock files in JOBS_DIR)
+JOB_MAX_CONCURRENT = int(os.getenv("JOB_MAX_CONCURRENT", "1"))
+# seconds between attempts of a queued job to get a slot
+JOB_SLOT_POLL_SECONDS = float(os.getenv("JOB_SLOT_POLL_SECONDS", "0.5"))
+
+# job type -> (module, class, method)
+JOB_TYPES = {
+    "train-full": ("src.services.RFTrainingService", "RFTrainingService", "train_full_dataset"),
+    "evaluate-full": ("src.services.RFTrainingService", "RFTrainingService", "evaluate_final_rf"),
+    "truncation-curve": ("src.services.RFTrainingService", "RFTrainingService", "forest_truncation_curve"),
+    "incremental-update": ("src.services.RFTrainingService", "RFTrainingService", "update_full_model"),
+    "export-engines": ("src.services.RFTrainingService", "RFTrainingService", "export_serving_engines"),
+    "export-reduced": ("src.services.RFTrainingService", "RFTrainingService", "export_reduced_engine"),
+    "train-balanced": ("src.services.ModelTrainingService", "ModelTrainingService", "train_balanced_dataset"),
+    "pipeline": ("src.services.PipelineService", "PipelineService", "run_pipeline")
+}
+
+FINISHED = ("done", "failed", "cancelled")
+
+def _limit_cpu(cores: list):
+    # before numpy/sklearn start their thread pools
+    count = str(len(cores))
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "LOKY_MAX_CPU_COUNT"):
+        os.environ[var] = count
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    try:
+        os.nice(JOB_NICE)
+    except OSError:
+        pass
+
+def _run_job(job_type: str, kwargs: dict, cores: list, log_path: str, events):
+    """
+    Entry point of the job process. Runs in its own session so cancelling
+    also stops the joblib workers it started.
+    """
+    os.setsid()
+    _limit_cpu(cores)
+
+    log = open(log_path, "a", buffering=1, encoding="utf-8")
+    sys.stdout = sys.stderr = log
+
+    set_reporter(lambda stage, info: events.put({"type": "stage", "stage": stage, "info": info, "at": time.time()}))
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(len(cores))
+
+        module_name, class_name, method = JOB_TYPES[job_type]
+        service = getattr(importlib.import_module(module_name), class_name)()
+        result = getattr(service, method)(**kwargs)
+
+        events.put({"type": "result", "result": json.loads(json.dumps(result, default=str))})
+    except BaseException as e:
+        print(f"❌ {type(e).__name__}: {e}")
+        events.put({"type": "error", "error": f"{type(e).__name__}: {e}"})
+        raise
+    finally:
+        log.flush()
+
+class JobService:
+    """
+    Runs training/evaluation as background jobs, each in its own process
+    pinned to the cores outside SERVING_RESERVED_CORES (and niced), so the
+    serving workers keep their share of the CPU. Jobs report their stages,
+    write their output to <JOBS_DIR>/<id>.log and can be cancelled.
+    The job state is mirrored to <JOBS_DIR>/<id>.json, so any worker can
+    report on it, and at most JOB_MAX_CONCURRENT jobs run at once across
+    the workers sharing JOBS_DIR.
+    """
+    _jobs = {}
+    _lock = threading.Lock()
+
+    def __init__(self, jobs_dir: str = JOBS_DIR):
+        self.jobs_dir = jobs_dir
+
+    def job_paths(self, job_id: str) -> dict:
+        return {
+            "state": os.path.join(self.jobs_dir, f"{job_id}.json"),
+            "log": os.path.join(self.jobs_dir, f"{job_id}.log"),
+            # written by a worker cancelling a job it doesn't supervise
+            "cancel": os.path.join(self.jobs_dir, f"{job_id}.cancel")
+        }
+
+    def save_state(self, job: dict):
+        path = self.job_paths(job["id"])["state"]
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def update(self, job_id: str, **changes) -> dict:
+        self._adopt_cancel(job_id)
+
+        with self._lock:
+            job = self._jobs[job_id]
+            # a cancelled job stays cancelled, whatever its process did next
+            if job["status"] == "cancelled":
+                changes.pop("status", None)
+            job.update(changes)
+            snapshot = dict(job)
+
+        self.save_state(snapshot)
+        return snapshot
+
+    def _adopt_cancel(self, job_id: str) -> bool:
+        """
+        Picks up a cancel requested from another worker, which can't reach
+        the supervisor of this job: it leaves a marker next to the state file
+        (the state itself is rewritten by every update of the supervisor).
+        Returns True when the job just switched to cancelled.
+        """
+        if not os.path.exists(self.job_paths(job_id)["cancel"]):
+            return False
+
+        with self._lock:
+            job = self._jobs[job_id]
+            if job["status"] == "cancelled":
+                return False
+            job["status"] = "cancelled"
+
+        print(f"🛑 Job {job_id} cancelled by another worker")
+        return True
+
+    def submit(self, job_type: str, **kwargs) -> dict:
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type '{job_type}'. Available: {list(JOB_TYPES)}")
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "type": job_type,
+            "kwargs": kwargs,
+            "status": "queued",
+            "stage": None,
+            "stages": [],
+            "cores": job_cores(SERVING_RESERVED_CORES, JOB_CPU_BUDGET),
+            "pid": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+
+        with self._lock:
+            self._jobs[job["id"]] = job
+
+        self.save_state(job)
+        threading.Thread(target=self._supervise, args=(job["id"],), daemon=True).start()
+
+        print(f"🗂️ Job {job['id']} ({job_type}) queued on cores {job['cores']}")
+        return dict(job)
+
+    @contextmanager
+    def _slot(self, job_id: str):
+        """
+        Holds one of the JOB_MAX_CONCURRENT slots: an flock on
+        <JOBS_DIR>/slot-<i>.lock, so the limit holds across worker processes
+        and a slot is released with its process, even on a crash. Yields
+        False instead when the job is cancelled while waiting for one.
+        """
+        while True:
+            for i in range(max(1, JOB_MAX_CONCURRENT)):
+                lock_file = open(os.path.join(self.jobs_dir, f"slot-{i}.lock"), "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    continue
+
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+                return
+
+            self._adopt_cancel(job_id)
+            if self.get(job_id)["status"] == "cancelled":
+                yield False
+                return
+
+            time.sleep(JOB_SLOT_POLL_SECONDS)
+
+    def _supervise(self, job_id: str):
+        process = None
+
+        with self._slot(job_id) as acquired:
+            self._adopt_cancel(job_id)
+            job = self.get(job_id)
+
+            # a job cancelled while queued never starts, it is finished below
+            if acquired and job["status"] == "queued":
+                process = self._start(job_id, job)
+
+        # the process may have been stopped by a cancel persisted elsewhere
+        self._adopt_cancel(job_id)
+        job = self.get(job_id)
+        if job["status"] == "cancelled":
+            self.update(job_id, finished_at=time.time())
+        elif job["result"] is not None or (process.exitcode == 0 and job["error"] is None):
+            self.update(job_id, status="done", finished_at=time.time())
+        else:
+            self.update(job_id, status="failed", error=job["error"] or f"exit code {process.exitcode}", finished_at=time.time())
+
+        print(f"🏁 Job {job_id} {self.get(job_id)['status']}")
+
+    def _start(self, job_id: str, job: dict):
+        """
+        Runs the job process and applies its events until it exits.
+        """
+        # spawn: a fresh interpreter, nothing inherited from the server threads
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        process = context.Process(
+            target=_run_job,
+            args=(job["type"], job["kwargs"], job["cores"], self.job_paths(job_id)["log"], events),
+            daemon=False
+        )
+        process.start()
+
+        with self._lock:
+            cancelled = self._jobs[job_id]["status"] == "cancelled"
+
+        if cancelled:
+            self.update(job_id, pid=process.pid)
+            self._terminate(process.pid)
+        else:
+            self.update(job_id, status="running", pid=process.pid, started_at=time.time())
+
+        while process.is_alive() or not events.empty():
+            try:
+                event = events.get(timeout=0.5)
+            except Exception:
+                # the other worker could not stop a process started after its cancel
+                if self._adopt_cancel(job_id) and process.is_alive():
+                    self._terminate(process.pid)
+                continue
+            self._apply(job_id, event)
+
+        process.join()
+        return process
+
+    def _terminate(self, pid: int):
+        # the job leads its own process group (joblib workers included),
+        # unless it is cancelled before it got to call setsid()
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def _apply(self, job_id: str, event: dict):
+        if event["type"] == "stage":
+            with self._lock:
+                stages = self._jobs[job_id]["stages"] + [{"stage": event["stage"], "at": event["at"], **event["info"]}]
+            self.update(job_id, stage=event["stage"], stages=stages)
+        elif event["type"] == "result":
+            self.update(job_id, result=event["result"])
+        elif event["type"] == "error":
+            self.update(job_id, error=event["error"])
+
+    def get(self, job_id: str) -> dict:
+        with self._lock:
+            if job_id in self._jobs:
+                return dict(self._jobs[job_id])
+
+        path = self.job_paths(job_id)["state"]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Job not found: {job_id}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self) -> list:
+        if not os.path.isdir(self.jobs_dir):
+            return []
+
+        ids = [name[:-len(".json")] for name in os.listdir(self.jobs_dir) if name.endswith(".json")]
+        return sorted((self.get(job_id) for job_id in ids), key=lambda job: job["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> dict:
+        job = self.get(job_id)
+
+        if job["status"] in FINISHED:
+            return job
+
+        if job_id in self._jobs:
+            self.update(job_id, status="cancelled")
+        else:
+            with open(self.job_paths(job_id)["cancel"], "w", encoding="utf-8") as f:
+                f.write(str(time.time()))
+            job.update(status="cancelled", finished_at=time.time())
+            self.save_state(job)
+
+        if job["pid"]:
+            self._terminate(job["pid"])
+
+        print(f"🛑 Job {job_id} cancelled")
+        return self.get(job_id)
+
+    def read_log(self, job_id: str, offset: int = 0, limit: int = 1 << 16) -> dict:
+        """
+        Log text from byte offset on, and the offset to continue from.
+        """
+        self.get(job_id)
+        path = self.job_paths(job_id)["log"]
+
+        if not os.path.exists(path):
+            return {"text": "", "offset": offset}
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(limit)
+
+        return {"text": data.decode("utf-8", errors="replace"), "offset": offset + len(data)}
+
+    def follow_log(self, job_id: str, poll_seconds: float = 0.5):
+        """
+        Yields the log as it is written, until the job has finished.
+        """
+        offset = 0
+
+        while True:
+            chunk = self.read_log(job_id, offset)
+            offset = chunk["offset"]
+
+            if chunk["text"]:
+                yield chunk["text"]
+            elif self.get(job_id)["status"] in FINISHED:
+                tail = self.read_log(job_id, offset)
+                if tail["text"]:
+                    yield tail["text"]
+                return
+            else:
+                time.sleep(poll_seconds)
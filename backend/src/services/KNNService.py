@@ -3,10 +3,14 @@ import pandas as pd
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.pipeline import Pipeline
 from sklearn.neighbors import KNeighborsClassifier
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import Normalizer
 from sklearn.metrics import classification_report, accuracy_score
 from pathlib import Path
 import joblib
 import time
+from src.utils.PredictionUtil import predict_emotions
+from src.utils.AnnUtil import AnnKNeighborsClassifier
 
 BASE_DIR = Path(__file__).resolve().parent                    # /app/src/services
 MODELS_DIR = (BASE_DIR / '..' / 'AIModels').resolve()         # /app/src/AIModels
@@ -17,14 +21,31 @@ TRAIN_DATASET_PATH = (DATASET_DIR / 'train_dataset.csv').resolve()
 TEST_DATASET_PATH = (DATASET_DIR / 'test_dataset.csv').resolve()
 
 MODEL_FILE = os.path.join(MODELS_DIR, "emotion_knn_model.pkl")
+ANN_MODEL_FILE = os.path.join(MODELS_DIR, "emotion_knn_ann_model.pkl")
+
+# "exact": brute-force KNeighborsClassifier over the n-gram counts,
+# "ann": IVF index (AnnUtil) over SVD-reduced, L2-normalized counts
+KNN_BACKEND = os.getenv("KNN_BACKEND", "exact")
+KNN_ANN_COMPONENTS = int(os.getenv("KNN_ANN_COMPONENTS", "64"))
+# lists scanned per query, more = better recall, slower
+KNN_ANN_PROBE = int(os.getenv("KNN_ANN_PROBE", "8"))
 
 
 class KNNService:
-    def __init__(self, train_path: str = TRAIN_DATASET_PATH, test_path: str = TEST_DATASET_PATH):
+    def __init__(self, train_path: str = TRAIN_DATASET_PATH, test_path: str = TEST_DATASET_PATH, model=None, backend: str = None):
         self.train_path = os.path.abspath(train_path)
         self.test_path = os.path.abspath(test_path)
-        self.model_path = os.path.abspath(MODEL_FILE)
-        self._emotion_model = None
+        self.backend = backend or KNN_BACKEND
+
+        if self.backend not in ("exact", "ann"):
+            raise ValueError(f"Unknown KNN backend '{self.backend}'. Available: ['exact', 'ann']")
+
+        self.model_path = os.path.abspath(ANN_MODEL_FILE if self.backend == "ann" else MODEL_FILE)
+        self._emotion_model = model
+
+        # preloaded pipeline (ModelPoolService), nothing to load
+        if model is not None:
+            return
 
         # Try loading existing model; train if not available or corrupted
         if os.path.exists(self.model_path):
@@ -58,12 +79,21 @@ class KNNService:
         print(f"Training with {len(X_train)} samples")
         print(f"Unique emotions: {sorted(y_train.unique())}")
 
-        self._emotion_model = Pipeline([
-            ("vect", CountVectorizer(token_pattern=r'[^,]+', lowercase=False)),
-            ("clf", KNeighborsClassifier(n_neighbors=5, weights='distance', metric='minkowski'))
-        ])
+        if self.backend == "ann":
+            # index built once here and saved with the pipeline
+            self._emotion_model = Pipeline([
+                ("vect", CountVectorizer(token_pattern=r'[^,]+', lowercase=False)),
+                ("svd", TruncatedSVD(n_components=KNN_ANN_COMPONENTS, random_state=42)),
+                ("norm", Normalizer()),
+                ("clf", AnnKNeighborsClassifier(n_neighbors=5, weights='distance', n_probe=KNN_ANN_PROBE))
+            ])
+        else:
+            self._emotion_model = Pipeline([
+                ("vect", CountVectorizer(token_pattern=r'[^,]+', lowercase=False)),
+                ("clf", KNeighborsClassifier(n_neighbors=5, weights='distance', metric='minkowski'))
+            ])
 
-        print("Training KNN emotion model...")
+        print(f"Training KNN emotion model ({self.backend})...")
         start_time = time.time()
         self._emotion_model.fit(X_train, y_train)
         print(f"✅ KNN model trained in {time.time() - start_time:.2f} seconds")
@@ -98,15 +128,22 @@ class KNNService:
             "emotion_predictions": y_pred
         }
 
-    def predict(self, forteclass_sequence: str) -> str:
-        """Predict emotion based on forteclass sequence"""
-        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
+    def predict_emotions(self, forteclass_sequences: list) -> list:
+        """
+        {"emotion", "probabilities"} of every sequence, from a single pass
+        of the model over the batch.
+        """
+        if any(not s or len(s.strip()) == 0 for s in forteclass_sequences):
             raise ValueError("Invalid or empty forteclass sequence")
 
         if self._emotion_model is None:
             raise ValueError("Model has not been trained or loaded")
 
-        return self._emotion_model.predict([forteclass_sequence])[0]
+        return predict_emotions(self._emotion_model, list(forteclass_sequences))
+
+    def predict(self, forteclass_sequence: str) -> str:
+        """Predict emotion based on forteclass sequence"""
+        return self.predict_emotions([forteclass_sequence])[0]["emotion"]
 
     def save_model(self):
         """Save the trained model"""
@@ -117,6 +154,10 @@ class KNNService:
     def load_model(self):
         """Load a previously saved model"""
         self._emotion_model = joblib.load(self.model_path)
+
+        if self.backend == "ann":
+            self._emotion_model.set_params(clf__n_probe=KNN_ANN_PROBE)
+
         print(f"✅ KNN model successfully loaded from: {self.model_path}")
         
     def evaluate(self) -> dict:
@@ -0,0 +1,82 @@
+from io import BytesIO
+import numpy as np
+from pretty_midi import PrettyMIDI
+from src.utils.MidiUtil import note_arrays, bucket_pitch_class_sets, forte_class_table, estimate_key, dominant_tempo
+from src.utils.TokenUtil import Vocabulary, forte_id_table, TOKEN_DTYPE
+
+MIN_VELOCITY = 35       # soft notes could be noise
+MIN_DURATION = 0.07
+
+class MidiDatasetService:
+    """
+    "Dataset mode" MIDI analyzer used for corpus extraction.
+
+    Produces the same fields as MidiService (forteclass sequence, key, tonic,
+    mode, bpm) but only from the note arrays and the MIDI tempo map: no audio
+    synthesis, no librosa tempo estimation and no music21 parsing per file.
+    BPM comes from the tempo map and the key from a Krumhansl-Schmuckler
+    estimate, so both can differ slightly from the interactive MidiService.
+    """
+    def __init__(self, midi_data):
+        if isinstance(midi_data, PrettyMIDI):
+            self._midi_data = midi_data
+        elif isinstance(midi_data, (bytes, bytearray)):
+            self._midi_data = PrettyMIDI(BytesIO(midi_data))
+        else:
+            raise TypeError("midi_data must be PrettyMIDI or bytes")
+
+        self._notes = [
+            note_arrays(instrument)
+            for instrument in self._midi_data.instruments
+            if not instrument.is_drum
+        ]
+
+    def extract_chord_progression_forteclass(self, bucket_size: float = 0.18) -> str:
+        table = forte_class_table()
+        chord_sequence = []
+
+        for starts, ends, pitches, velocities in self._notes:
+            mask = (velocities >= MIN_VELOCITY) & ((ends - starts) >= MIN_DURATION)
+            pc_sets = bucket_pitch_class_sets(starts[mask], pitches[mask], bucket_size)
+            chord_sequence.extend(table[pc_sets].tolist())
+
+        return ",".join(chord_sequence)
+
+    def extract_chord_progression_ids(self, vocabulary: Vocabulary, bucket_size: float = 0.18) -> np.ndarray:
+        """
+        Same progression as extract_chord_progression_forteclass, as token ids
+        of the given vocabulary (no string building or re-tokenizing).
+        """
+        table = forte_id_table(vocabulary)
+        chord_ids = [np.zeros(0, dtype=TOKEN_DTYPE)]
+
+        for starts, ends, pitches, velocities in self._notes:
+            mask = (velocities >= MIN_VELOCITY) & ((ends - starts) >= MIN_DURATION)
+            chord_ids.append(table[bucket_pitch_class_sets(starts[mask], pitches[mask], bucket_size)])
+
+        return np.concatenate(chord_ids)
+
+    def find_estimate_key(self) -> dict:
+        if not self._notes:
+            return {"key": "", "tonic": "", "mode": ""}
+
+        pitches = np.concatenate([notes[2] for notes in self._notes])
+        durations = np.concatenate([notes[1] - notes[0] for notes in self._notes])
+
+        return estimate_key(pitches, durations)
+
+    def find_tempo(self) -> float:
+        return dominant_tempo(self._midi_data)
+
+    def analyze(self) -> dict:
+        chord_seq = self.extract_chord_progression_forteclass()
+        key_info = self.find_estimate_key()
+
+        return {
+            "chord_sequence": chord_seq,
+            "num_chords": len([t for t in chord_seq.split(",") if t.strip() != ""]),
+            "bpm": self.find_tempo(),
+            "key": key_info["key"],
+            "tonic": key_info["tonic"],
+            "mode": key_info["mode"]
+        }
@@ -2,10 +2,15 @@ import tempfile
 from io import BytesIO
 import pretty_midi
 from pretty_midi import PrettyMIDI
-from music21 import chord as m21Chord, converter as m21Converter, key as m21Key, harmony as m21Harmony, pitch as m21Pitch, scale as m21Scale
+from music21 import chord as m21Chord, key as m21Key, harmony as m21Harmony, pitch as m21Pitch, scale as m21Scale
+from music21.midi import translate as m21MidiTranslate
+from music21.musicxml import m21ToXml
 import soundfile as sf
 import librosa
+import numpy as np
 from src.utils.StringUtil import sanitize_chord_name, simplify_chord_name, clean_pitched_common_name
+from src.utils.CacheUtil import content_hash
+from src.utils.MidiUtil import PITCH_CLASS_NAMES, note_arrays, drop_repeated_onsets
 import os
 from src.enums import MusicEnum
 from collections import Counter
@@ -29,6 +34,9 @@ class MidiService:
         else:
             raise ValueError("You must provide either a file or midi_data.")
 
+        self._midi_bytes = None
+        self._score = None
+        self._musicxml = None
         self._wav_tmp_file = wav_path
         if bpm:
             self._estimated_bpm = bpm
@@ -48,6 +56,9 @@ class MidiService:
     @midi_data.setter
     def midi_data(self, value):
         self._midi_data = pretty_midi.PrettyMIDI(BytesIO(value.file.read()))
+        self._midi_bytes = None
+        self._score = None
+        self._musicxml = None
 
     def adjust_bpm(self):
         if not self._wav_tmp_file or not os.path.exists(self._wav_tmp_file):
@@ -97,10 +108,23 @@ class MidiService:
 
         return f"{roman} ({name})"
 
+    def to_midi_bytes(self) -> bytes:
+        if self._midi_bytes is None:
+            midi_io = BytesIO()
+            self._midi_data.write(midi_io)
+            self._midi_bytes = midi_io.getvalue()
+
+        return self._midi_bytes
+
+    def get_content_hash(self) -> str:
+        return content_hash(self.to_midi_bytes())
+
     def create_midi_converter(self):
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_midi:
-            self._midi_data.write(tmp_midi.name)
-            return m21Converter.parse(tmp_midi.name)
+        # parsed once from memory and reused by key analysis and exports
+        if self._score is None:
+            self._score = m21MidiTranslate.midiStringToStream(self.to_midi_bytes())
+
+        return self._score
 
     def correct_key_with_first_event(
         self,
@@ -362,57 +386,48 @@ class MidiService:
 
         return chord_progression
 
-    def export_musicxml(self):
-        midi_score = self.create_midi_converter()
-
-        with tempfile.NamedTemporaryFile(suffix=".musicxml", delete=False, mode="w", encoding="utf-8") as tmp_xml:
-            midi_score.write('musicxml', fp=tmp_xml.name)
+    def export_midi(self) -> bytes:
+        return self.to_midi_bytes()
 
-        # Read the content back to memory
-        with open(tmp_xml.name, "r", encoding="utf-8") as f:
-            xml_content = f.read()
+    def export_musicxml(self) -> bytes:
+        if self._musicxml is None:
+            midi_score = self.create_midi_converter()
+            self._musicxml = m21ToXml.GeneralObjectExporter(midi_score).parse()
 
-        return xml_content
+        return self._musicxml
 
     def extract_note_sequence(self, bucket_size: float = 0.05, min_gap: float = 0.01, valid_range=("E2", "E6"), min_duration: float = 0.05) -> list[str]:
-        low_pitch = m21Pitch.Pitch(valid_range[0]).midi
-        high_pitch = m21Pitch.Pitch(valid_range[1]).midi
+        low_pitch = pretty_midi.note_name_to_number(valid_range[0])
+        high_pitch = pretty_midi.note_name_to_number(valid_range[1])
 
-        sequence = []
-        last_time = -1
-        last_note = None
+        starts, pitches = [], []
 
         for instrument in self._midi_data.instruments:
             if instrument.is_drum:
                 continue
 
-            notes_sorted = sorted(instrument.notes, key=lambda n: n.start)
+            note_starts, note_ends, note_pitches, _ = note_arrays(instrument)
 
-            for note in notes_sorted:
-                note_name = librosa.midi_to_note(note.pitch).replace("♯", "#").replace("♭", "b")
+            # Filter by pitch range and very short notes
+            mask = (
+                (note_pitches >= low_pitch)
+                & (note_pitches <= high_pitch)
+                & ((note_ends - note_starts) >= min_duration)
+            )
 
-                # Filter by pitch range
-                try:
-                    midi_num = m21Pitch.Pitch(note_name).midi
-                    if not (low_pitch <= midi_num <= high_pitch):
-                        continue
-                except Exception:
-                    continue
+            starts.append(note_starts[mask])
+            pitches.append(note_pitches[mask])
 
-                # Filter very short notes
-                duration = note.end - note.start
-                if duration < min_duration:
-                    continue
+        if not starts:
+            return []
 
-                # Preserve double/triple notes, only skip duplicates with almost zero gap
-                if last_note == note_name and (note.start - last_time) < 0.005:
-                    continue
+        starts = np.concatenate(starts)
+        pitches = np.concatenate(pitches)
 
-                sequence.append(note_name[:-1]) # remove last char (number, for example C5)
-                last_note = note_name
-                last_time = note.start
+        # Preserve double/triple notes, only skip duplicates with almost zero gap
+        keep = drop_repeated_onsets(starts, pitches, max_gap=0.005)
 
-        return sequence
+        return PITCH_CLASS_NAMES[pitches[keep]].tolist()
 
     def extract_notes_and_chords(self) -> dict:
         chords = self.extract_chord_progression()
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import hashlib
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.services.RandomForestService import RandomForestService, full_model
+from src.utils.PredictionUtil import class_probabilities, emotion_result
+
+# models scored in parallel by /predict-ensemble
+ENSEMBLE_WORKERS = int(os.getenv("ENSEMBLE_WORKERS", "4"))
+
+# models on the bare Forte class sequence: name -> (module, service class)
+SEQUENCE_MODELS = {
+    "nb": ("src.services.NaiveBayesService", "NaiveBayesService"),
+    "knn": ("src.services.KNNService", "KNNService"),
+    "svm": ("src.services.SVMService", "SVMService")
+}
+
+# scores that are not probabilities (SVM: softmax of margins) are reported
+# per model but left out of the ensemble mean
+UNCALIBRATED_MODELS = ("svm",)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def vectorizer_key(vectorizer) -> str:
+    """
+    Same key for fitted vectorizers producing the same matrix (params and
+    vocabulary), so models trained with equal vectorizers share one pass.
+    """
+    params = {k: v for k, v in vectorizer.get_params(deep=False).items() if k not in ("n_jobs", "dtype")}
+    payload = json.dumps([type(vectorizer).__name__, params, sorted(getattr(vectorizer, "vocabulary_", {}).items())], default=str)
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ModelPoolService:
+    """
+    Every emotion model of the worker, loaded once in the background at
+    startup (a missing NB/KNN/SVM .pkl is trained there, never on the
+    request path). Models still loading are reported as unavailable.
+    """
+    def __init__(self, workers: int = ENSEMBLE_WORKERS):
+        self._models = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._loader = None
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ensemble")
+
+    def start(self):
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_all, daemon=True)
+                self._loader.start()
+
+    def _load_all(self):
+        for name, (module_name, class_name) in SEQUENCE_MODELS.items():
+            start = time.perf_counter()
+            try:
+                # the constructor loads the .pkl, or trains and saves it
+                service = getattr(importlib.import_module(module_name), class_name)()
+                pipeline = service._emotion_model
+
+                with self._lock:
+                    self._models[name] = {
+                        "pipeline": pipeline,
+                        "vectorizer_key": vectorizer_key(pipeline.steps[0][1])
+                    }
+                print(f"🧰 Model pool: {name} ready ({time.perf_counter() - start:.1f}s)")
+            except Exception as e:
+                with self._lock:
+                    self._errors[name] = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Model pool: {name} unavailable: {e}")
+
+        try:
+            full_model()
+            with self._lock:
+                self._models["rf"] = {}
+            print("🧰 Model pool: rf ready")
+        except Exception as e:
+            with self._lock:
+                self._errors["rf"] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Model pool: rf unavailable: {e}")
+
+    def model(self, name: str):
+        """
+        Preloaded pipeline of a sequence model (nb, knn, svm).
+        """
+        with self._lock:
+            entry = self._models.get(name)
+            error = self._errors.get(name)
+
+        if entry is None:
+            raise RuntimeError(f"Model '{name}' is not available: {error or 'still loading'}")
+
+        return entry["pipeline"]
+
+    def status(self) -> dict:
+        with self._lock:
+            names = ["rf", *SEQUENCE_MODELS]
+            return {name: "ready" if name in self._models else ("failed" if name in self._errors else "loading") for name in names}
+
+    def predict_ensemble(self, forteclass_sequence: str, mode: str, tonic: str = None) -> dict:
+        """
+        Scores the progression with every ready model concurrently. Models
+        sharing a vectorizer get its output computed once. Returns per-model
+        results and timings plus the mean probabilities of the models in
+        UNCALIBRATED_MODELS excluded.
+        """
+        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
+            raise ValueError("Forteclass sequence is null or invalid.")
+
+        start = time.perf_counter()
+
+        with self._lock:
+            models = dict(self._models)
+
+        if not models:
+            raise RuntimeError("No emotion model is loaded yet.")
+
+        futures = {}
+
+        if "rf" in models:
+            futures["rf"] = self.executor.submit(self._score_rf, forteclass_sequence, mode, tonic)
+
+        # vectorize once per distinct vectorizer
+        groups = {}
+        for name, entry in models.items():
+            if name != "rf":
+                groups.setdefault(entry["vectorizer_key"], []).append(name)
+
+        vectorize_ms = {}
+        for names in groups.values():
+            vectorize_start = time.perf_counter()
+            X = models[names[0]]["pipeline"].steps[0][1].transform([forteclass_sequence])
+            elapsed = (time.perf_counter() - vectorize_start) * 1000
+
+            for name in names:
+                vectorize_ms[name] = elapsed
+                futures[name] = self.executor.submit(self._score_features, models[name]["pipeline"], X)
+
+        results = {}
+        for name, future in futures.items():
+            result = future.result()
+            if name in vectorize_ms:
+                result["vectorize_ms"] = round(vectorize_ms[name], 3)
+            results[name] = result
+
+        averaged = [name for name in results if name not in UNCALIBRATED_MODELS]
+        if not averaged:
+            raise RuntimeError("No model with calibrated probabilities is loaded yet.")
+
+        classes = sorted({c for name in averaged for c in results[name]["probabilities"]})
+        mean = np.mean([[results[name]["probabilities"].get(c, 0.0) for c in classes] for name in averaged], axis=0)
+
+        return {
+            "models": results,
+            "ensemble": emotion_result(classes, mean),
+            "ensemble_models": averaged,
+            "unavailable": sorted(set(self.status()) - set(results)),
+            "total_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def _score_features(self, pipeline, X) -> dict:
+        start = time.perf_counter()
+        probs = class_probabilities(pipeline[1:], X)[0]
+        result = emotion_result(pipeline.classes_, probs)
+        result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        return result
+
+    def _score_rf(self, forteclass_sequence: str, mode: str, tonic: str) -> dict:
+        start = time.perf_counter()
+        service = RandomForestService()
+        result = service.predict_full_ngrams(forteclass_sequence, mode, tonic)
+        result["model_version"] = service.model_version
+        result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        return result
+
+def model_pool() -> ModelPoolService:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPoolService()
+
+        return _pool
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import shutil
+import threading
+from pathlib import Path
+import joblib
+import sklearn
+from src.utils.ManifestUtil import file_hash, load_manifest, save_manifest
+
+BASE_DIR = Path(__file__).resolve().parent
+MODELS_DIR = (BASE_DIR / '..' / 'final-models').resolve()
+VERSIONS_DIR = os.path.join(MODELS_DIR, 'versions')
+
+# seconds between checks of the "current" pointer by serving workers
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+# versions kept per model when publishing (the current one is always kept)
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "5"))
+# "r" memory-maps the arrays of served models (read-only), so the worker
+# processes of a host share one page-cache copy; "" loads private copies
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+
+class ModelRegistryService:
+    """
+    Versioned model artifacts. A published model is stored once as
+    versions/<name>/<version>.pkl, the version being the first 16 hex chars
+    of the file's sha256, next to <version>.json (metadata). The served
+    version is the <name>.current.json pointer, replaced atomically, so
+    readers never see a half-written model. Version files are written
+    uncompressed and never modified afterwards, so they can be memory-mapped.
+    """
+    def __init__(self, models_dir=MODELS_DIR):
+        self.models_dir = str(models_dir)
+        self.versions_dir = os.path.join(self.models_dir, 'versions')
+
+    def pointer_path(self, name: str) -> str:
+        return os.path.join(self.models_dir, f"{name}.current.json")
+
+    def version_paths(self, name: str, version: str) -> dict:
+        stem = os.path.join(self.versions_dir, name, version)
+        return {"model": f"{stem}.pkl", "metadata": f"{stem}.json"}
+
+    def publish_file(self, name: str, source_path: str, metadata: dict = None, make_current: bool = True) -> dict:
+        """
+        Registers an already written model file (moved into the registry)
+        and points "current" at it.
+        """
+        digest = file_hash(source_path)
+        version = digest[:16]
+        paths = self.version_paths(name, version)
+        os.makedirs(os.path.dirname(paths["model"]), exist_ok=True)
+
+        if os.path.exists(paths["model"]):
+            os.remove(source_path)
+        else:
+            os.replace(source_path, paths["model"])
+
+        entry = {
+            "name": name,
+            "version": version,
+            "sha256": digest,
+            "size": os.path.getsize(paths["model"]),
+            "created_at": time.time(),
+            "sklearn_version": sklearn.__version__,
+            **(metadata or {})
+        }
+
+        if not os.path.exists(paths["metadata"]):
+            save_manifest(paths["metadata"], json.loads(json.dumps(entry, default=str)))
+
+        if make_current:
+            self.set_current(name, version)
+
+        return entry
+
+    def publish(self, name: str, model, metadata: dict = None, make_current: bool = True) -> dict:
+        os.makedirs(os.path.join(self.versions_dir, name), exist_ok=True)
+
+        tmp_path = os.path.join(self.versions_dir, name, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        joblib.dump(model, tmp_path)
+
+        entry = self.publish_file(name, tmp_path, metadata, make_current)
+        print(f"📦 Published {name} version {entry['version']}")
+
+        self.prune(name)
+        return entry
+
+    def names(self) -> list:
+        """
+        Names of the models published in the registry.
+        """
+        if not os.path.isdir(self.versions_dir):
+            return []
+
+        return sorted(
+            entry for entry in os.listdir(self.versions_dir)
+            if os.path.isdir(os.path.join(self.versions_dir, entry))
+        )
+
+    def set_current(self, name: str, version: str):
+        # only published names/versions: both are joined into file paths
+        if name not in self.names() or version not in {entry.get("version") for entry in self.versions(name)}:
+            raise FileNotFoundError(f"Model version not found: {name}@{version}")
+
+        if not os.path.exists(self.version_paths(name, version)["model"]):
+            raise FileNotFoundError(f"Model version not found: {name}@{version}")
+
+        save_manifest(self.pointer_path(name), {"name": name, "version": version, "updated_at": time.time()})
+
+    def current(self, name: str, legacy_path: str = None) -> dict:
+        """
+        The pointer of the served version. A legacy single-file model at
+        legacy_path is registered as the first version when there is none.
+        """
+        pointer = load_manifest(self.pointer_path(name))
+
+        if not pointer and legacy_path and os.path.exists(legacy_path):
+            print(f"📦 Registering legacy model {legacy_path} as {name}...")
+            tmp_path = os.path.join(self.versions_dir, name, f".{os.getpid()}.legacy.tmp")
+            os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+            shutil.copyfile(legacy_path, tmp_path)
+            self.publish_file(name, tmp_path, {"source": os.path.basename(legacy_path)})
+            pointer = load_manifest(self.pointer_path(name))
+
+        if not pointer:
+            raise FileNotFoundError(f"No published version of model '{name}'.")
+
+        return pointer
+
+    def metadata(self, name: str, version: str) -> dict:
+        return load_manifest(self.version_paths(name, version)["metadata"])
+
+    def load(self, name: str, version: str = None, legacy_path: str = None, mmap_mode: str = None):
+        """
+        Returns (model, version); the current one unless a version is given.
+        With mmap_mode the NumPy arrays of the model map the version file
+        instead of being copied (compressed legacy files are just loaded).
+        """
+        version = version or self.current(name, legacy_path)["version"]
+        return joblib.load(self.version_paths(name, version)["model"], mmap_mode=mmap_mode), version
+
+    def versions(self, name: str) -> list:
+        if name not in self.names():
+            return []
+
+        folder = os.path.join(self.versions_dir, name)
+
+        entries = [load_manifest(os.path.join(folder, f)) for f in os.listdir(folder) if f.endswith(".json")]
+        return sorted(entries, key=lambda entry: entry.get("created_at", 0), reverse=True)
+
+    def prune(self, name: str, keep: int = MODEL_KEEP_VERSIONS):
+        if keep <= 0:
+            return
+
+        current = load_manifest(self.pointer_path(name)).get("version")
+
+        for entry in self.versions(name)[keep:]:
+            if entry["version"] == current:
+                continue
+            for path in self.version_paths(name, entry["version"]).values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+class LiveModel:
+    """
+    Model shared by the requests of a worker process. A background thread
+    watches the "current" pointer; a new version is loaded and warmed up
+    off the request path and only then swapped in, so requests keep being
+    answered by the previous model until the new one is ready.
+    """
+    def __init__(self, name: str, legacy_path: str = None, warmup=None, interval: float = MODEL_RELOAD_INTERVAL, registry: ModelRegistryService = None, mmap_mode: str = MODEL_MMAP_MODE):
+        self.name = name
+        self.legacy_path = legacy_path
+        self.warmup = warmup
+        self.interval = interval
+        self.mmap_mode = mmap_mode
+        self.registry = registry or ModelRegistryService()
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._model = None
+        self._version = None
+        self._pointer_stat = None
+        self._watcher = None
+
+        self.reload()
+
+        if interval > 0:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def get(self) -> tuple:
+        """
+        (model, version) to use for a whole request.
+        """
+        with self._lock:
+            return self._model, self._version
+
+    @property
+    def version(self) -> str:
+        return self.get()[1]
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.registry.pointer_path(self.name))
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def reload(self) -> bool:
+        """
+        Loads the current version if it differs from the served one.
+        Returns True when a new model was swapped in.
+        """
+        with self._reload_lock:
+            self._pointer_stat = self._stat()
+            version = self.registry.current(self.name, self.legacy_path)["version"]
+
+            if version == self._version:
+                return False
+
+            start = time.perf_counter()
+            model, version = self.registry.load(self.name, version, mmap_mode=self.mmap_mode)
+
+            if self.warmup is not None:
+                self.warmup(model)
+
+            with self._lock:
+                previous = self._version
+                self._model, self._version = model, version
+
+            print(f"🔄 {self.name}: {previous or '-'} -> {version} ({time.perf_counter() - start:.1f}s)")
+            return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+
+            if self._stat() == self._pointer_stat:
+                continue
+
+            try:
+                self.reload()
+            except Exception as e:
+                # keep serving the loaded version
+                print(f"⚠️ {self.name}: reload failed, keeping {self._version}: {e}")
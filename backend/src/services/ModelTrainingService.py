@@ -1,85 +1,70 @@
 import os
-import pandas as pd
 from pathlib import Path
-from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, accuracy_score
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.decomposition import TruncatedSVD, LatentDirichletAllocation
-from sklearn.pipeline import FeatureUnion
+from sklearn.decomposition import LatentDirichletAllocation
 import joblib
+from src.services.DatasetStorageService import DatasetStorageService
+from src.services.ChunkingService import ChunkingService
+from src.services.FeatureCacheService import FeatureCacheService
+from src.utils.JobUtil import report_stage
+from src.utils.SamplingUtil import balanced_rows
 
 BASE_DIR = Path(__file__).resolve().parent
 MODELS_DIR = (BASE_DIR / '..' / 'final-models').resolve()
 DATASET_DIR = (BASE_DIR / '..' / 'final-dataset').resolve()
 
-RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.csv')  
+RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.parquet')  
 
-CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_dataset.csv')  
+CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_dataset.parquet')  
 
-BALANCED_CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_dataset.csv')  
-CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_train_dataset.csv')
-CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_test_dataset.csv')
-BALANCED_CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_train_dataset.csv')
-BALANCED_CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_test_dataset.csv')
+BALANCED_CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_dataset.parquet')  
+CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_train_dataset.parquet')
+CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_test_dataset.parquet')
+BALANCED_CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_train_dataset.parquet')
+BALANCED_CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_test_dataset.parquet')
 RF_BALANCED_CHUNKED_PATH = os.path.join(MODELS_DIR, 'random_forest_balanced_chunked_40_strict_model.pkl')
 
 class ModelTrainingService:
-    def build_chunked_dataset(self, chunk_size=40) -> str:
-        if not os.path.exists(RAW_DATASET_PATH):
+    def __init__(self):
+        self.storage = DatasetStorageService()
+        self.chunker = ChunkingService()
+        self.feature_cache = FeatureCacheService()
+
+    def build_chunked_dataset(self, chunk_size=40, mode="strict", min_size=None, max_size=None) -> str:
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(f"Raw dataset not found: {RAW_DATASET_PATH}")
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["num_classes"])
 
         if "num_classes" not in df.columns:
             raise ValueError("raw_dataset.csv must contain a num_classes column.")
 
         print(f"📊 Loaded RAW dataset: {df.shape[0]} samples")
 
-        new_rows = []
-
-        for idx, row in df.iterrows():
-            full_seq = row["forteclass_sequence"]
-            emotion = row["emotion"]
-            mode = row["mode"]
-
-            tokens = [t for t in full_seq.split(",") if t.strip()]
-
-            # Skip rows that are smaller than chunk_size (cannot produce any valid chunk)
-            if len(tokens) < chunk_size:
-                continue
-
-            # Split into perfect chunks of 50
-            for i in range(0, len(tokens), chunk_size):
-                sub = tokens[i:i + chunk_size]
-
-                # Only accept perfect chunks
-                if len(sub) == chunk_size:
-                    new_rows.append({
-                        "forteclass_sequence": ",".join(sub),
-                        "num_classes": chunk_size,
-                        "mode": mode,
-                        "emotion": emotion
-                    })
-
-        # Convert to dataframe
-        out_df = pd.DataFrame(new_rows)
-
-        out_df.to_csv(CHUNKED_DATASET_PATH, index=False)
+        # strict: only perfect chunks of chunk_size, rows shorter than it produce none
+        stats = self.chunker.chunk_dataset(
+            RAW_DATASET_PATH,
+            CHUNKED_DATASET_PATH,
+            chunk_size,
+            mode=mode,
+            min_size=min_size,
+            max_size=max_size
+        )
 
         print(f"\n✅ Chunking complete!")
         print(f"📄 New dataset saved: {CHUNKED_DATASET_PATH}")
-        print(f"🆕 Total rows: {out_df.shape[0]} (was {df.shape[0]})")
-        print(f"📉 Average num_classes AFTER chunking: {out_df['num_classes'].mean():.2f}")
+        print(f"🆕 Total rows: {stats['rows_out']} (was {stats['rows_in']})")
+        print(f"📉 Average num_classes AFTER chunking: {stats['avg_num_classes']:.2f}")
 
         return CHUNKED_DATASET_PATH
 
     def build_balanced_chunked_dataset(self) -> str:
-        if not os.path.exists(CHUNKED_DATASET_PATH):
+        if not self.storage.exists(CHUNKED_DATASET_PATH):
             raise FileNotFoundError(f"chunked_dataset not found: {CHUNKED_DATASET_PATH}")
 
-        df = pd.read_csv(CHUNKED_DATASET_PATH)
+        df = self.storage.read(CHUNKED_DATASET_PATH, columns=["emotion"])
 
         if "emotion" not in df.columns:
             raise ValueError("Dataset must contain an 'emotion' column.")
@@ -95,20 +80,10 @@ class ModelTrainingService:
 
         print(f"\n➡️ Balancing using minority class size: {min_size}")
 
-        balanced_parts = []
-        for emotion in counts.index:
-            part = df[df["emotion"] == emotion].sample(
-                n=min_size,
-                replace=False,
-                random_state=42
-            )
-            balanced_parts.append(part)
-
-        balanced_df = pd.concat(balanced_parts, ignore_index=True)
-        balanced_df = balanced_df.sample(frac=1, random_state=42).reset_index(drop=True)
+        balanced_df = df.iloc[balanced_rows(df["emotion"], random_state=42)]
 
         os.makedirs(os.path.dirname(BALANCED_CHUNKED_DATASET_PATH), exist_ok=True)
-        balanced_df.to_csv(BALANCED_CHUNKED_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNKED_DATASET_PATH, CHUNKED_DATASET_PATH, balanced_df.index)
 
         print("\n✅ Balanced dataset created!")
         print(f"📄 Saved: {BALANCED_CHUNKED_DATASET_PATH}")
@@ -119,14 +94,14 @@ class ModelTrainingService:
         return BALANCED_CHUNKED_DATASET_PATH
     
     def build_balanced_chunked_dataset_traintest(self) -> str:
-        if not os.path.exists(CHUNKED_TEST_DATASET_PATH):
+        if not self.storage.exists(CHUNKED_TEST_DATASET_PATH):
             raise FileNotFoundError(f"test_chunked_dataset not found: {CHUNKED_TEST_DATASET_PATH}")
         
-        if not os.path.exists(CHUNKED_TRAIN_DATASET_PATH):
+        if not self.storage.exists(CHUNKED_TRAIN_DATASET_PATH):
             raise FileNotFoundError(f"train_chunked_dataset not found: {CHUNKED_TRAIN_DATASET_PATH}")
 
-        dfTrain = pd.read_csv(CHUNKED_TRAIN_DATASET_PATH)
-        dfTest = pd.read_csv(CHUNKED_TEST_DATASET_PATH)
+        dfTrain = self.storage.read(CHUNKED_TRAIN_DATASET_PATH, columns=["emotion"])
+        dfTest = self.storage.read(CHUNKED_TEST_DATASET_PATH, columns=["emotion"])
 
 
         if "emotion" not in dfTrain.columns:
@@ -147,20 +122,10 @@ class ModelTrainingService:
 
         print(f"\n➡️ Balancing using minority class size: {min_size}")
 
-        balanced_parts = []
-        for emotion in counts.index:
-            part = dfTrain[dfTrain["emotion"] == emotion].sample(
-                n=min_size,
-                replace=False,
-                random_state=42
-            )
-            balanced_parts.append(part)
-
-        balanced_dfTrain = pd.concat(balanced_parts, ignore_index=True)
-        balanced_dfTrain = balanced_dfTrain.sample(frac=1, random_state=42).reset_index(drop=True)
+        balanced_dfTrain = dfTrain.iloc[balanced_rows(dfTrain["emotion"], random_state=42)]
 
         os.makedirs(os.path.dirname(BALANCED_CHUNKED_TRAIN_DATASET_PATH), exist_ok=True)
-        balanced_dfTrain.to_csv(BALANCED_CHUNKED_TRAIN_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNKED_TRAIN_DATASET_PATH, CHUNKED_TRAIN_DATASET_PATH, balanced_dfTrain.index)
 
         print("\n✅ Balanced TRAIN dataset created!")
         print(f"📄 Saved: {BALANCED_CHUNKED_TRAIN_DATASET_PATH}")
@@ -178,20 +143,10 @@ class ModelTrainingService:
 
         print(f"\n➡️ Balancing using minority class size: {min_size}")
 
-        balanced_parts = []
-        for emotion in counts.index:
-            part = dfTest[dfTest["emotion"] == emotion].sample(
-                n=min_size,
-                replace=False,
-                random_state=42
-            )
-            balanced_parts.append(part)
-
-        balanced_dfTest = pd.concat(balanced_parts, ignore_index=True)
-        balanced_dfTest = balanced_dfTest.sample(frac=1, random_state=42).reset_index(drop=True)
+        balanced_dfTest = dfTest.iloc[balanced_rows(dfTest["emotion"], random_state=42)]
 
         os.makedirs(os.path.dirname(BALANCED_CHUNKED_TEST_DATASET_PATH), exist_ok=True)
-        balanced_dfTest.to_csv(BALANCED_CHUNKED_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(BALANCED_CHUNKED_TEST_DATASET_PATH, CHUNKED_TEST_DATASET_PATH, balanced_dfTest.index)
 
         print("\n✅ Balanced TRAIN dataset created!")
         print(f"📄 Saved: {BALANCED_CHUNKED_TEST_DATASET_PATH}")
@@ -200,10 +155,10 @@ class ModelTrainingService:
         return BALANCED_CHUNKED_TRAIN_DATASET_PATH, BALANCED_CHUNKED_TEST_DATASET_PATH
 
     def split_balanced_dataset(self, test_ratio=0.20):
-        if not os.path.exists(BALANCED_CHUNKED_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNKED_DATASET_PATH):
             raise FileNotFoundError(f"Balanced chunked dataset missing: {BALANCED_CHUNKED_DATASET_PATH}")
 
-        df = pd.read_csv(BALANCED_CHUNKED_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNKED_DATASET_PATH, columns=["emotion"])
 
         print(f"📄 Loaded balanced dataset: {df.shape[0]} samples")
 
@@ -212,8 +167,8 @@ class ModelTrainingService:
 
         os.makedirs(os.path.dirname(CHUNKED_TRAIN_DATASET_PATH), exist_ok=True)
 
-        train_df.to_csv(CHUNKED_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(CHUNKED_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(CHUNKED_TRAIN_DATASET_PATH, BALANCED_CHUNKED_DATASET_PATH, train_df.index)
+        self.storage.write_view(CHUNKED_TEST_DATASET_PATH, BALANCED_CHUNKED_DATASET_PATH, test_df.index)
 
         print("\n✅ Balanced dataset split!")
         print(f"📄 Train: {CHUNKED_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
@@ -222,10 +177,10 @@ class ModelTrainingService:
         return CHUNKED_TRAIN_DATASET_PATH, CHUNKED_TEST_DATASET_PATH
     
     def train_balanced_dataset(self):
-        if not os.path.exists(BALANCED_CHUNKED_TRAIN_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNKED_TRAIN_DATASET_PATH):
             raise FileNotFoundError(f"Train dataset not found: {BALANCED_CHUNKED_TRAIN_DATASET_PATH}")
 
-        df = pd.read_csv(BALANCED_CHUNKED_TRAIN_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNKED_TRAIN_DATASET_PATH)
         df = df.dropna(subset=['forteclass_sequence', 'mode', 'emotion'])
         df = df[df['forteclass_sequence'].str.len() > 0]
 
@@ -237,7 +192,7 @@ class ModelTrainingService:
 
         print(f"📚 Training on {len(X)} samples (ALL train dataset) ...")
 
-        pipeline = Pipeline([
+        features = [
             ("vect", CountVectorizer(
                 lowercase=False,
                 token_pattern=r"[0-9A-Za-z\-]+",
@@ -251,20 +206,26 @@ class ModelTrainingService:
                 learning_decay=0.7,
                 n_jobs=-1,
                 random_state=42
-            )),
-            ("clf", RandomForestClassifier(
-                n_estimators=1200,
-                max_depth=25,
-                min_samples_leaf=2,
-                min_samples_split=4,
-                max_features="log2",
-                n_jobs=-1,
-                random_state=42
             ))
-        ])
+        ]
+
+        clf = RandomForestClassifier(
+            n_estimators=1200,
+            max_depth=25,
+            min_samples_leaf=2,
+            min_samples_split=4,
+            max_features="log2",
+            n_jobs=-1,
+            random_state=42
+        )
 
         print("🔧 Fitting pipeline (vectorizer -> LDA -> RandomForest)...")
-        pipeline.fit(X, y)
+        fitted, X_topics = self.feature_cache.fit_transform(features, X)
+
+        report_stage("forest", n_estimators=clf.n_estimators)
+        clf.fit(X_topics, y)
+
+        pipeline = Pipeline([*fitted, ("clf", clf)])
         print("✅ Training complete.")
 
         # ✅ SAVE ALL COMPONENTS (vect + lda + clf)
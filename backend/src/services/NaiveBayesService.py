@@ -8,6 +8,7 @@ from typing import Tuple
 from pathlib import Path
 import joblib
 import time
+from src.utils.PredictionUtil import predict_emotions
 
 BASE_DIR = Path(__file__).resolve().parent                    # /app/src/services
 MODELS_DIR = (BASE_DIR / '..' / 'AIModels').resolve()         # /app/src/AIModels
@@ -19,12 +20,16 @@ TEST_DATASET_PATH = (DATASET_DIR / 'test_dataset.csv').resolve()
 
 
 class NaiveBayesService:
-    def __init__(self, model_path: str = None):
-        self._emotion_model = None
+    def __init__(self, model_path: str = None, model=None):
+        self._emotion_model = model
         self.model_path = str(model_path or MODEL_PATH)
         self.train_path = str(TRAIN_DATASET_PATH)
         self.test_path = str(TEST_DATASET_PATH)
 
+        # preloaded pipeline (ModelPoolService), nothing to load
+        if model is not None:
+            return
+
         print(f"🧩 Naive Bayes model path: {self.model_path}")
 
         if os.path.exists(self.model_path):
@@ -97,26 +102,24 @@ class NaiveBayesService:
             "emotion_predictions": emotion_pred
         }
 
-    def predict(self, forteclass_sequence: str) -> str:
-        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
+    def predict_emotions(self, forteclass_sequences: list) -> list:
+        """
+        {"emotion", "probabilities"} of every sequence, from a single
+        predict_proba over the batch.
+        """
+        if any(not s or len(s.strip()) == 0 for s in forteclass_sequences):
             raise ValueError("Forteclass sequence is null or invalid.")
 
         if self._emotion_model is None:
             raise ValueError("Model not loaded or trained.")
 
-        pred_emotion = self._emotion_model.predict([forteclass_sequence])[0]
-        return pred_emotion
+        return predict_emotions(self._emotion_model, list(forteclass_sequences))
 
-    def predict_proba(self, forteclass_sequence: str) -> dict:
-        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
-            raise ValueError("Forteclass sequence is null or invalid.")
-
-        if self._emotion_model is None:
-            raise ValueError("Model not loaded or trained.")
+    def predict(self, forteclass_sequence: str) -> str:
+        return self.predict_emotions([forteclass_sequence])[0]["emotion"]
 
-        probabilities = self._emotion_model.predict_proba([forteclass_sequence])[0]
-        classes = self._emotion_model.classes_
-        return dict(zip(classes, probabilities))
+    def predict_proba(self, forteclass_sequence: str) -> dict:
+        return self.predict_emotions([forteclass_sequence])[0]["probabilities"]
 
     def save_model(self, model_path: str = None):
         path = model_path or self.model_path
@@ -0,0 +1,300 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.services.DatasetStorageService import DatasetStorageService
+from src.services.ModelRegistryService import ModelRegistryService
+from src.utils.ManifestUtil import load_manifest, save_manifest, fingerprint
+from src.utils.JobUtil import report_stage
+
+BASE_DIR = Path(__file__).resolve().parent
+PIPELINE_MANIFEST_PATH = os.path.join((BASE_DIR / '..' / 'final-dataset').resolve(), 'pipeline.manifest.json')
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+
+POINTER_SUFFIX = ".current.json"
+
+class Stage:
+    """
+    One step of a pipeline: run(**params) reads the inputs and writes the
+    outputs (artifact paths). Bump version when the step's code changes its
+    outputs, so cached results are not reused.
+    """
+    def __init__(self, name: str, run, inputs=(), outputs=(), params: dict = None, version: str = "1"):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.version = version
+
+class PipelineService:
+    """
+    Runs declared stages as a DAG: a stage depends on the stages producing
+    its inputs. Artifacts are content-addressed (sha256 of the files), and a
+    stage is skipped when its key (name, version, params and input hashes)
+    matches the last run and its outputs are unchanged. Stages whose
+    dependencies are done run in parallel.
+
+    A model registry pointer (<name>.current.json) is addressed by the
+    version it points at, already a content hash. As an output it stays
+    valid while the version the stage published exists, so moving the
+    pointer (set_current, incremental updates) doesn't retrain over it.
+    """
+    def __init__(self, manifest_path: str = PIPELINE_MANIFEST_PATH, workers: int = PIPELINE_WORKERS):
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.storage = DatasetStorageService()
+        self._lock = threading.Lock()
+
+    def artifact_path(self, path) -> str:
+        # datasets are addressed by their .parquet path, a legacy CSV is migrated first;
+        # a view is hashed through its metadata (base fingerprint + rows hash)
+        if str(path).endswith(".parquet"):
+            with self._lock:
+                if self.storage.is_view(path):
+                    return self.storage.view_paths(path)[0]
+                return self.storage.resolve(path)[0]
+
+        return str(path)
+
+    def pointer_model(self, path) -> tuple:
+        """
+        (registry, model name) of a registry pointer path, None otherwise.
+        """
+        path = str(path)
+        if not path.endswith(POINTER_SUFFIX):
+            return None
+
+        return ModelRegistryService(os.path.dirname(path)), os.path.basename(path)[:-len(POINTER_SUFFIX)]
+
+    def artifact_hash(self, path, manifest: dict) -> str:
+        path = self.artifact_path(path)
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Pipeline artifact not found: {path}")
+
+        if self.pointer_model(path):
+            return load_manifest(path)["version"]
+
+        with self._lock:
+            previous = manifest["artifacts"].get(path)
+
+        current = fingerprint(path, previous)
+
+        with self._lock:
+            manifest["artifacts"][path] = current
+
+        return current["hash"]
+
+    def output_unchanged(self, path, recorded: str, manifest: dict) -> bool:
+        pointer = self.pointer_model(path)
+
+        if pointer:
+            registry, name = pointer
+            return recorded is not None and os.path.exists(registry.version_paths(name, recorded)["model"])
+
+        return self.artifact_hash(path, manifest) == recorded
+
+    def stage_key(self, stage: Stage, input_hashes: dict) -> str:
+        payload = json.dumps({
+            "name": stage.name,
+            "version": stage.version,
+            "params": stage.params,
+            "inputs": input_hashes
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def plan(self, stages: list, targets: list = None) -> tuple[list, dict]:
+        """
+        Validates the DAG and returns (stages to consider, dependencies of each
+        stage name). With targets, only those stages and their ancestors.
+        """
+        by_name = {stage.name: stage for stage in stages}
+        if len(by_name) != len(stages):
+            raise ValueError("Stage names must be unique.")
+
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is produced by both {producers[output]} and {stage.name}.")
+                producers[output] = stage.name
+
+        deps = {
+            stage.name: {producers[i] for i in stage.inputs if i in producers}
+            for stage in stages
+        }
+
+        selected = set(by_name)
+        if targets:
+            unknown = [t for t in targets if t not in by_name]
+            if unknown:
+                raise ValueError(f"Unknown stages: {unknown}")
+
+            selected = set()
+            pending = list(targets)
+            while pending:
+                name = pending.pop()
+                if name not in selected:
+                    selected.add(name)
+                    pending.extend(deps[name])
+
+        # cycle check (Kahn)
+        remaining = {name: set(deps[name]) for name in selected}
+        while remaining:
+            ready = [name for name, d in remaining.items() if not d]
+            if not ready:
+                raise ValueError(f"Pipeline has a cycle between: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for d in remaining.values():
+                d.difference_update(ready)
+
+        return [by_name[name] for name in by_name if name in selected], {name: deps[name] for name in selected}
+
+    def run_stage(self, stage: Stage, manifest: dict, force: bool) -> dict:
+        input_hashes = {str(i): self.artifact_hash(i, manifest) for i in stage.inputs}
+        key = self.stage_key(stage, input_hashes)
+
+        with self._lock:
+            previous = manifest["stages"].get(stage.name)
+
+        if not force and previous and previous["key"] == key:
+            try:
+                unchanged = all(
+                    self.output_unchanged(o, previous["outputs"].get(str(o)), manifest)
+                    for o in stage.outputs
+                )
+            except FileNotFoundError:
+                unchanged = False
+
+            if unchanged:
+                print(f"⏭️ [{stage.name}] up to date, skipped")
+                return {"status": "cached", "result": previous.get("result")}
+
+        print(f"▶️ [{stage.name}] running...")
+        report_stage(stage.name, pipeline=True)
+        result = stage.run(**stage.params)
+
+        try:
+            json.dumps(result)
+        except TypeError:
+            result = str(result)
+
+        outputs = {str(o): self.artifact_hash(o, manifest) for o in stage.outputs}
+
+        with self._lock:
+            manifest["stages"][stage.name] = {"key": key, "outputs": outputs, "result": result}
+            save_manifest(self.manifest_path, manifest)
+
+        print(f"✅ [{stage.name}] done")
+        return {"status": "ran", "result": result}
+
+    def run(self, stages: list, targets: list = None, force: bool = False) -> dict:
+        selected, deps = self.plan(stages, targets)
+
+        manifest = load_manifest(self.manifest_path) or {}
+        manifest.setdefault("stages", {})
+        manifest.setdefault("artifacts", {})
+
+        results = {}
+        pending = {stage.name: stage for stage in selected}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            while pending or running:
+                ready = [name for name in pending if deps[name] <= set(results)]
+
+                for name in ready:
+                    running[executor.submit(self.run_stage, pending.pop(name), manifest, force)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = running.pop(future)
+
+                    # let running stages finish, but do not start new ones
+                    if future.exception() is not None:
+                        pending.clear()
+                        wait(running)
+                        raise future.exception()
+
+                    results[name] = future.result()
+
+        ran = sum(r["status"] == "ran" for r in results.values())
+        print(f"🏁 Pipeline finished: {ran} stages ran, {len(results) - ran} cached")
+
+        return results
+
+    def run_pipeline(self, name: str = "all", targets: list = None, force: bool = False) -> dict:
+        pipelines = training_pipelines()
+
+        if name not in pipelines:
+            raise ValueError(f"Unknown pipeline '{name}'. Available: {list(pipelines)}")
+
+        return self.run(pipelines[name], targets=targets, force=force)
+
+def training_pipelines() -> dict:
+    """
+    Declared training pipelines, keyed by name. "all" holds every stage, so
+    branches sharing the raw dataset run side by side.
+    """
+    from src.services import RFTrainingService as rf
+    from src.services import ModelTrainingService as mt
+
+    rf_service = rf.RFTrainingService()
+    mt_service = mt.ModelTrainingService()
+
+    # pointers are addressed by version: a new version re-evaluates, while
+    # train_full reruns only when the versions it published are gone
+    rf_full_model = rf_service.registry.pointer_path(rf.RF_FULL_MODEL_NAME)
+    rf_full_engine = rf_service.registry.pointer_path(rf.RF_FULL_ENGINE_NAME)
+
+    full = [
+        Stage("build_full", rf_service.build_full_dataset, [rf.RAW_DATASET_PATH], [rf.FULL_DATASET_DATASET_PATH]),
+        Stage(
+            "split_full",
+            rf_service.split_full_dataset,
+            [rf.FULL_DATASET_DATASET_PATH],
+            [rf.FULL_DATASET_TRAIN_DATASET_PATH, rf.FULL_DATASET_TEST_DATASET_PATH],
+            {"test_size": 0.15, "random_state": 42}
+        ),
+        Stage(
+            "train_full",
+            rf_service.train_full_dataset,
+            [rf.FULL_DATASET_TRAIN_DATASET_PATH],
+            [rf_full_model, rf_full_engine],
+            # part of the stage key: switching the featurizer retrains
+            {"vectorizer": rf.RF_VECTORIZER, "hashed_features": rf.RF_HASHED_FEATURES, "hashed_min_count": rf.RF_HASHED_MIN_COUNT}
+        ),
+        Stage("evaluate_full", rf_service.evaluate_final_rf, [rf.FULL_DATASET_TEST_DATASET_PATH, rf_full_model])
+    ]
+
+    balanced_chunked = [
+        Stage("chunk", mt_service.build_chunked_dataset, [mt.RAW_DATASET_PATH], [mt.CHUNKED_DATASET_PATH], {"chunk_size": 40, "mode": "strict"}),
+        Stage("balance", mt_service.build_balanced_chunked_dataset, [mt.CHUNKED_DATASET_PATH], [mt.BALANCED_CHUNKED_DATASET_PATH]),
+        Stage(
+            "split_balanced",
+            mt_service.split_balanced_dataset,
+            [mt.BALANCED_CHUNKED_DATASET_PATH],
+            [mt.CHUNKED_TRAIN_DATASET_PATH, mt.CHUNKED_TEST_DATASET_PATH],
+            {"test_ratio": 0.20}
+        ),
+        Stage(
+            "balance_traintest",
+            mt_service.build_balanced_chunked_dataset_traintest,
+            [mt.CHUNKED_TRAIN_DATASET_PATH, mt.CHUNKED_TEST_DATASET_PATH],
+            [mt.BALANCED_CHUNKED_TRAIN_DATASET_PATH, mt.BALANCED_CHUNKED_TEST_DATASET_PATH]
+        ),
+        Stage("train_balanced", mt_service.train_balanced_dataset, [mt.BALANCED_CHUNKED_TRAIN_DATASET_PATH], [mt.RF_BALANCED_CHUNKED_PATH])
+    ]
+
+    return {
+        "full": full,
+        "balanced_chunked": balanced_chunked,
+        "all": full + balanced_chunked
+    }
@@ -1,59 +1,100 @@
 import os
+import re
+import time
+import hashlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import classification_report, accuracy_score, f1_score
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.decomposition import TruncatedSVD, LatentDirichletAllocation
 from sklearn.pipeline import FeatureUnion
-import joblib
+from sklearn.base import clone
+from src.services.DatasetStorageService import DatasetStorageService
+from src.services.TokenStoreService import TokenStoreService
+from src.services.FeatureCacheService import FeatureCacheService
+from src.services.ModelRegistryService import ModelRegistryService
+from src.utils.TokenUtil import TokenNgramVectorizer
+from src.utils.HashingUtil import HashedNgramVectorizer
+from src.utils.JobUtil import report_stage
+from src.utils.ForestUtil import FlatForest, flatten_pipeline
+from src.utils.ManifestUtil import save_manifest, load_manifest
 
 BASE_DIR = Path(__file__).resolve().parent
 MODELS_DIR = (BASE_DIR / '..' / 'final-models').resolve()
 DATASET_DIR = (BASE_DIR / '..' / 'final-dataset').resolve()
 
-RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.csv')  
+RAW_DATASET_PATH = os.path.join(DATASET_DIR, 'raw_dataset.parquet')  
 
-FULL_DATASET_DATASET_PATH = os.path.join(DATASET_DIR, 'full_dataset.csv')  
-FULL_DATASET_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_train_dataset.csv')
-FULL_DATASET_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_test_dataset.csv')
+FULL_DATASET_DATASET_PATH = os.path.join(DATASET_DIR, 'full_dataset.parquet')  
+FULL_DATASET_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_train_dataset.parquet')
+FULL_DATASET_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_test_dataset.parquet')
 RF_FULL_PATH = os.path.join(MODELS_DIR, 'random_forest_full_model.pkl')
+RF_FULL_MODEL_NAME = 'random_forest_full'
+# serving copy of the same pipeline with the forest flattened (ForestUtil.FlatForest)
+RF_FULL_ENGINE_NAME = 'random_forest_full_flat'
+# flat copy keeping fewer trees / a depth cap, chosen from the truncation curve
+RF_REDUCED_ENGINE_NAME = 'random_forest_full_reduced'
+RF_TRUNCATION_REPORT_PATH = os.path.join(MODELS_DIR, 'random_forest_full_truncation.json')
+
+# grid of the truncation curve, None = every tree / no depth cap
+TRUNCATION_TREE_COUNTS = [25, 50, 100, 200, 400, 800, None]
+TRUNCATION_DEPTHS = [10, 15, 20, None]
+
+# n-gram featurizer of the full RF: "token" counts exact n-grams (all of them
+# held in memory while fitting), "hashed" streams the corpus into hashed
+# buckets with fixed memory, pruning n-grams seen fewer than
+# RF_HASHED_MIN_COUNT times (see benchmarks/hashed_vectorizer_benchmark.py)
+RF_VECTORIZER = os.getenv("RF_VECTORIZER", "token")
+RF_HASHED_FEATURES = int(os.getenv("RF_HASHED_FEATURES", str(2 ** 20)))
+RF_HASHED_MIN_COUNT = int(os.getenv("RF_HASHED_MIN_COUNT", "2"))
+
+# incremental updates: trees appended per labeled batch, trained on the batch
+# plus a sample of the original training rows so they still see every class
+INCREMENTAL_TREES = 100
+INCREMENTAL_REPLAY_ROWS = 20000
+RF_INCREMENTAL_REPORT_PATH = os.path.join(MODELS_DIR, 'random_forest_full_incremental.json')
+# labeled batches are uploaded here and referred to by bare file name
+RF_BATCHES_DIR = os.getenv("RF_BATCHES_DIR", str((DATASET_DIR / 'batches').resolve()))
+BATCH_SUFFIXES = (".parquet", ".csv")
 
 SAD_MAJOR_WEIGHT = 1.1
 SAD_MINOR_WEIGHT = 1.3
 DEFAULT_WEIGHT = 1.0
 
 class RFTrainingService:
+    def __init__(self):
+        self.storage = DatasetStorageService()
+        self.token_store = TokenStoreService()
+        self.feature_cache = FeatureCacheService()
+        self.registry = ModelRegistryService(MODELS_DIR)
+
     def build_full_dataset(self) -> str:
-        if not os.path.exists(RAW_DATASET_PATH):
+        if not self.storage.exists(RAW_DATASET_PATH):
             raise FileNotFoundError(
                 f"Full dataset missing: {RAW_DATASET_PATH}"
             )
 
-        df = pd.read_csv(RAW_DATASET_PATH)
+        df = self.storage.read(RAW_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Building FULL N-GRAMS dataset from {df.shape[0]} samples...")
 
-        # Build the combined token sequence
-        df["ngrams_input"] = df["forteclass_sequence"] + " | " + df["mode"]
-
-        # Save
-        df.to_csv(FULL_DATASET_DATASET_PATH, index=False)
+        # Every raw row; ngrams_input (sequence | mode) is derived on read
+        self.storage.write_view(FULL_DATASET_DATASET_PATH, RAW_DATASET_PATH, df.index)
 
         print(f"✅ N-GRAMS dataset saved: {FULL_DATASET_DATASET_PATH}")
 
         return FULL_DATASET_DATASET_PATH
     
     def split_full_dataset(self, test_size=0.15, random_state=42) -> dict:
-        if not os.path.exists(FULL_DATASET_DATASET_PATH):
+        if not self.storage.exists(FULL_DATASET_DATASET_PATH):
             raise FileNotFoundError(
                 f"N-grams dataset missing: {FULL_DATASET_DATASET_PATH}"
             )
 
-        df = pd.read_csv(FULL_DATASET_DATASET_PATH)
+        df = self.storage.read(FULL_DATASET_DATASET_PATH, columns=["emotion"])
 
         print(f"📊 Loaded FULL N-GRAMS dataset: {df.shape[0]} samples")
         print(f"📤 Splitting ({100 - int(test_size*100)}% train / {int(test_size*100)}% test)")
@@ -65,8 +106,8 @@ class RFTrainingService:
             stratify=df["emotion"]
         )
 
-        train_df.to_csv(FULL_DATASET_TRAIN_DATASET_PATH, index=False)
-        test_df.to_csv(FULL_DATASET_TEST_DATASET_PATH, index=False)
+        self.storage.write_view(FULL_DATASET_TRAIN_DATASET_PATH, FULL_DATASET_DATASET_PATH, train_df.index)
+        self.storage.write_view(FULL_DATASET_TEST_DATASET_PATH, FULL_DATASET_DATASET_PATH, test_df.index)
 
         print(f"✅ FULL N-GRAMS train saved: {FULL_DATASET_TRAIN_DATASET_PATH} ({train_df.shape[0]} samples)")
         print(f"🧪 FULL N-GRAMS test saved:  {FULL_DATASET_TEST_DATASET_PATH} ({test_df.shape[0]} samples)")
@@ -98,73 +139,461 @@ class RFTrainingService:
         return sample_weights
 
 
-    def train_full_dataset(self):
+    def train_full_dataset(self, vectorizer: str = RF_VECTORIZER, hashed_features: int = RF_HASHED_FEATURES, hashed_min_count: int = RF_HASHED_MIN_COUNT):
         print("📘 Loading dataset...")
-        df_train = pd.read_csv(FULL_DATASET_TRAIN_DATASET_PATH)
-        df_train = df_train.dropna(subset=["ngrams_input", "emotion", "mode"])
-        
-        X_train = df_train["ngrams_input"].astype(str)
+        report_stage("load")
+        df_train = self.storage.read(FULL_DATASET_TRAIN_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"], tokens="list")
+        df_train = df_train.dropna(subset=["forteclass_sequence", "emotion", "mode"])
+
+        # memory-mapped token ids of "forteclass_sequence | mode", same rows as df_train
+        X_train = self.token_store.open(FULL_DATASET_TRAIN_DATASET_PATH).take(df_train.index.to_numpy())
         y_train = df_train["emotion"].astype(str)
 
         w_train = self.calculate_sample_weights(df_train)
 
         print("🔧 Building pipeline...")
 
-        pipeline = Pipeline([
-            ("vect", CountVectorizer(
-                lowercase=False,
-                token_pattern=r"[0-9A-Za-z\-]+",
-                ngram_range=(1, 5),
-                max_features=24000
-            )),
+        features = [
+            ("vect", self.build_vectorizer(vectorizer, hashed_features, hashed_min_count)),
             ("lda", LatentDirichletAllocation(
                 n_components = 30,
                 max_iter = 40,
                 learning_method = "online",
                 learning_decay = 0.7,
                 n_jobs=-1
-            )),
-            ("clf", RandomForestClassifier(
-                n_estimators=1200,
-                max_depth=25,
-                min_samples_leaf=2,
-                min_samples_split=4,
-                max_features="log2",
-                n_jobs=-1,
-                random_state=42
             ))
-        ])
+        ]
+
+        clf = RandomForestClassifier(
+            n_estimators=1200,
+            max_depth=25,
+            min_samples_leaf=2,
+            min_samples_split=4,
+            max_features="log2",
+            n_jobs=-1,
+            random_state=42
+        )
+
+        # n-gram counts and LDA topics are reused from the feature cache when
+        # the data and transformer params did not change
+        fitted, X_topics = self.feature_cache.fit_transform(features, X_train)
 
-        pipeline.fit(X_train, y_train, clf__sample_weight=w_train) 
+        report_stage("forest", n_estimators=clf.n_estimators)
+        clf.fit(X_topics, y_train, sample_weight=w_train)
+
+        pipeline = Pipeline([*fitted, ("clf", clf)])
         
         print("💾 Saving FULL pipeline...")
-        joblib.dump(pipeline, RF_FULL_PATH)
+        report_stage("save")
+        entry = self.registry.publish(RF_FULL_MODEL_NAME, pipeline, {
+            "dataset": os.path.basename(FULL_DATASET_TRAIN_DATASET_PATH),
+            "train_samples": int(len(y_train)),
+            "features_key": getattr(fitted[-1][1], "feature_cache_key_", None),
+            "params": {name: step.get_params(deep=False) for name, step in pipeline.steps}
+        })
 
-        print(f"✅ Training complete. Saved pipeline to:\n{RF_FULL_PATH}")
+        print(f"✅ Training complete. Published pipeline version {entry['version']} of {RF_FULL_MODEL_NAME}")
 
-    def evaluate_final_rf(self):
+        report_stage("export")
+        self.export_serving_engines(entry["version"])
+
+        return entry
+
+    def build_vectorizer(self, vectorizer: str = RF_VECTORIZER, hashed_features: int = RF_HASHED_FEATURES, hashed_min_count: int = RF_HASHED_MIN_COUNT):
+        if vectorizer == "hashed":
+            return HashedNgramVectorizer(
+                ngram_range=(1, 5),
+                n_features=hashed_features,
+                max_features=24000,
+                min_count=hashed_min_count
+            )
+
+        if vectorizer != "token":
+            raise ValueError(f"Unknown RF_VECTORIZER '{vectorizer}'. Available: ['token', 'hashed']")
+
+        return TokenNgramVectorizer(
+            ngram_range=(1, 5),
+            max_features=24000
+        )
+
+    def export_serving_engines(self, version: str = None) -> dict:
+        """
+        Exports the flat forest of a full RF version and, when a reduced
+        model is in use, its reduced copy with the same tree count and
+        depth cap.
+        """
+        entries = {"full": self.export_full_engine(version), "reduced": None}
+
+        if os.path.exists(self.registry.pointer_path(RF_REDUCED_ENGINE_NAME)):
+            reduced = self.registry.current(RF_REDUCED_ENGINE_NAME)
+            metadata = self.registry.metadata(RF_REDUCED_ENGINE_NAME, reduced["version"])
+            entries["reduced"] = self.export_reduced_engine(metadata.get("n_estimators"), metadata.get("max_depth"), version)
+
+        return entries
+
+    def export_full_engine(self, version: str = None) -> dict:
+        """
+        Publishes the flattened-forest serving copy of a full RF version
+        (the current one by default).
+        """
+        pipeline, version = self.registry.load(RF_FULL_MODEL_NAME, version, legacy_path=RF_FULL_PATH)
+        flat = flatten_pipeline(pipeline)
+        forest = flat.steps[-1][1]
+
+        entry = self.registry.publish(RF_FULL_ENGINE_NAME, flat, {
+            "source_version": version,
+            "n_estimators": forest.n_estimators,
+            "n_nodes": int(len(forest.feature)),
+            "forest_bytes": forest.nbytes
+        })
+
+        print(f"🌲 Exported flat forest of {version}: {forest.n_estimators} trees, {forest.nbytes / 1e6:.1f} MB")
+        return entry
+
+    def export_reduced_engine(self, n_estimators: int = None, max_depth: int = None, version: str = None) -> dict:
+        """
+        Publishes a flat copy of a full RF version (the current one by
+        default) keeping its first n_estimators trees, cut at max_depth.
+        Served with RF_ENGINE=reduced.
+        """
+        pipeline, version = self.registry.load(RF_FULL_MODEL_NAME, version, legacy_path=RF_FULL_PATH)
+        reduced = flatten_pipeline(pipeline, n_estimators, max_depth)
+        forest = reduced.steps[-1][1]
+
+        # accuracy measured for this point by the last truncation curve of the same version
+        report = load_manifest(RF_TRUNCATION_REPORT_PATH)
+        point = next((
+            p for p in report.get("points", [])
+            if report.get("model_version") == version and p["n_estimators"] == forest.n_estimators and p["max_depth"] == max_depth
+        ), {})
+
+        entry = self.registry.publish(RF_REDUCED_ENGINE_NAME, reduced, {
+            "source_version": version,
+            "n_estimators": forest.n_estimators,
+            "max_depth": max_depth,
+            "n_nodes": int(len(forest.feature)),
+            "forest_bytes": forest.nbytes,
+            "accuracy": point.get("accuracy"),
+            "forest_p50_ms": point.get("forest_p50_ms")
+        })
+
+        print(f"✂️ Exported reduced forest of {version}: {forest.n_estimators} trees, max depth {max_depth}, {forest.nbytes / 1e6:.1f} MB")
+        return entry
+
+    def test_features(self, pipeline) -> tuple:
+        """
+        (features, labels) of the full test set for a fitted pipeline, the
+        features coming from the feature cache when already computed.
+        """
         print("📘 Loading test dataset...")
-        if not os.path.exists(FULL_DATASET_TEST_DATASET_PATH):
+        if not self.storage.exists(FULL_DATASET_TEST_DATASET_PATH):
             raise FileNotFoundError(
                 f"Test dataset missing: {FULL_DATASET_TEST_DATASET_PATH}"
             )
 
-        df_test = pd.read_csv(FULL_DATASET_TEST_DATASET_PATH)
-        df_test = df_test.dropna(subset=["ngrams_input", "emotion"])
+        df_test = self.storage.read(FULL_DATASET_TEST_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"], tokens="list")
+        df_test = df_test.dropna(subset=["forteclass_sequence", "emotion", "mode"])
 
-        X_test = df_test["ngrams_input"].astype(str)
         y_test = df_test["emotion"].astype(str)
+        X_test = self.token_store.model_input(pipeline, FULL_DATASET_TEST_DATASET_PATH, df_test.index.to_numpy())
+
+        return self.feature_cache.transform(pipeline.steps[:-1], X_test), y_test
+
+    def save_batch(self, filename: str, file) -> str:
+        """
+        Stores an uploaded labeled batch in RF_BATCHES_DIR and returns its
+        name there (the sanitized file name prefixed by its content hash, so
+        an applied batch is never overwritten by another upload).
+        """
+        name = re.sub(r"[^0-9A-Za-z._-]", "_", os.path.basename(filename or ""))
+        if Path(name).suffix.lower() not in BATCH_SUFFIXES:
+            raise ValueError(f"Batch must be one of {list(BATCH_SUFFIXES)} files: {filename!r}")
+
+        os.makedirs(RF_BATCHES_DIR, exist_ok=True)
+        tmp_path = os.path.join(RF_BATCHES_DIR, f".{os.getpid()}.upload.tmp")
+        digest = hashlib.sha256()
+
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+                f.write(chunk)
+
+        name = f"{digest.hexdigest()[:12]}_{Path(name).stem}{Path(name).suffix.lower()}"
+        os.replace(tmp_path, os.path.join(RF_BATCHES_DIR, name))
+
+        print(f"📥 Saved batch {name}")
+        return name
+
+    def batch_path(self, name: str) -> str:
+        """
+        Path of a labeled batch of RF_BATCHES_DIR. Only bare file names are
+        accepted, and nothing that resolves outside the folder (symlinks
+        included) is read.
+        """
+        if not name or os.path.basename(name) != name or Path(name).suffix.lower() not in BATCH_SUFFIXES:
+            raise ValueError(f"Invalid batch name {name!r}: expected a {' or '.join(BATCH_SUFFIXES)} file of the batches folder.")
+
+        root = os.path.realpath(RF_BATCHES_DIR)
+        path = os.path.join(root, name)
+
+        # the storage reads the .parquet copy of a .csv (written on first read)
+        for candidate in (self.storage.parquet_path(path), self.storage.csv_path(path)):
+            if os.path.commonpath([root, os.path.realpath(candidate)]) != root:
+                raise ValueError(f"Invalid batch name {name!r}: it resolves outside the batches folder.")
+
+        if not self.storage.exists(path):
+            raise FileNotFoundError(f"Batch dataset missing: {name}")
+
+        return path
+
+    def batch_features(self, pipeline, batch: str) -> tuple:
+        """
+        (features, labels, sample weights) of a labeled batch of
+        RF_BATCHES_DIR (Parquet/CSV with forteclass_sequence, mode and
+        emotion) through the fitted vectorizer and LDA of a pipeline.
+        """
+        batch_path = self.batch_path(batch)
+
+        df = self.storage.read(batch_path, columns=["ngrams_input", "emotion", "mode"])
+        df = df.dropna(subset=["ngrams_input", "emotion", "mode"])
+
+        if df.empty:
+            raise ValueError(f"Batch dataset has no labeled rows: {batch}")
+
+        X = self.feature_cache.transform(pipeline.steps[:-1], df["ngrams_input"].astype(str).tolist())
+
+        return X, df["emotion"].astype(str).to_numpy(), self.calculate_sample_weights(df)
+
+    def train_features(self, pipeline, sample: int = None, random_state: int = 42) -> tuple:
+        """
+        (features, labels, sample weights) of the full train set for a fitted
+        pipeline, from the feature cache when already computed. With sample,
+        only that many random train rows are transformed.
+        """
+        df_train = self.storage.read(FULL_DATASET_TRAIN_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"], tokens="list")
+        df_train = df_train.dropna(subset=["forteclass_sequence", "emotion", "mode"])
+
+        if sample is not None:
+            rng = np.random.default_rng(random_state)
+            rows = np.sort(rng.choice(len(df_train), size=min(sample, len(df_train)), replace=False))
+            df_train = df_train.iloc[rows]
+        X_train = self.token_store.model_input(pipeline, FULL_DATASET_TRAIN_DATASET_PATH, df_train.index.to_numpy())
+
+        X = self.feature_cache.transform(pipeline.steps[:-1], X_train)
+
+        return X, df_train["emotion"].astype(str).to_numpy(), self.calculate_sample_weights(df_train)
+
+    def update_full_model(self, batch: str, n_trees: int = INCREMENTAL_TREES, replay_rows: int = INCREMENTAL_REPLAY_ROWS,
+                          max_estimators: int = None, compare_full: bool = False, random_state: int = 42) -> dict:
+        """
+        Applies a new labeled batch (a file name of RF_BATCHES_DIR, see
+        save_batch) to the current full RF without a full
+        retrain: the vectorizer and LDA stay as they are and the forest is
+        warm-started with n_trees more trees, fitted on the batch plus
+        replay_rows random rows of the train set. max_estimators drops the
+        oldest trees beyond that size. Publishes a new version and reports
+        its test accuracy against the previous version and, with
+        compare_full, against a forest retrained from scratch on the train
+        set plus every batch applied so far (drift). Saved to
+        RF_INCREMENTAL_REPORT_PATH.
+        """
+        start = time.perf_counter()
 
         print("🔍 Loading saved pipeline...")
-        if not os.path.exists(RF_FULL_PATH):
-            raise FileNotFoundError(
-                f"Trained RF model not found: {RF_FULL_PATH}"
+        report_stage("load")
+        pipeline, version = self.registry.load(RF_FULL_MODEL_NAME, legacy_path=RF_FULL_PATH)
+        previous = self.registry.metadata(RF_FULL_MODEL_NAME, version) if version else {}
+        base_forest = pipeline.steps[-1][1]
+        history = previous.get("incremental", {})
+
+        print(f"📥 Applying batch {batch}...")
+        report_stage("batch")
+        featurize_start = time.perf_counter()
+        X_batch, y_batch, w_batch = self.batch_features(pipeline, batch)
+
+        # only the replayed rows go through the vectorizer and LDA
+        report_stage("replay", rows=replay_rows)
+        X_replay, y_replay, w_replay = self.train_features(pipeline, sample=replay_rows, random_state=random_state)
+        featurize_seconds = time.perf_counter() - featurize_start
+
+        X_fit = np.vstack([np.asarray(X_batch), np.asarray(X_replay)])
+        y_fit = np.concatenate([y_batch, y_replay])
+        w_fit = np.concatenate([w_batch, w_replay])
+
+        unknown = set(y_fit) - set(base_forest.classes_)
+        if unknown or len(set(y_fit)) != len(base_forest.classes_):
+            raise ValueError(
+                f"Batch + replay labels {sorted(set(y_fit))} differ from the model classes {list(base_forest.classes_)}. "
+                "New or missing emotions need a full retrain."
             )
 
-        pipeline = joblib.load(RF_FULL_PATH)
+        report_stage("forest", n_estimators=n_trees)
+        fit_start = time.perf_counter()
+        forest = clone(base_forest)
+        forest.__dict__.update({k: v for k, v in base_forest.__dict__.items() if k.endswith("_")})
+        # warm start extends the tree list in place, keep the base forest intact
+        forest.estimators_ = list(base_forest.estimators_)
+        forest.set_params(warm_start=True, n_estimators=len(base_forest.estimators_) + n_trees)
+        forest.fit(X_fit, y_fit, sample_weight=w_fit)
+
+        if max_estimators and len(forest.estimators_) > max_estimators:
+            forest.estimators_ = forest.estimators_[-max_estimators:]
+        forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+        fit_seconds = time.perf_counter() - fit_start
+
+        update_seconds = time.perf_counter() - start
+        updated = Pipeline([*pipeline.steps[:-1], ("clf", forest)])
+
+        report_stage("evaluate")
+        X_test, y_test = self.test_features(pipeline)
+        base_pred = base_forest.predict(X_test)
+        updated_pred = forest.predict(X_test)
+
+        report = {
+            "base_version": version,
+            "batch": batch,
+            "batch_samples": int(len(y_batch)),
+            "replay_samples": int(len(y_replay)),
+            "n_estimators": int(len(forest.estimators_)),
+            "update_seconds": float(update_seconds),
+            "featurize_seconds": float(featurize_seconds),
+            "fit_seconds": float(fit_seconds),
+            "test_samples": int(len(y_test)),
+            "base_accuracy": float(accuracy_score(y_test, base_pred)),
+            "incremental_accuracy": float(accuracy_score(y_test, updated_pred)),
+            "incremental_macro_f1": float(f1_score(y_test, updated_pred, average="macro"))
+        }
+
+        batches = [*history.get("batches", []), batch]
+        full_n_estimators = history.get("full_n_estimators", len(base_forest.estimators_))
+
+        if compare_full:
+            print("🌲 Retraining the forest from scratch for the drift report...")
+            report_stage("full-retrain", n_estimators=full_n_estimators)
+            X_train, y_train, w_train = self.train_features(pipeline)
+            parts = [self.batch_features(pipeline, name) for name in batches]
+            full_start = time.perf_counter()
+            full = clone(base_forest).set_params(warm_start=False, n_estimators=full_n_estimators)
+            full.fit(
+                np.vstack([np.asarray(X_train), *[np.asarray(p[0]) for p in parts]]),
+                np.concatenate([y_train, *[p[1] for p in parts]]),
+                sample_weight=np.concatenate([w_train, *[p[2] for p in parts]])
+            )
+            full_pred = full.predict(X_test)
+
+            report.update({
+                "full_retrain_seconds": float(time.perf_counter() - full_start),
+                "full_accuracy": float(accuracy_score(y_test, full_pred)),
+                "accuracy_drift": float(accuracy_score(y_test, updated_pred) - accuracy_score(y_test, full_pred)),
+                "agreement_with_full": float(np.mean(updated_pred == full_pred))
+            })
+
+        print("💾 Saving updated pipeline...")
+        report_stage("save")
+        entry = self.registry.publish(RF_FULL_MODEL_NAME, updated, {
+            **{k: previous[k] for k in ("dataset", "train_samples", "features_key") if k in previous},
+            "incremental": {
+                "base_version": version,
+                "batches": batches,
+                "full_n_estimators": full_n_estimators
+            },
+            "params": {name: step.get_params(deep=False) for name, step in updated.steps}
+        })
+        report["model_version"] = entry["version"]
+
+        report_stage("export")
+        self.export_serving_engines(entry["version"])
+
+        save_manifest(RF_INCREMENTAL_REPORT_PATH, report)
+
+        drift = f", drift vs full retrain {report['accuracy_drift']:+.4f}" if compare_full else ""
+        print(
+            f"✅ Batch applied in {update_seconds:.1f}s (featurize {featurize_seconds:.1f}s, fit {fit_seconds:.1f}s): {report['batch_samples']} rows, {report['n_estimators']} trees, "
+            f"accuracy {report['base_accuracy']:.4f} -> {report['incremental_accuracy']:.4f}{drift}"
+        )
+
+        return report
+
+    def forest_truncation_curve(self, tree_counts: list = None, depths: list = None, latency_rows: int = 200) -> dict:
+        """
+        Accuracy vs single-row latency of the current full RF served with
+        fewer trees and/or a depth cap, over the tree_counts x depths grid
+        (None = every tree / no cap). Points no other point beats on both
+        accuracy and latency are marked "pareto". Saved to
+        RF_TRUNCATION_REPORT_PATH; pick a point with export_reduced_engine().
+        """
+        tree_counts = [None if v in (None, "all", "none") else int(v) for v in (tree_counts or TRUNCATION_TREE_COUNTS)]
+        depths = [None if v in (None, "all", "none") else int(v) for v in (depths or TRUNCATION_DEPTHS)]
+
+        print("🔍 Loading saved pipeline...")
+        report_stage("load")
+        pipeline, version = self.registry.load(RF_FULL_MODEL_NAME, legacy_path=RF_FULL_PATH)
+        forest = pipeline.steps[-1][1]
+
+        X_features, y_test = self.test_features(pipeline)
+        X_features = np.asarray(X_features.toarray() if hasattr(X_features, "toarray") else X_features)
+        latency_X = X_features[:latency_rows]
+
+        points = []
+
+        for max_depth in depths:
+            for n_estimators in tree_counts:
+                if n_estimators is not None and n_estimators > len(forest.estimators_):
+                    continue
+
+                report_stage("truncate", n_estimators=n_estimators, max_depth=max_depth)
+                flat = FlatForest.from_sklearn(forest, n_estimators, max_depth)
+                y_pred = flat.predict(X_features)
+
+                flat.predict_proba(latency_X[:1])
+                times = []
+                for row in latency_X:
+                    start = time.perf_counter()
+                    flat.predict_proba(row[None, :])
+                    times.append(time.perf_counter() - start)
+                times = np.array(times) * 1000
+
+                points.append({
+                    "n_estimators": flat.n_estimators,
+                    "max_depth": max_depth,
+                    "accuracy": float(accuracy_score(y_test, y_pred)),
+                    "macro_f1": float(f1_score(y_test, y_pred, average="macro")),
+                    "forest_p50_ms": float(np.percentile(times, 50)),
+                    "forest_p95_ms": float(np.percentile(times, 95)),
+                    "forest_bytes": flat.nbytes
+                })
+
+                p = points[-1]
+                print(f"✂️ trees={p['n_estimators']:>5} depth={str(max_depth):>4}  acc={p['accuracy']:.4f}  f1={p['macro_f1']:.4f}  p50={p['forest_p50_ms']:.2f}ms  {p['forest_bytes'] / 1e6:.1f}MB")
+
+        for p in points:
+            p["pareto"] = not any(
+                q["accuracy"] >= p["accuracy"] and q["forest_p50_ms"] <= p["forest_p50_ms"]
+                and (q["accuracy"] > p["accuracy"] or q["forest_p50_ms"] < p["forest_p50_ms"])
+                for q in points
+            )
+
+        report = {
+            "model_version": version,
+            "test_samples": int(len(y_test)),
+            "latency_rows": int(len(latency_X)),
+            "points": points
+        }
+        save_manifest(RF_TRUNCATION_REPORT_PATH, report)
+
+        print(f"📈 Truncation curve saved to {RF_TRUNCATION_REPORT_PATH}")
+        return report
+
+    def evaluate_final_rf(self):
+        print("🔍 Loading saved pipeline...")
+        report_stage("load")
+        pipeline, version = self.registry.load(RF_FULL_MODEL_NAME, legacy_path=RF_FULL_PATH)
 
         print("🧪 Evaluating model...")
-        y_pred = pipeline.predict(X_test)
+        X_features, y_test = self.test_features(pipeline)
+
+        report_stage("predict")
+        y_pred = pipeline.steps[-1][1].predict(X_features)
 
         accuracy = accuracy_score(y_test, y_pred)
 
@@ -195,5 +624,6 @@ class RFTrainingService:
 
         return {
             "accuracy": accuracy,
-            "metrics": metrics_report
+            "metrics": metrics_report,
+            "model_version": version
         }
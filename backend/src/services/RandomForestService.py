@@ -4,22 +4,191 @@ from pathlib import Path
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report, accuracy_score
 from sklearn.pipeline import FeatureUnion
+from sklearn.decomposition import LatentDirichletAllocation
 import joblib
 import numpy as np
+import atexit
+import threading
+from src.services.DatasetStorageService import DatasetStorageService
+from src.services.TokenStoreService import TokenStoreService
+from src.services.FeatureCacheService import FeatureCacheService
+from src.services.ModelRegistryService import ModelRegistryService, LiveModel
+from src.utils.TokenUtil import TokenNgramVectorizer, TokenSequences
+from src.utils.HashingUtil import HashedNgramVectorizer
+from src.utils.BatchUtil import MicroBatcher
+from src.utils.CacheUtil import LRUCache
+from src.utils.PredictionUtil import emotion_result, predict_emotions, class_probabilities
+from src.utils.TimelineUtil import sliding_ngram_counts
 
 BASE_DIR = Path(__file__).resolve().parent                   
 MODELS_DIR = (BASE_DIR / '..' / 'final-models').resolve()
 DATASET_DIR = (BASE_DIR / '..' / 'final-dataset').resolve()
 
-BALANCED_CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_dataset.csv')  
-BALANCED_CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_train_dataset.csv')
-BALANCED_CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_test_dataset.csv')
+BALANCED_CHUNKED_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_dataset.parquet')  
+BALANCED_CHUNKED_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'balanced_chunked_40_strict_train_dataset.parquet')
+BALANCED_CHUNKED_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'chunked_40_strict_test_dataset.parquet')
 RF_BALANCED_CHUNKED_PATH = os.path.join(MODELS_DIR, 'random_forest_balanced_chunked_40_strict_model.pkl')
 
-FULL_DATASET_DATASET_PATH = os.path.join(DATASET_DIR, 'full_dataset.csv')  
-FULL_DATASET_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_train_dataset.csv')
-FULL_DATASET_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_test_dataset.csv')
+FULL_DATASET_DATASET_PATH = os.path.join(DATASET_DIR, 'full_dataset.parquet')  
+FULL_DATASET_TRAIN_DATASET_PATH = os.path.join(DATASET_DIR, 'full_train_dataset.parquet')
+FULL_DATASET_TEST_DATASET_PATH = os.path.join(DATASET_DIR, 'full_test_dataset.parquet')
 RF_FULL_PATH = os.path.join(MODELS_DIR, 'random_forest_full_model.pkl')
+RF_FULL_MODEL_NAME = 'random_forest_full'
+RF_FULL_ENGINE_NAME = 'random_forest_full_flat'
+RF_REDUCED_ENGINE_NAME = 'random_forest_full_reduced'
+
+# "flat" serves the array-backed forest (ForestUtil.FlatForest), "sklearn" the
+# original pipeline, "reduced" the truncated forest exported from the
+# truncation curve (RFTrainingService.export_reduced_engine)
+RF_ENGINE = os.getenv("RF_ENGINE", "flat")
+RF_ENGINES = {
+    "sklearn": RF_FULL_MODEL_NAME,
+    "flat": RF_FULL_ENGINE_NAME,
+    "reduced": RF_REDUCED_ENGINE_NAME
+}
+
+# concurrent predict_full_ngrams calls arriving within the window share one
+# predict_proba call; a window of 0 predicts every request on its own
+RF_BATCH_WINDOW_MS = float(os.getenv("RF_BATCH_WINDOW_MS", "3"))
+RF_BATCH_MAX_SIZE = int(os.getenv("RF_BATCH_MAX_SIZE", "32"))
+
+# probabilities by (model version, exact model input); 0 disables the cache
+RF_PREDICTION_CACHE_SIZE = int(os.getenv("RF_PREDICTION_CACHE_SIZE", "4096"))
+# JSON file the cache is saved to (on exit and every RF_PREDICTION_CACHE_SAVE_EVERY
+# new entries) and reloaded from at startup; empty keeps it in memory only
+RF_PREDICTION_CACHE_PATH = os.getenv("RF_PREDICTION_CACHE_PATH", "")
+RF_PREDICTION_CACHE_SAVE_EVERY = int(os.getenv("RF_PREDICTION_CACHE_SAVE_EVERY", "256"))
+
+# serve-time LDA inference per document (LatentDirichletAllocation's
+# max_doc_update_iter / mean_change_tol); empty keeps the training settings.
+# See benchmarks/lda_inference_benchmark.py before lowering them.
+RF_LDA_MAX_DOC_UPDATE_ITER = os.getenv("RF_LDA_MAX_DOC_UPDATE_ITER", "")
+RF_LDA_MEAN_CHANGE_TOL = os.getenv("RF_LDA_MEAN_CHANGE_TOL", "")
+
+# emotion timeline: windows of RF_TIMELINE_WINDOW chords, RF_TIMELINE_STEP apart
+RF_TIMELINE_WINDOW = int(os.getenv("RF_TIMELINE_WINDOW", "16"))
+RF_TIMELINE_STEP = int(os.getenv("RF_TIMELINE_STEP", "4"))
+
+_full_model = None
+_full_model_lock = threading.Lock()
+_batcher = None
+_batcher_lock = threading.Lock()
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+_unsaved_predictions = 0
+_evaluation = None
+_evaluation_lock = threading.Lock()
+
+def warm_up(model):
+    # a request predicts a few rows: joblib dispatch (LDA, sklearn forest)
+    # costs more than it saves
+    for _, step in getattr(model, "steps", []):
+        if "n_jobs" in step.get_params(deep=False):
+            step.set_params(n_jobs=1)
+
+        if isinstance(step, LatentDirichletAllocation):
+            if RF_LDA_MAX_DOC_UPDATE_ITER:
+                step.set_params(max_doc_update_iter=int(RF_LDA_MAX_DOC_UPDATE_ITER))
+            if RF_LDA_MEAN_CHANGE_TOL:
+                step.set_params(mean_change_tol=float(RF_LDA_MEAN_CHANGE_TOL))
+
+    # first predict pays for lazy allocations, keep it off the request path
+    model.predict_proba(["3-11,4-20,3-11 | major | C"])
+
+def predict_rows(items: list) -> list:
+    """
+    Probabilities of (model, row) items, one predict_proba per model and
+    input kind (text or token ids).
+    """
+    groups = {}
+    for i, (model, row) in enumerate(items):
+        groups.setdefault((id(model), isinstance(row, str)), []).append(i)
+
+    results = [None] * len(items)
+
+    for (_, is_text), positions in groups.items():
+        model = items[positions[0]][0]
+        rows = [items[i][1] for i in positions]
+        probs = model.predict_proba(rows if is_text else TokenSequences.from_arrays(rows))
+
+        for i, p in zip(positions, probs):
+            results[i] = p
+
+    return results
+
+def prediction_cache() -> LRUCache:
+    """
+    Predictions shared by every request of this worker, None when disabled.
+    """
+    global _prediction_cache
+
+    with _prediction_cache_lock:
+        if _prediction_cache is None and RF_PREDICTION_CACHE_SIZE > 0:
+            _prediction_cache = LRUCache(maxsize=RF_PREDICTION_CACHE_SIZE)
+
+            if RF_PREDICTION_CACHE_PATH:
+                count = _prediction_cache.load(RF_PREDICTION_CACHE_PATH)
+                print(f"♻️ Loaded {count} cached predictions from {RF_PREDICTION_CACHE_PATH}")
+                atexit.register(_prediction_cache.save, RF_PREDICTION_CACHE_PATH)
+
+        return _prediction_cache
+
+def remember_prediction(cache: LRUCache, key: tuple, probs: list):
+    global _unsaved_predictions
+
+    cache.set(key, probs)
+
+    if not RF_PREDICTION_CACHE_PATH:
+        return
+
+    with _prediction_cache_lock:
+        _unsaved_predictions += 1
+        save = _unsaved_predictions >= RF_PREDICTION_CACHE_SAVE_EVERY
+        if save:
+            _unsaved_predictions = 0
+
+    if save:
+        cache.save(RF_PREDICTION_CACHE_PATH)
+
+def batcher() -> MicroBatcher:
+    global _batcher
+
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(predict_rows, RF_BATCH_WINDOW_MS, RF_BATCH_MAX_SIZE)
+
+        return _batcher
+
+def full_model() -> LiveModel:
+    """
+    The full RF pipeline shared by every request of this worker, hot
+    reloaded when a new version is published. Which copy is served
+    depends on RF_ENGINE.
+    """
+    global _full_model
+
+    with _full_model_lock:
+        if _full_model is None:
+            if RF_ENGINE not in RF_ENGINES:
+                raise ValueError(f"Unknown RF_ENGINE '{RF_ENGINE}'. Available: {list(RF_ENGINES)}")
+
+            registry = ModelRegistryService(MODELS_DIR)
+            name = RF_ENGINES[RF_ENGINE]
+
+            # engines are exported by training or the "export-engines" job, never
+            # here: until then this worker serves the sklearn pipeline
+            if name != RF_FULL_MODEL_NAME and not os.path.exists(registry.pointer_path(name)):
+                print(f"⚠️ No {name} published yet, serving {RF_FULL_MODEL_NAME} (run the export-engines job and restart to switch).")
+                name = RF_FULL_MODEL_NAME
+
+            _full_model = LiveModel(
+                name,
+                legacy_path=RF_FULL_PATH if name == RF_FULL_MODEL_NAME else None,
+                warmup=warm_up,
+                registry=registry
+            )
+
+        return _full_model
 
 class RandomForestService:
     def __init__(self):
@@ -28,15 +197,13 @@ class RandomForestService:
         self.model_path = os.path.abspath(RF_FULL_PATH)
         self.vectorizer = None
         self.classifier = None
+        self.storage = DatasetStorageService()
+        self.token_store = TokenStoreService()
+        self.feature_cache = FeatureCacheService()
 
-        if os.path.exists(self.model_path):
-            print(f"🔹 Found trained model at: {self.model_path}")
-            self._emotion_model = joblib.load(RF_FULL_PATH)
-            # self.load_balanced_model()
-        else:
-            raise FileNotFoundError(
-                f"Trained model not found at {self.model_path}"
-            )
+        # one model version for the whole request, even if a reload happens meanwhile
+        self._emotion_model, self.model_version = full_model().get()
+        # self.load_balanced_model()
 
     def load_balanced_model(self):
         if not os.path.exists(RF_BALANCED_CHUNKED_PATH):
@@ -80,35 +247,110 @@ class RandomForestService:
 
         # Combine inputs
         combined = f"{forteclass_sequence} | {mode}"
-        X = [combined]
 
-        # Predict
-        pred = self._emotion_model.predict(X)[0]
-        probs = self._emotion_model.predict_proba(X)[0]
-
-        # Extract class names
-        classes = list(self._emotion_model.named_steps["model"].classes_)
-
-        return {
-            "emotion": str(pred),
-            "probabilities": {c: float(p) for c, p in zip(classes, probs)}
-        }
+        return predict_emotions(self._emotion_model, [combined])[0]
     
-    def predict_full_ngrams(self, forteclass_sequence: str, mode: str, tonic: str = None):
+    def token_vocabulary(self):
+        """
+        Token vocabulary of an id-based model (None for string models), used to
+        encode Forte classes to ids upstream, e.g. with forte_id_table().
+        """
+        vectorizer = self._emotion_model.steps[0][1]
+
+        if isinstance(vectorizer, (TokenNgramVectorizer, HashedNgramVectorizer)):
+            return vectorizer.token_vocabulary_
+
+        return None
+
+    def model_row(self, forteclass_sequence, mode: str, tonic: str = None):
+        """
+        Model input of one progression. forteclass_sequence is the
+        comma-joined string or, for id-based models, an array of ids from
+        token_vocabulary().
+        """
+        if isinstance(forteclass_sequence, str):
+            # must match training format
+            return f"{forteclass_sequence} | {mode} | {tonic}"
+
+        vocabulary = self.token_vocabulary()
+        if vocabulary is None:
+            raise ValueError("Token ids need a model trained with TokenNgramVectorizer or HashedNgramVectorizer.")
+
+        return np.concatenate([np.asarray(forteclass_sequence), vocabulary.encode_text(f"{mode} | {tonic}")])
+
+    def predict_emotions(self, forteclass_sequences: list, modes: list, tonics: list = None) -> list:
+        """
+        {"emotion", "probabilities"} of every progression, the emotion being
+        the most probable class. Cached rows are not predicted again, the
+        others share one predict_proba (a single row is micro-batched with
+        concurrent requests).
+        """
+        if self._emotion_model is None:
+            raise ValueError("Model not loaded.")
+
+        tonics = tonics if tonics is not None else [None] * len(forteclass_sequences)
+        rows = [self.model_row(s, m, t) for s, m, t in zip(forteclass_sequences, modes, tonics)]
+        # the LDA settings change the predictions of the same model version
+        settings = f"lda:{RF_LDA_MAX_DOC_UPDATE_ITER}:{RF_LDA_MEAN_CHANGE_TOL}"
+        keys = [
+            (self.model_version, settings, row if isinstance(row, str) else "ids:" + ",".join(map(str, row.tolist())))
+            for row in rows
+        ]
+
+        cache = prediction_cache()
+        probs = [cache.get(key) if cache is not None else None for key in keys]
+        missing = [i for i, p in enumerate(probs) if p is None]
+
+        if len(missing) == 1 and RF_BATCH_WINDOW_MS > 0:
+            predicted = [batcher().submit((self._emotion_model, rows[missing[0]]))]
+        elif missing:
+            predicted = predict_rows([(self._emotion_model, rows[i]) for i in missing])
+        else:
+            predicted = []
+
+        for i, p in zip(missing, predicted):
+            probs[i] = [float(v) for v in p]
+            if cache is not None:
+                remember_prediction(cache, keys[i], probs[i])
+
+        return [emotion_result(self._emotion_model.classes_, p) for p in probs]
+
+    def predict_full_ngrams(self, forteclass_sequence, mode: str, tonic: str = None):
+        """
+        forteclass_sequence is the comma-joined string or, for id-based
+        models, an array of ids from token_vocabulary().
+        """
+        return self.predict_emotions([forteclass_sequence], [mode], [tonic])[0]
+
+    def predict_timeline(self, forteclass_sequence: str, mode: str, tonic: str = None,
+                         window: int = RF_TIMELINE_WINDOW, step: int = RF_TIMELINE_STEP) -> list:
+        """
+        Emotion of every window of `window` chords of the progression,
+        `step` chords apart, as [{"start", "end", "emotion", "probabilities"}]
+        (start/end are chord positions, end exclusive). The n-gram counts of
+        the windows are built incrementally (TimelineUtil) and every window
+        goes through the rest of the pipeline in one batched call, so the
+        whole timeline costs about one prediction.
+        """
         if self._emotion_model is None:
             raise ValueError("Model not loaded.")
 
-        # must match training format
-        combined = f"{forteclass_sequence} | {mode} | {tonic}"
+        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
+            raise ValueError("Forteclass sequence is null or invalid.")
 
-        pred = self._emotion_model.predict([combined])[0]
-        probs = self._emotion_model.predict_proba([combined])[0]
-        classes = self._emotion_model.classes_
+        steps = getattr(self._emotion_model, "steps", None)
+        if steps is None:
+            raise ValueError("Timelines need a pipeline model.")
 
-        return {
-            "emotion": str(pred),
-            "probabilities": {c: float(p) for c, p in zip(classes, probs)}
-        }
+        # the same suffix model_row() appends to the whole progression
+        suffix = self.model_row("", mode, tonic)
+        counts, windows = sliding_ngram_counts(steps[0][1], forteclass_sequence, suffix, window, step)
+        probs = class_probabilities(self._emotion_model[1:], counts)
+
+        return [
+            {"start": start, "end": end, **emotion_result(self._emotion_model.classes_, p)}
+            for (start, end), p in zip(windows, probs)
+        ]
 
     # -----------------------
     # Evaluation
@@ -117,12 +359,12 @@ class RandomForestService:
         if not hasattr(self, "_emotion_model") or self._emotion_model is None:
             raise ValueError("50-chunk model not loaded. Run load_emotion_model() first.")
 
-        if not os.path.exists(BALANCED_CHUNKED_TEST_DATASET_PATH):
+        if not self.storage.exists(BALANCED_CHUNKED_TEST_DATASET_PATH):
             raise FileNotFoundError(
                 f"Balanced 50-chunk test dataset not found: {BALANCED_CHUNKED_TEST_DATASET_PATH}"
             )
 
-        df = pd.read_csv(BALANCED_CHUNKED_TEST_DATASET_PATH)
+        df = self.storage.read(BALANCED_CHUNKED_TEST_DATASET_PATH)
 
         # Clean rows
         df = df.dropna(subset=['forteclass_sequence', 'mode', 'emotion'])
@@ -133,7 +375,8 @@ class RandomForestService:
 
         print(f"🔍 Evaluating BALANCED 50-chunk model on {len(X)} samples...")
 
-        y_pred = self._emotion_model.predict(X)
+        X_features = self.feature_cache.transform(self._emotion_model.steps[:-1], X)
+        y_pred = self._emotion_model.steps[-1][1].predict(X_features)
 
         acc = accuracy_score(y_true, y_pred) * 100
         report = classification_report(y_true, y_pred, output_dict=True)
@@ -147,15 +390,32 @@ class RandomForestService:
             "n_samples": len(X)
         }
     
+    def full_ngrams_evaluation(self) -> dict:
+        """
+        Test-split evaluation of the served model version, computed once per
+        version by this worker (it predicts the whole test split).
+        """
+        global _evaluation
+
+        with _evaluation_lock:
+            if _evaluation is None or _evaluation[0] != self.model_version:
+                _evaluation = (self.model_version, self.evaluate_full_ngrams())
+
+            return _evaluation[1]
+
     def evaluate_full_ngrams(self):
-        df = pd.read_csv(FULL_DATASET_TEST_DATASET_PATH)
-        df = df.dropna(subset=["ngrams_input", "emotion"])
+        df = self.storage.read(FULL_DATASET_TEST_DATASET_PATH, columns=["forteclass_sequence", "emotion", "mode"], tokens="list")
+        df = df.dropna(subset=["forteclass_sequence", "emotion", "mode"])
 
-        X = df["ngrams_input"].astype(str)
+        X = self.token_store.model_input(self._emotion_model, FULL_DATASET_TEST_DATASET_PATH, df.index.to_numpy())
         y = df["emotion"].astype(str)
 
-        preds = self._emotion_model.predict(X)
-        probs = self._emotion_model.predict_proba(X)
+        X_features = self.feature_cache.transform(self._emotion_model.steps[:-1], X)
+        clf = self._emotion_model.steps[-1][1]
+
+        # one forest pass, the prediction is the most probable class
+        probs = clf.predict_proba(X_features)
+        preds = clf.classes_[np.argmax(probs, axis=1)]
 
         acc = accuracy_score(y, preds) * 100
         report = classification_report(y, preds, output_dict=True)
@@ -7,6 +7,7 @@ from sklearn.metrics import classification_report, accuracy_score
 from pathlib import Path
 import joblib
 import time
+from src.utils.PredictionUtil import predict_emotions
 
 BASE_DIR = Path(__file__).resolve().parent                    # /app/src/services
 MODELS_DIR = (BASE_DIR / '..' / 'AIModels').resolve()         # /app/src/AIModels
@@ -19,11 +20,15 @@ TEST_DATASET_PATH = (DATASET_DIR / 'test_dataset.csv').resolve()
 MODEL_FILE = os.path.join(MODELS_DIR, "emotion_linear_svc_model.pkl")
 
 class SVMService:
-    def __init__(self, train_path: str = TRAIN_DATASET_PATH, test_path: str = TEST_DATASET_PATH):
+    def __init__(self, train_path: str = TRAIN_DATASET_PATH, test_path: str = TEST_DATASET_PATH, model=None):
         self.train_path = os.path.abspath(train_path)
         self.test_path = os.path.abspath(test_path)
         self.model_path = os.path.abspath(MODEL_FILE)
-        self._emotion_model = None
+        self._emotion_model = model
+
+        # preloaded pipeline (ModelPoolService), nothing to load
+        if model is not None:
+            return
 
         # Try loading existing model; train if not available or corrupted
         if os.path.exists(self.model_path):
@@ -98,15 +103,23 @@ class SVMService:
             'emotion_predictions': y_pred
         }
 
-    def predict(self, forteclass_sequence: str) -> str:
-        """Predict emotion based on forteclass sequence"""
-        if not forteclass_sequence or len(forteclass_sequence.strip()) == 0:
+    def predict_emotions(self, forteclass_sequences: list) -> list:
+        """
+        {"emotion", "probabilities"} of every sequence, from a single pass
+        of the model over the batch (softmax of the
+        LinearSVC margins, not calibrated probabilities).
+        """
+        if any(not s or len(s.strip()) == 0 for s in forteclass_sequences):
             raise ValueError("Invalid or empty forteclass sequence")
 
         if self._emotion_model is None:
             raise ValueError("Model has not been trained or loaded")
 
-        return self._emotion_model.predict([forteclass_sequence])[0]
+        return predict_emotions(self._emotion_model, list(forteclass_sequences))
+
+    def predict(self, forteclass_sequence: str) -> str:
+        """Predict emotion based on forteclass sequence"""
+        return self.predict_emotions([forteclass_sequence])[0]["emotion"]
 
     def save_model(self, model_path: str = None):
         """Save the trained model"""
@@ -0,0 +1,142 @@
+import os
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from src.services.DatasetStorageService import DatasetStorageService
+from src.utils.ManifestUtil import fingerprint
+from src.utils.TokenUtil import Vocabulary, TokenSequences, TokenNgramVectorizer, TOKEN_DTYPE, ragged_take, ragged_concat
+from src.utils.HashingUtil import HashedNgramVectorizer
+
+# token stream of the n-gram model input: "forteclass_sequence | mode"
+MODEL_INPUT_COLUMNS = ("forteclass_sequence", "mode")
+
+# one append-only vocabulary per dataset folder, shared by all of its stores
+VOCABULARY_FILE = "vocabulary.json"
+
+class TokenStoreService:
+    """
+    Token id arrays of a Parquet dataset, saved next to it as
+    <name>.tokens.npy (flat uint16 ids), <name>.offsets.npy (int64 row
+    offsets) and <name>.tokens.json (source fingerprint + columns).
+    open() memory-maps the arrays, so training reads ids straight from the
+    page cache instead of splitting and re-tokenizing strings.
+    """
+    def __init__(self):
+        self.storage = DatasetStorageService()
+
+    def paths(self, dataset_path) -> dict:
+        stem = Path(self.storage.parquet_path(dataset_path)).with_suffix("")
+
+        return {
+            "tokens": f"{stem}.tokens.npy",
+            "offsets": f"{stem}.offsets.npy",
+            "meta": f"{stem}.tokens.json",
+            "vocabulary": os.path.join(os.path.dirname(stem), VOCABULARY_FILE)
+        }
+
+    def load_vocabulary(self, dataset_path) -> Vocabulary:
+        return Vocabulary.load(self.paths(dataset_path)["vocabulary"])
+
+    def is_fresh(self, dataset_path, columns=MODEL_INPUT_COLUMNS) -> bool:
+        paths = self.paths(dataset_path)
+
+        if not all(os.path.exists(paths[name]) for name in ("tokens", "offsets", "meta")):
+            return False
+
+        with open(paths["meta"], "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        source = self.storage.parquet_path(dataset_path)
+        if meta.get("columns") != list(columns) or not os.path.exists(source):
+            return False
+
+        return fingerprint(source, meta["source"])["hash"] == meta["source"]["hash"]
+
+    def encode_column(self, column, vocabulary: Vocabulary) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Encodes a list<string> or string column into (ids, row offsets).
+        Every distinct string is tokenized once, rows are then gathered
+        from the per-string ids with array indexing.
+        """
+        column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+
+        if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+            column = column.fill_null(pa.scalar([], type=column.type))
+            values = pc.list_flatten(column)
+            value_rows = np.asarray(column.offsets, dtype=np.int64)
+            value_rows = value_rows - value_rows[0]
+        else:
+            values = column
+            value_rows = np.arange(len(column) + 1, dtype=np.int64)
+
+        encoded = pc.dictionary_encode(values.cast(pa.string()).fill_null(""))
+        entries = TokenSequences.from_arrays(
+            [vocabulary.encode_text(entry, grow=True) for entry in encoded.dictionary.to_pylist()]
+        )
+
+        ids, value_offsets = ragged_take(entries.tokens, entries.offsets, np.asarray(encoded.indices, dtype=np.int64))
+
+        return ids, value_offsets[value_rows]
+
+    def build(self, dataset_path, columns=MODEL_INPUT_COLUMNS) -> TokenSequences:
+        paths = self.paths(dataset_path)
+        table = self.storage.read_table(dataset_path, columns=list(columns))
+
+        vocabulary = Vocabulary.load(paths["vocabulary"])
+        parts = [self.encode_column(table.column(name), vocabulary) for name in columns]
+        tokens, offsets = ragged_concat(parts)
+
+        vocabulary.save(paths["vocabulary"])
+
+        for name, array in (("tokens", tokens.astype(TOKEN_DTYPE)), ("offsets", offsets)):
+            tmp_path = f"{paths[name]}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, paths[name])
+
+        # written last: the meta file marks the arrays as complete
+        source = self.storage.parquet_path(dataset_path)
+        tmp_meta = f"{paths['meta']}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"columns": list(columns), "source": fingerprint(source)}, f)
+        os.replace(tmp_meta, paths["meta"])
+
+        print(f"🔢 Token store built: {len(offsets) - 1} rows, {len(tokens)} tokens, {len(vocabulary)} vocabulary ids")
+
+        return TokenSequences(tokens, offsets, vocabulary)
+
+    def open(self, dataset_path, columns=MODEL_INPUT_COLUMNS) -> TokenSequences:
+        """
+        Memory-mapped token sequences of a dataset, (re)built first when the
+        dataset changed since the last build. A view shares the token arrays
+        of its base dataset.
+        """
+        if self.storage.is_view(dataset_path):
+            base, rows = self.storage.load_view(dataset_path)
+            return self.open(base, columns).take(rows)
+
+        if not self.is_fresh(dataset_path, columns):
+            self.build(dataset_path, columns)
+
+        paths = self.paths(dataset_path)
+
+        return TokenSequences(
+            np.load(paths["tokens"], mmap_mode="r"),
+            np.load(paths["offsets"], mmap_mode="r"),
+            Vocabulary.load(paths["vocabulary"])
+        )
+
+    def model_input(self, model, dataset_path, rows):
+        """
+        Input of the given dataset rows in the format the model was trained
+        on: token ids for TokenNgramVectorizer / HashedNgramVectorizer
+        pipelines, the ngrams_input string for the older CountVectorizer
+        ones.
+        """
+        if isinstance(model.steps[0][1], (TokenNgramVectorizer, HashedNgramVectorizer)):
+            return self.open(dataset_path).take(rows)
+
+        df = self.storage.read(dataset_path, columns=["ngrams_input"])
+        return df["ngrams_input"].iloc[rows].astype(str)
@@ -1,8 +1,14 @@
 import os
 from src.services.MidiService import MidiService
+from src.services.MidiDatasetService import MidiDatasetService
+from src.utils.MidiUtil import forte_class_table
+from src.utils.ManifestUtil import load_manifest, save_manifest, diff_files, same_fingerprint
 import glob
 import re
-import csv
+import json
+import shutil
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 
@@ -11,6 +17,104 @@ DATASET_DIR = (BASE_DIR / '..' / 'xmidi-dataset').resolve()    # /app/src/xmidi-
 
 DATASET_RAW_PATH = os.path.join(DATASET_DIR, 'five_classes_dataset_raw.csv')
 
+# partial results of an unfinished build: part_XXXXX.csv files + manifest.json
+DATASET_PARTS_DIR = os.path.join(DATASET_DIR, 'five_classes_dataset_raw_parts')
+DATASET_MANIFEST_PATH = os.path.join(DATASET_PARTS_DIR, 'manifest.json')
+
+# per-file hash + extractor version of the last build, drives incremental rebuilds
+DATASET_FILES_MANIFEST_PATH = os.path.join(DATASET_DIR, 'five_classes_dataset_raw.manifest.json')
+
+# bump when an analyzer changes its output, so incremental builds reprocess every file
+EXTRACTOR_VERSIONS = {
+    "dataset": "dataset-1",
+    "full": "full-1"
+}
+
+# "file" is the source MIDI file of the row, incremental builds replace rows by it
+DATASET_COLUMNS = ["chord_sequence", "num_chords", "emotion", "genre", "ID", "bpm", "key", "tonic", "mode", "file"]
+
+# filename pattern: XMIDI_<emotion>_<genre>_<ID>.midi
+FILENAME_RE = re.compile(r"^XMIDI_([^_]+)_([^_]+)_([^_]+)\.(mid|midi)$", flags=re.IGNORECASE)
+
+def parse_xmidi_filename(fname: str):
+    m = FILENAME_RE.match(fname)
+    if m:
+        return m.group(1).lower(), m.group(2).lower(), os.path.splitext(m.group(3))[0]
+
+    # try a looser parse (split)
+    parts = fname.split("_")
+    if len(parts) >= 4 and parts[0].upper() == "XMIDI":
+        id_with_ext = "_".join(parts[3:])
+        return parts[1].lower(), parts[2].lower(), os.path.splitext(id_with_ext)[0]
+
+    return None
+
+def process_xmidi_file(path: str, analyzer: str = "dataset") -> tuple[str, dict, str]:
+    """
+    Extracts one dataset row from an XMIDI file.
+    Module-level so it can run inside a process pool worker.
+    analyzer="dataset" uses the lightweight MidiDatasetService, "full" the
+    interactive MidiService (audio synthesis + music21).
+    Returns (file name, row or None, error or None).
+    """
+    fname = os.path.basename(path)
+    emotion, genre, id_ = parse_xmidi_filename(fname)
+
+    try:
+        # Read file binary and pass to the analyzer so it can create PrettyMIDI from bytes
+        with open(path, "rb") as f:
+            midi_bytes = f.read()
+
+        if analyzer == "dataset":
+            row = MidiDatasetService(midi_bytes).analyze()
+
+            if not row["chord_sequence"]:
+                return fname, None, "empty_chord_sequence"
+
+            return fname, {"emotion": emotion, "genre": genre, "ID": id_, **row, "file": fname}, None
+
+        midi_srv = MidiService(midi_data=midi_bytes)
+
+        # extract forteclass chord progression string
+        chord_seq = midi_srv.extract_chord_progression_forteclass()
+
+        # if empty or too short, skip
+        if not chord_seq or len(chord_seq.strip()) == 0:
+            return fname, None, "empty_chord_sequence"
+
+        # compute num chords
+        num_chords = len([t for t in chord_seq.split(",") if t.strip() != ""])
+
+        # bpm
+        bpm = midi_srv.get_estimated_bpm()
+
+        # key info (use find_estimate_key() which returns dict with tonic and mode)
+        try:
+            key_info = midi_srv.find_estimate_key()
+            key_name = key_info.get("key", "")
+            tonic = key_info.get("tonic", "")
+            mode = key_info.get("mode", "")
+        except Exception:
+            key_name = ""
+            tonic = ""
+            mode = ""
+
+        return fname, {
+            "chord_sequence": chord_seq,
+            "num_chords": num_chords,
+            "emotion": emotion,
+            "genre": genre,
+            "ID": id_,
+            "bpm": float(bpm) if bpm is not None else None,
+            "key": key_name,
+            "tonic": tonic,
+            "mode": mode,
+            "file": fname
+        }, None
+
+    except Exception as e:
+        return fname, None, str(e)
+
 class XMIDIService:
     def __init__(self):
         if os.path.exists(DATASET_RAW_PATH):
@@ -19,7 +123,17 @@ class XMIDIService:
             print(f"🔹 Creating dataset in: {DATASET_RAW_PATH}")
             self.build_dataset()
 
-    def build_dataset(self, source_dir: str = "./midi_raw_files", allowed_emotions=None, overwrite: bool = False) -> str:
+    def build_dataset(
+        self,
+        source_dir: str = "./midi_raw_files",
+        allowed_emotions=None,
+        overwrite: bool = False,
+        workers: int = None,
+        checkpoint_every: int = 500,
+        resume: bool = True,
+        analyzer: str = "dataset",
+        incremental: bool = False
+    ) -> str:
         if allowed_emotions is None:
             allowed_emotions = ["angry", "romantic", "sad", "happy", "warm"]
 
@@ -29,104 +143,196 @@ class XMIDIService:
             raise FileNotFoundError(f"Source MIDI folder not found: {midi_folder.resolve()}")
 
         # if dataset already exists and not overwrite, skip
-        if os.path.exists(DATASET_RAW_PATH) and not overwrite:
-            print(f"🔹 Dataset already exists at {DATASET_RAW_PATH} (use overwrite=True to rebuild).")
+        if os.path.exists(DATASET_RAW_PATH) and not overwrite and not incremental:
+            print(f"🔹 Dataset already exists at {DATASET_RAW_PATH} (use overwrite=True to rebuild or incremental=True to update).")
             return DATASET_RAW_PATH
 
+        if checkpoint_every <= 0:
+            raise ValueError("checkpoint_every must be greater than 0.")
+
+        if analyzer not in EXTRACTOR_VERSIONS:
+            raise ValueError(f"analyzer must be one of {list(EXTRACTOR_VERSIONS)}.")
+
+        extractor = EXTRACTOR_VERSIONS[analyzer]
+
         midi_paths = sorted(glob.glob(str(midi_folder / "*.mid")) + glob.glob(str(midi_folder / "*.midi")))
         print(f"🔎 Found {len(midi_paths)} midi files in {midi_folder}")
 
-        rows = []
-        errors = []
-        good = 0
+        incremental = incremental and os.path.exists(DATASET_RAW_PATH)
+        if incremental and "file" not in pd.read_csv(DATASET_RAW_PATH, nrows=0).columns:
+            print("🔸 The dataset has no source file column: rebuilding it from every file.")
+            incremental = False
 
-        # filename pattern: XMIDI_<emotion>_<genre>_<ID>.midi
-        # we'll be permissive: split by underscore after XMIDI
-        filename_re = re.compile(r"^XMIDI_([^_]+)_([^_]+)_([^_]+)\.(mid|midi)$", flags=re.IGNORECASE)
+        source = str(midi_folder.resolve())
+        manifest = self.load_manifest(analyzer, source, incremental) if resume else None
+        if manifest is None:
+            shutil.rmtree(DATASET_PARTS_DIR, ignore_errors=True)
+            manifest = {
+                "analyzer": analyzer,
+                "source_dir": source,
+                "incremental": incremental,
+                "parts": [],
+                "completed": {},
+                "errors": {}
+            }
+        else:
+            # files that failed to process are retried, only bad file names stay excluded
+            manifest["errors"] = {
+                fname: error for fname, error in manifest["errors"].items() if error == "filename_not_match"
+            }
+            print(f"♻️ Resuming build: {len(manifest['completed'])} files already done in {len(manifest['parts'])} parts.")
 
-        for i, path in enumerate(midi_paths, start=1):
+        os.makedirs(DATASET_PARTS_DIR, exist_ok=True)
+
+        candidates = []
+        for path in midi_paths:
             fname = os.path.basename(path)
-            m = filename_re.match(fname)
-            if not m:
-                # try a looser parse (split)
-                parts = fname.split("_")
-                if len(parts) >= 4 and parts[0].upper() == "XMIDI":
-                    emotion = parts[1].lower()
-                    genre = parts[2].lower()
-                    id_with_ext = "_".join(parts[3:])
-                    id_ = os.path.splitext(id_with_ext)[0]
-                else:
-                    errors.append((fname, "filename_not_match"))
-                    continue
-            else:
-                emotion = m.group(1).lower()
-                genre = m.group(2).lower()
-                id_ = os.path.splitext(m.group(3))[0]
-
-            if emotion not in allowed_emotions:
-                # skip non-wanted emotions
+            parsed = parse_xmidi_filename(fname)
+
+            if not parsed:
+                manifest["errors"][fname] = "filename_not_match"
                 continue
 
-            try:
-                # Read file binary and pass to MidiService so it can create PrettyMIDI from bytes
-                with open(path, "rb") as f:
-                    midi_bytes = f.read()
-
-                midi_srv = MidiService(midi_data=midi_bytes)
-
-                # extract forteclass chord progression string
-                chord_seq = midi_srv.extract_chord_progression_forteclass()
-
-                # if empty or too short, skip
-                if not chord_seq or len(chord_seq.strip()) == 0:
-                    errors.append((fname, "empty_chord_sequence"))
-                    continue
-
-                # compute num chords
-                num_chords = len([t for t in chord_seq.split(",") if t.strip() != ""])
-
-                # bpm
-                bpm = midi_srv.get_estimated_bpm() if hasattr(midi_srv, "get_estimated_bpm") else midi_srv.find_tempo()
-
-                # key info (use find_estimate_key() which returns dict with tonic and mode)
-                try:
-                    key_info = midi_srv.find_estimate_key()
-                    key_name = key_info.get("key", "")
-                    tonic = key_info.get("tonic", "")
-                    mode = key_info.get("mode", "")
-                except Exception:
-                    key_name = ""
-                    tonic = ""
-                    mode = ""
-
-                rows.append({
-                    "chord_sequence": chord_seq,
-                    "num_chords": num_chords,
-                    "emotion": emotion,
-                    "genre": genre,
-                    "ID": id_,
-                    "bpm": float(bpm) if bpm is not None else None,
-                    "key": key_name,
-                    "tonic": tonic,
-                    "mode": mode
-                })
-
-                good += 1
-                if (good % 50) == 0:
-                    print(f"  - processed {good} files...")
-
-            except Exception as e:
-                errors.append((fname, str(e)))
-                # continue processing other files
+            # skip non-wanted emotions
+            if parsed[0] not in allowed_emotions:
                 continue
 
-        # save CSV
+            candidates.append(path)
+
+        previous_files = load_manifest(DATASET_FILES_MANIFEST_PATH).get("files", {}) if incremental else {}
+
+        # a full rebuild processes every file anyway, no need to hash them
+        changed, deleted, fingerprints = diff_files(candidates, previous_files, extractor, hash_contents=incremental)
+        if incremental:
+            print(f"🧮 Incremental build: {len(changed)} new/changed, {len(deleted)} removed, {len(candidates) - len(changed)} unchanged files.")
+
+        # files edited or removed since they were checkpointed are processed again,
+        # their rows in the parts are ignored when merging
+        outdated = [
+            fname for fname, entry in manifest["completed"].items()
+            if fname not in fingerprints or not same_fingerprint(entry, fingerprints[fname])
+        ]
+        for fname in outdated:
+            del manifest["completed"][fname]
+        if outdated:
+            print(f"🔸 {len(outdated)} checkpointed files changed since, processing them again.")
+
+        pending = [
+            path for path in changed
+            if os.path.basename(path) not in manifest["completed"]
+            and os.path.basename(path) not in manifest["errors"]
+        ]
+
+        workers = workers or os.cpu_count() or 1
+        print(f"⚙️ Processing {len(pending)} files with {workers} workers (checkpoint every {checkpoint_every} files)...")
+
+        if analyzer == "dataset" and pending:
+            # build/load the lookup table once, before the workers fork
+            forte_class_table()
+
+        rows = []
+        done = []
+        processed = 0
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map keeps input order, so parts concatenate into the same order as a serial build
+                results = executor.map(partial(process_xmidi_file, analyzer=analyzer), pending, chunksize=max(1, min(32, checkpoint_every // workers)))
+
+                for fname, row, error in results:
+                    processed += 1
+
+                    if error:
+                        manifest["errors"][fname] = error
+                    else:
+                        rows.append(row)
+                        done.append(fname)
+
+                    if processed % checkpoint_every == 0:
+                        self.write_checkpoint(manifest, rows, done, fingerprints)
+                        rows, done = [], []
+                        print(f"  - processed {processed}/{len(pending)} files...")
+
+        self.write_checkpoint(manifest, rows, done, fingerprints)
+
+        # merge parts into the final CSV, each file from the part of its last checkpoint
+        parts = []
+        for part in manifest["parts"]:
+            part_df = pd.read_csv(os.path.join(DATASET_PARTS_DIR, part), dtype={"ID": str})
+            owners = part_df["file"].map(lambda fname: manifest["completed"].get(fname, {}).get("part"))
+            parts.append(part_df[owners == part])
+
+        if incremental:
+            # keep rows of unchanged files, drop the ones reprocessed or removed from disk
+            stale_files = {os.path.basename(path) for path in changed} | set(deleted)
+
+            base_df = pd.read_csv(DATASET_RAW_PATH, dtype={"ID": str})
+            parts.insert(0, base_df[~base_df["file"].isin(stale_files)])
+
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=DATASET_COLUMNS)
+        df = df[DATASET_COLUMNS]
+
         os.makedirs(os.path.dirname(DATASET_RAW_PATH), exist_ok=True)
-        columns = ["chord_sequence", "num_chords", "emotion", "genre", "ID", "bpm", "key", "tonic", "mode"]
-        df = pd.DataFrame(rows, columns=columns)
-        df.to_csv(DATASET_RAW_PATH, index=False)
+        tmp_path = f"{DATASET_RAW_PATH}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, DATASET_RAW_PATH)
+
+        # record what this dataset was built from: only files with rows in it,
+        # so the ones that failed are retried by the next incremental build
+        changed_files = {os.path.basename(path) for path in changed}
+        files = {
+            fname: {**current, "extractor": extractor}
+            for fname, current in fingerprints.items()
+            if fname in manifest["completed"]
+            or (fname not in changed_files and previous_files[fname].get("status", "ok") == "ok")
+        }
+
+        save_manifest(DATASET_FILES_MANIFEST_PATH, {"files": files})
+
+        errors = list(manifest["errors"].items())
+        shutil.rmtree(DATASET_PARTS_DIR, ignore_errors=True)
 
         print(f"\n✅ Finished dataset build. Saved {len(df)} rows to: {DATASET_RAW_PATH}")
         if errors:
             print(f"⚠️ {len(errors)} files skipped or errored. Example: {errors[:6]}")
         return DATASET_RAW_PATH
+
+    def load_manifest(self, analyzer: str, source_dir: str, incremental: bool):
+        if not os.path.exists(DATASET_MANIFEST_PATH):
+            return None
+
+        with open(DATASET_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        # parts of another analyzer, folder or mode can't be merged into this build:
+        # a full rebuild's parts would duplicate the rows an incremental one keeps
+        if (manifest.get("analyzer"), manifest.get("source_dir"), manifest.get("incremental")) != (analyzer, source_dir, incremental):
+            mode = "incremental" if manifest.get("incremental") else "full"
+            print(f"🔸 Discarding {mode} partial build of {manifest.get('source_dir')} ({manifest.get('analyzer')}): it doesn't match this build.")
+            return None
+
+        # drop part files written after the last manifest save (crash in between)
+        known = set(manifest["parts"])
+        for part in os.listdir(DATASET_PARTS_DIR):
+            if part.startswith("part_") and part not in known:
+                os.remove(os.path.join(DATASET_PARTS_DIR, part))
+
+        return manifest
+
+    def write_checkpoint(self, manifest: dict, rows: list, done: list, fingerprints: dict):
+        if rows:
+            part = f"part_{len(manifest['parts']):05d}.csv"
+            part_path = os.path.join(DATASET_PARTS_DIR, part)
+
+            pd.DataFrame(rows, columns=DATASET_COLUMNS).to_csv(f"{part_path}.tmp", index=False)
+            os.replace(f"{part_path}.tmp", part_path)
+
+            manifest["parts"].append(part)
+            for fname in done:
+                manifest["completed"][fname] = {"part": part, **fingerprints[fname]}
+
+        # the manifest is the commit point: only parts listed here count on resume
+        tmp_manifest = f"{DATASET_MANIFEST_PATH}.tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, DATASET_MANIFEST_PATH)
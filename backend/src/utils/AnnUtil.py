@@ -0,0 +1,143 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.cluster import MiniBatchKMeans
+
+def squared_distances(vectors: np.ndarray, norms: np.ndarray, query: np.ndarray) -> np.ndarray:
+    # ||v - q||^2 without materializing v - q; clipped against rounding below 0
+    return np.maximum(norms - 2.0 * (vectors @ query) + query @ query, 0.0)
+
+def top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k smallest distances, nearest first.
+    """
+    k = min(k, len(distances))
+    nearest = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+
+    return nearest[np.argsort(distances[nearest], kind="stable")]
+
+def brute_force_search(vectors: np.ndarray, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact (distances, indices) of the k nearest vectors of every query.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    distances, indices = [], []
+
+    for query in np.asarray(queries, dtype=np.float32):
+        d = squared_distances(vectors, norms, query)
+        nearest = top_k(d, k)
+        indices.append(nearest)
+        distances.append(np.sqrt(d[nearest]))
+
+    return np.array(distances), np.array(indices)
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over dense vectors.
+    Vectors are grouped by their nearest k-means centroid ("list") and
+    stored contiguously per list; a query only scans the vectors of its
+    n_probe nearest lists. Recall grows with n_probe (n_probe = n_lists is
+    exact), cost with the share of the lists probed.
+    """
+    def __init__(self, n_lists: int = None, random_state: int = 42):
+        self.n_lists = n_lists
+        self.random_state = random_state
+
+    def fit(self, vectors: np.ndarray) -> "IVFIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = self.n_lists or max(1, int(4 * np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state, n_init=3, batch_size=4096)
+        labels = kmeans.fit_predict(vectors)
+
+        order = np.argsort(labels, kind="stable")
+        self.centroids_ = kmeans.cluster_centers_.astype(np.float32)
+        self.centroid_norms_ = np.einsum("ij,ij->i", self.centroids_, self.centroids_)
+        self.vectors_ = vectors[order]
+        self.norms_ = np.einsum("ij,ij->i", self.vectors_, self.vectors_)
+        self.ids_ = order.astype(np.int64)
+        self.offsets_ = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))]).astype(np.int64)
+
+        return self
+
+    def search(self, queries: np.ndarray, k: int, n_probe: int = 8) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate (distances, indices) of the k nearest vectors of every
+        query; indices refer to the rows given to fit(). Rows with fewer
+        than k candidates are padded with index -1 / distance inf.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        n_probe = min(n_probe, len(self.centroids_))
+
+        distances = np.full((len(queries), k), np.inf)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+        for row, query in enumerate(queries):
+            lists = top_k(squared_distances(self.centroids_, self.centroid_norms_, query), n_probe)
+            candidates = np.concatenate([np.arange(self.offsets_[l], self.offsets_[l + 1]) for l in lists])
+
+            if len(candidates) == 0:
+                continue
+
+            d = squared_distances(self.vectors_[candidates], self.norms_[candidates], query)
+            nearest = top_k(d, k)
+
+            distances[row, :len(nearest)] = np.sqrt(d[nearest])
+            indices[row, :len(nearest)] = self.ids_[candidates[nearest]]
+
+        return distances, indices
+
+class AnnKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    """
+    k-nearest-neighbours classifier answered by an IVFIndex instead of a
+    brute-force scan, with KNeighborsClassifier's "uniform" / "distance"
+    vote weighting. Expects dense vectors (e.g. after TruncatedSVD and
+    Normalizer); the index is built in fit() and pickled with the model.
+    """
+    def __init__(self, n_neighbors: int = 5, weights: str = "distance", n_lists: int = None, n_probe: int = 8, random_state: int = 42):
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X = np.asarray(X.toarray() if hasattr(X, "toarray") else X, dtype=np.float32)
+        self.classes_, self.y_ = np.unique(np.asarray(y), return_inverse=True)
+        self.index_ = IVFIndex(self.n_lists, self.random_state).fit(X)
+        self.n_features_in_ = X.shape[1]
+
+        return self
+
+    def kneighbors(self, X, n_neighbors: int = None) -> tuple[np.ndarray, np.ndarray]:
+        X = np.asarray(X.toarray() if hasattr(X, "toarray") else X, dtype=np.float32)
+        return self.index_.search(X, n_neighbors or self.n_neighbors, self.n_probe)
+
+    def predict_proba(self, X) -> np.ndarray:
+        distances, indices = self.kneighbors(X)
+        found = indices >= 0
+
+        if self.weights == "distance":
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / distances
+            # exact matches take the whole vote, like KNeighborsClassifier
+            exact = distances == 0
+            weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), weights)
+        else:
+            weights = np.ones_like(distances)
+
+        weights = np.where(found, weights, 0.0)
+        labels = self.y_[np.where(found, indices, 0)]
+
+        proba = np.zeros((len(indices), len(self.classes_)))
+        for column in range(indices.shape[1]):
+            np.add.at(proba, (np.arange(len(indices)), labels[:, column]), weights[:, column])
+
+        totals = proba.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+
+        return proba / totals
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
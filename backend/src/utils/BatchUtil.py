@@ -0,0 +1,80 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """
+    Gathers the items submitted by concurrent callers and processes them
+    with a single handler(items) -> results call. A batch is closed
+    window_ms after its first item arrived or when it has max_batch items,
+    so a lone caller waits at most window_ms. Each caller gets the result
+    at its own position (or the exception raised by the handler).
+    """
+    def __init__(self, handler, window_ms: float = 2.0, max_batch: int = 32):
+        if max_batch <= 0:
+            raise ValueError("max_batch must be greater than 0.")
+
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future))
+        self._ensure_worker()
+
+        return future.result()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+
+            try:
+                results = self.handler([item for item, _ in batch])
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch
+            }
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from src.utils.ManifestUtil import load_manifest, save_manifest
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache shared by request handlers.
+    Keeps hit/miss counters so callers can report the cache efficiency.
+    """
+    def __init__(self, maxsize: int = 128):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0.")
+
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def items(self) -> list:
+        """
+        (key, value) pairs from least to most recently used.
+        """
+        with self._lock:
+            return list(self._data.items())
+
+    def save(self, path: str):
+        """
+        Writes the entries to a JSON file (keys and values must be JSON
+        serializable; tuple keys are restored by load()).
+        """
+        save_manifest(path, {"entries": [[list(k) if isinstance(k, tuple) else k, v] for k, v in self.items()]})
+
+    def load(self, path: str) -> int:
+        """
+        Adds the entries saved by save(), keeping the most recent ones when
+        they exceed maxsize. Returns the number of entries read.
+        """
+        entries = load_manifest(path).get("entries", [])
+
+        for key, value in entries:
+            self.set(tuple(key) if isinstance(key, list) else key, value)
+
+        return len(entries)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,81 @@
+import numpy as np
+
+CHUNK_MODES = ("fixed", "strict", "variable")
+
+def ragged_positions(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Flat positions of the ranges [starts[i], starts[i] + lengths[i]),
+    concatenated in order.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    range_starts = np.cumsum(lengths) - lengths
+    return np.repeat(np.asarray(starts, dtype=np.int64) - range_starts, lengths) + np.arange(total)
+
+def chunk_bounds(
+    lengths: np.ndarray,
+    chunk_size: int,
+    mode: str = "strict",
+    min_size: int = None,
+    max_size: int = None,
+    rng: np.random.Generator = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits rows of the given token counts into chunks, using only index
+    arithmetic. Returns (source row, start inside the row, length) of every
+    chunk, in row order.
+
+    - strict:   only full chunks of chunk_size, the remainder is dropped
+    - fixed:    chunks of chunk_size plus the remainder; a row not longer
+                than chunk_size (even an empty one) is kept whole
+    - variable: consecutive chunks of random size in [min_size, max_size];
+                a remainder shorter than min_size is dropped
+    """
+    if mode not in CHUNK_MODES:
+        raise ValueError(f"mode must be one of {list(CHUNK_MODES)}.")
+
+    lengths = np.asarray(lengths, dtype=np.int64)
+    rows = np.arange(len(lengths))
+
+    if mode == "variable":
+        if not min_size or not max_size or min_size <= 0 or max_size < min_size:
+            raise ValueError("variable chunks need 0 < min_size <= max_size.")
+
+        rng = rng if rng is not None else np.random.default_rng(42)
+
+        # enough draws to cover every row even if all of them are min_size
+        counts = -(-lengths // min_size)
+        sizes = rng.integers(min_size, max_size + 1, size=int(counts.sum()))
+
+        ends = np.cumsum(sizes)
+        first = np.cumsum(counts) - counts
+        has_chunks = counts > 0
+        row_base = np.zeros(len(lengths), dtype=np.int64)
+        row_base[has_chunks] = ends[first[has_chunks]] - sizes[first[has_chunks]]
+
+        chunk_rows = np.repeat(rows, counts)
+        ends = ends - row_base[chunk_rows]
+        starts = ends - sizes
+        chunk_lengths = np.minimum(ends, lengths[chunk_rows]) - starts
+
+        keep = (starts < lengths[chunk_rows]) & (chunk_lengths >= min_size)
+        return chunk_rows[keep], starts[keep], chunk_lengths[keep]
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be greater than 0.")
+
+    if mode == "strict":
+        counts = lengths // chunk_size
+    else:
+        counts = np.maximum(-(-lengths // chunk_size), 1)
+
+    chunk_rows = np.repeat(rows, counts)
+    index_in_row = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    starts = index_in_row * chunk_size
+    chunk_lengths = np.minimum(lengths[chunk_rows] - starts, chunk_size)
+
+    return chunk_rows, starts, chunk_lengths
@@ -0,0 +1,239 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+# rows traversed together, bounds the (trees, rows) working arrays
+PREDICT_BATCH_ROWS = 256
+
+ARRAY_ATTRIBUTES = ("feature", "threshold", "children", "leaf_proba", "roots")
+
+def float32_thresholds(threshold: np.ndarray) -> np.ndarray:
+    """
+    sklearn compares float32 inputs with float64 thresholds. The largest
+    float32 <= each threshold gives the same decisions in pure float32.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+
+    return rounded
+
+def node_depths(tree) -> np.ndarray:
+    """
+    Depth of every node of a fitted sklearn tree (root = 0).
+    """
+    depth = np.zeros(tree.node_count, dtype=np.int32)
+    frontier = np.array([0])
+    level = 0
+
+    while len(frontier):
+        depth[frontier] = level
+        children = np.concatenate([tree.children_left[frontier], tree.children_right[frontier]])
+        frontier = children[children >= 0]
+        level += 1
+
+    return depth
+
+def flatten_forest(forest, n_estimators: int = None, max_depth: int = None) -> dict:
+    """
+    Flattens the trees of a fitted sklearn forest classifier into
+    contiguous arrays. Nodes of all trees are renumbered so every split
+    node comes before every leaf: leaf i of the forest is node
+    n_splits + i and its class probabilities are leaf_proba[i]. The
+    children of node n are children[2n] (left) and children[2n + 1]
+    (right); leaves point to themselves, so a fixed number of steps
+    reaches them from any root.
+
+    n_estimators keeps only the first trees and max_depth turns the nodes
+    at that depth into leaves predicting their training class distribution,
+    a cheaper approximation of the forest.
+    """
+    if getattr(forest, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be flattened.")
+
+    trees = [estimator.tree_ for estimator in forest.estimators_[:n_estimators]]
+    keep, is_leaf = [], []
+
+    for tree in trees:
+        kept = np.ones(tree.node_count, dtype=bool)
+        leaf = tree.children_left == -1
+
+        if max_depth is not None:
+            depth = node_depths(tree)
+            kept = depth <= max_depth
+            leaf = leaf | (depth == max_depth)
+
+        keep.append(kept)
+        is_leaf.append(leaf)
+
+    depth_reached = max(tree.max_depth for tree in trees)
+    if max_depth is not None:
+        depth_reached = min(depth_reached, max_depth)
+
+    n_splits = sum(int((kept & ~leaf).sum()) for kept, leaf in zip(keep, is_leaf))
+    n_leaves = sum(int((kept & leaf).sum()) for kept, leaf in zip(keep, is_leaf))
+    n_nodes = n_splits + n_leaves
+    n_classes = len(forest.classes_)
+
+    if 2 * n_nodes >= np.iinfo(np.int32).max:
+        raise ValueError(f"Forest too large to flatten: {n_nodes} nodes.")
+
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.full(n_nodes, np.inf, dtype=np.float32)
+    children = np.empty((n_nodes, 2), dtype=np.int32)
+    leaf_proba = np.empty((n_leaves, n_classes), dtype=np.float32)
+    roots = np.empty(len(trees), dtype=np.int32)
+
+    split_base = 0
+    leaf_base = 0
+
+    for t, (tree, kept, leaf) in enumerate(zip(trees, keep, is_leaf)):
+        # new global id of every kept node of this tree
+        new_id = np.full(tree.node_count, -1, dtype=np.int64)
+        split_nodes = np.flatnonzero(kept & ~leaf)
+        leaf_nodes = np.flatnonzero(kept & leaf)
+        new_id[split_nodes] = split_base + np.arange(len(split_nodes))
+        new_id[leaf_nodes] = n_splits + leaf_base + np.arange(len(leaf_nodes))
+
+        ids = new_id[split_nodes]
+        feature[ids] = tree.feature[split_nodes]
+        threshold[ids] = float32_thresholds(tree.threshold[split_nodes])
+        children[ids, 0] = new_id[tree.children_left[split_nodes]]
+        children[ids, 1] = new_id[tree.children_right[split_nodes]]
+
+        leaf_ids = new_id[leaf_nodes]
+        children[leaf_ids, 0] = leaf_ids
+        children[leaf_ids, 1] = leaf_ids
+
+        # same normalization as DecisionTreeClassifier.predict_proba
+        values = tree.value[leaf_nodes, 0, :n_classes].astype(np.float64)
+        normalizer = values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_proba[leaf_ids - n_splits] = values / normalizer
+
+        roots[t] = new_id[0]
+        split_base += len(split_nodes)
+        leaf_base += len(leaf_nodes)
+
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "children": children.ravel(),
+        "leaf_proba": leaf_proba,
+        "roots": roots,
+        "n_splits": n_splits,
+        "max_depth": depth_reached,
+        "n_features_in": int(forest.n_features_in_),
+        "classes": np.asarray(forest.classes_)
+    }
+
+class FlatForest(ClassifierMixin, BaseEstimator):
+    """
+    Array-backed replacement for a fitted RandomForestClassifier at serving
+    time: predict_proba walks all trees of a batch of rows at once with
+    NumPy gathers, no per-tree Python calls and no joblib dispatch.
+    Probabilities match the sklearn forest up to float32 rounding of the
+    leaf probabilities. Can stand in as the last step of a Pipeline.
+    """
+    def set_arrays(self, arrays: dict) -> "FlatForest":
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.leaf_proba = arrays["leaf_proba"]
+        self.roots = arrays["roots"]
+        self.n_splits = int(arrays["n_splits"])
+        self.max_depth = int(arrays["max_depth"])
+        self.n_features_in_ = int(arrays["n_features_in"])
+        self.classes_ = np.asarray(arrays["classes"])
+
+        return self
+
+    @classmethod
+    def from_sklearn(cls, forest, n_estimators: int = None, max_depth: int = None) -> "FlatForest":
+        return cls().set_arrays(flatten_forest(forest, n_estimators, max_depth))
+
+    def arrays(self) -> dict:
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "leaf_proba": self.leaf_proba,
+            "roots": self.roots,
+            "n_splits": self.n_splits,
+            "max_depth": self.max_depth,
+            "n_features_in": self.n_features_in_,
+            "classes": self.classes_
+        }
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+
+        # arrays memory-mapped by joblib.load(mmap_mode=...) as plain views:
+        # same shared pages, without the np.memmap overhead on every gather
+        for name in ARRAY_ATTRIBUTES:
+            if hasattr(self, name):
+                setattr(self, name, np.asarray(getattr(self, name)))
+
+    def fit(self, X, y=None):
+        raise NotImplementedError("A FlatForest is exported from a fitted forest, see FlatForest.from_sklearn().")
+
+    def __sklearn_is_fitted__(self):
+        return hasattr(self, "roots")
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_ATTRIBUTES)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf index (into leaf_proba) reached in every tree, shape (rows, trees).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+
+        flat_X = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.int64) * X.shape[1])[None, :]
+        # tree-major: the rows walking one tree touch nearby nodes
+        node = np.repeat(self.roots[:, None].astype(np.int64), n_rows, axis=1)
+
+        for depth in range(self.max_depth):
+            go_right = flat_X[row_base + self.feature[node]] > self.threshold[node]
+            node = self.children[node * 2 + go_right]
+
+            # shallow trees: stop once every row sits on a leaf
+            if depth % 4 == 3 and node.min() >= self.n_splits:
+                break
+
+        return (node - self.n_splits).T
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X.toarray() if hasattr(X, "toarray") else X)
+
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X must have {self.n_features_in_} features.")
+
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, X.shape[0], PREDICT_BATCH_ROWS):
+            leaves = self.apply(X[start:start + PREDICT_BATCH_ROWS])
+            proba[start:start + len(leaves)] = self.leaf_proba[leaves].sum(axis=1, dtype=np.float64)
+
+        return proba / len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def flatten_pipeline(pipeline, n_estimators: int = None, max_depth: int = None):
+    """
+    Copy of a fitted Pipeline whose last step (a forest) is replaced by its
+    FlatForest, optionally truncated (see flatten_forest); the transformer
+    steps are shared, not copied.
+    """
+    from sklearn.pipeline import Pipeline
+
+    name, forest = pipeline.steps[-1]
+    return Pipeline([*pipeline.steps[:-1], (name, FlatForest.from_sklearn(forest, n_estimators, max_depth))])
@@ -0,0 +1,257 @@
+import hashlib
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.utils.TokenUtil import Vocabulary, TokenSequences, UNKNOWN_ID, tokenize
+
+# odd multiplier of the rolling n-gram hash
+NGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# rows hashed at a time, bounds the memory of fit/transform on large corpora
+HASH_CHUNK_ROWS = 10_000
+
+@lru_cache(maxsize=65536)
+def token_hash(token: str) -> int:
+    """
+    64-bit hash of a token string, stable across processes and
+    vocabularies (unlike hash() or vocabulary ids).
+    """
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+def mix64(h: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer: every input bit affects every output bit
+    with np.errstate(over="ignore"):
+        h = np.asarray(h, dtype=np.uint64)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+
+        return h ^ (h >> np.uint64(31))
+
+def sequence_chunks(X, chunk_rows: int = HASH_CHUNK_ROWS):
+    """
+    Consecutive chunks of at most chunk_rows rows. Chunks of TokenSequences
+    are views, so a memory-mapped store is only read chunk by chunk.
+    """
+    if isinstance(X, TokenSequences):
+        for start in range(0, len(X), chunk_rows):
+            end = min(start + chunk_rows, len(X))
+            offsets = np.asarray(X.offsets[start:end + 1], dtype=np.int64)
+            yield TokenSequences(X.tokens[offsets[0]:offsets[-1]], offsets - offsets[0], X.vocabulary)
+        return
+
+    X = X if isinstance(X, list) else list(X)
+    for start in range(0, len(X), chunk_rows):
+        yield X[start:start + chunk_rows]
+
+class CountMinSketch:
+    """
+    Approximate frequency of 64-bit keys in fixed memory (depth x width
+    uint32 counters). Estimates never undercount; they overcount by at most
+    ~e/width of the total count with probability 1 - e^-depth.
+    """
+    def __init__(self, width: int = 2 ** 20, depth: int = 4, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self.seeds = mix64(np.arange(1, depth + 1, dtype=np.uint64) + np.uint64(seed))
+
+    def _index(self, keys: np.ndarray, row: int) -> np.ndarray:
+        return (mix64(keys ^ self.seeds[row]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, keys: np.ndarray):
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._index(keys, row), minlength=self.width).astype(np.uint32)
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        estimates = np.full(len(keys), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+        for row in range(self.depth):
+            np.minimum(estimates, self.table[row][self._index(keys, row)], out=estimates)
+
+        return estimates
+
+class HashedNgramVectorizer(BaseEstimator, TransformerMixin):
+    """
+    N-gram count vectorizer with feature hashing, an out-of-core alternative
+    to TokenNgramVectorizer for corpora whose n-grams do not fit in memory.
+
+    Every n-gram is hashed from the hashes of its token strings into one of
+    n_features buckets, so no n-gram vocabulary is kept and the same input
+    gets the same columns whether it comes as token ids (TokenSequences with
+    their vocabulary) or as "sequence | mode | tonic" strings. fit streams
+    the rows chunk_rows at a time with fixed memory:
+    - min_count > 1 drops n-grams seen fewer times in the training corpus,
+      counted by a CountMinSketch kept with the model (one extra pass);
+    - max_features keeps the most frequent buckets as the output columns,
+      otherwise every bucket is a column.
+    Distinct n-grams sharing a bucket are counted together.
+    """
+    def __init__(self, vocabulary: Vocabulary = None, ngram_range=(1, 1), n_features: int = 2 ** 20,
+                 max_features: int = None, min_count: int = 1, sketch_width: int = 2 ** 20, sketch_depth: int = 4,
+                 chunk_rows: int = HASH_CHUNK_ROWS):
+        self.vocabulary = vocabulary
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self.max_features = max_features
+        self.min_count = min_count
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.chunk_rows = chunk_rows
+
+    @property
+    def n_features_out_(self) -> int:
+        return len(self.buckets_) if self.buckets_ is not None else self.n_features
+
+    def _hash_table(self, vocabulary: Vocabulary) -> np.ndarray:
+        return np.array([0] + [token_hash(t) for t in vocabulary.tokens[1:]], dtype=np.uint64)
+
+    def _token_hashes(self, X) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (token hashes, known mask, row offsets) of a chunk.
+        """
+        if isinstance(X, TokenSequences):
+            vocabulary = X.vocabulary if X.vocabulary is not None else self.token_vocabulary_
+            table = self._hash_table(vocabulary)
+            ids = np.asarray(X.tokens, dtype=np.int64)
+            known = (ids != UNKNOWN_ID) & (ids < len(table))
+
+            return table[np.where(known, ids, 0)], known, np.asarray(X.offsets, dtype=np.int64)
+
+        table = None
+        rows = []
+        for x in X:
+            if isinstance(x, str):
+                rows.append(np.array([token_hash(t) for t in tokenize(x)], dtype=np.uint64))
+            else:
+                # token ids of the training vocabulary, see RandomForestService.token_vocabulary()
+                table = self._hash_table(self.token_vocabulary_) if table is None else table
+                ids = np.asarray(x, dtype=np.int64)
+                rows.append(np.where((ids != UNKNOWN_ID) & (ids < len(table)), table[np.minimum(ids, len(table) - 1)], 0))
+
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=offsets[1:])
+        hashes = np.concatenate(rows) if rows else np.zeros(0, dtype=np.uint64)
+
+        return hashes, hashes != 0, offsets
+
+    def ngram_hashes(self, token_hashes: np.ndarray) -> np.ndarray:
+        """
+        Hashes of n-grams given as a (count, n) array of token hashes.
+        """
+        with np.errstate(over="ignore"):
+            key = np.zeros(len(token_hashes), dtype=np.uint64)
+            for k in range(token_hashes.shape[1]):
+                key = key * NGRAM_MULTIPLIER + token_hashes[:, k]
+
+        return mix64(key)
+
+    def _iter_ngrams(self, X):
+        """
+        Yields (n-gram hashes, row of each n-gram) for every n in
+        ngram_range, one n at a time.
+        """
+        hashes, known, offsets = self._token_hashes(X)
+        rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        min_n, max_n = self.ngram_range
+
+        for n in range(min_n, max_n + 1):
+            count = len(hashes) - n + 1
+            if count <= 0:
+                break
+
+            valid = rows[n - 1:] == rows[:count]
+            for k in range(n):
+                valid &= known[k:k + count]
+
+            positions = np.flatnonzero(valid)
+            key = np.zeros(len(positions), dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                for k in range(n):
+                    key *= NGRAM_MULTIPLIER
+                    key += hashes[positions + k]
+
+            yield mix64(key), rows[positions]
+
+    def columns(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Output column of every n-gram hash, -1 when pruned.
+        """
+        buckets = (keys % np.uint64(self.n_features)).astype(np.int64)
+
+        if self.sketch_ is not None:
+            buckets = np.where(self.sketch_.estimate(keys) >= self.min_count, buckets, -1)
+
+        if self.buckets_ is None:
+            return buckets
+
+        columns = np.searchsorted(self.buckets_, buckets)
+        columns = np.minimum(columns, max(len(self.buckets_) - 1, 0))
+        found = (buckets >= 0) & (self.buckets_[columns] == buckets) if len(self.buckets_) else np.zeros(len(keys), dtype=bool)
+
+        return np.where(found, columns, -1)
+
+    def fit(self, X, y=None):
+        min_n, max_n = self.ngram_range
+        if min_n < 1 or max_n < min_n:
+            raise ValueError(f"Invalid ngram_range: {self.ngram_range}")
+
+        # ids given without their vocabulary are read with this one
+        source = X.vocabulary if isinstance(X, TokenSequences) and X.vocabulary is not None else self.vocabulary
+        self.token_vocabulary_ = Vocabulary(source.tokens[1:] if source is not None else None)
+        self.sketch_ = None
+        self.buckets_ = None
+
+        if self.min_count > 1:
+            sketch = CountMinSketch(self.sketch_width, self.sketch_depth)
+            for chunk in sequence_chunks(X, self.chunk_rows):
+                for keys, _ in self._iter_ngrams(chunk):
+                    sketch.add(keys)
+            self.sketch_ = sketch
+
+        if self.max_features is not None:
+            counts = np.zeros(self.n_features, dtype=np.int64)
+            for chunk in sequence_chunks(X, self.chunk_rows):
+                for keys, _ in self._iter_ngrams(chunk):
+                    buckets = self.columns(keys)
+                    counts += np.bincount(buckets[buckets >= 0], minlength=self.n_features)
+
+            used = np.flatnonzero(counts)
+            # most frequent first, ties by bucket so the selection is deterministic
+            top = used[np.argsort(-counts[used], kind="stable")[:self.max_features]]
+            self.buckets_ = np.sort(top)
+
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
+
+    def transform(self, X):
+        parts = []
+
+        for chunk in sequence_chunks(X, self.chunk_rows):
+            rows, columns = [], []
+            for keys, key_rows in self._iter_ngrams(chunk):
+                key_columns = self.columns(keys)
+                kept = key_columns >= 0
+                rows.append(key_rows[kept])
+                columns.append(key_columns[kept])
+
+            rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+            columns = np.concatenate(columns) if columns else np.zeros(0, dtype=np.int64)
+
+            matrix = sp.csr_matrix(
+                (np.ones(len(rows), dtype=np.int64), (rows, columns)),
+                shape=(len(chunk), self.n_features_out_)
+            )
+            matrix.sum_duplicates()
+            parts.append(matrix)
+
+        if not parts:
+            return sp.csr_matrix((0, self.n_features_out_), dtype=np.int64)
+
+        return sp.vstack(parts, format="csr")
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        buckets = self.buckets_ if self.buckets_ is not None else np.arange(self.n_features)
+        return np.array([f"hash_{b}" for b in buckets.tolist()], dtype=object)
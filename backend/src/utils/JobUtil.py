@@ -0,0 +1,46 @@
+import os
+import threading
+
+_reporter = None
+_lock = threading.Lock()
+
+def set_reporter(reporter):
+    """
+    Installs the callback receiving report_stage() calls, e.g. the job
+    runner forwarding stages to the parent process. None removes it.
+    """
+    global _reporter
+
+    with _lock:
+        _reporter = reporter
+
+def report_stage(stage: str, **info):
+    """
+    Marks the start of a named stage (vectorize, lda, forest...). A no-op
+    when the code does not run inside a job.
+    """
+    with _lock:
+        reporter = _reporter
+
+    if reporter is not None:
+        reporter(stage, info)
+
+def available_cores() -> list:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+
+    return list(range(os.cpu_count() or 1))
+
+def job_cores(reserved: int, budget: int = 0) -> list:
+    """
+    Cores a background job may use: every core except the first `reserved`
+    ones (kept for the serving workers), at most `budget` of them when set.
+    At least one core is always returned.
+    """
+    cores = available_cores()
+    allowed = cores[reserved:] or cores[-1:]
+
+    if budget > 0:
+        allowed = allowed[-budget:]
+
+    return allowed
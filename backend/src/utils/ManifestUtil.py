@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(path: str, manifest: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+def fingerprint(path: str, previous: dict = None, hash_contents: bool = True) -> dict:
+    """
+    Size, mtime and sha256 of a file. The hash of the previous entry is
+    reused when size and mtime did not change, so unchanged files are not read.
+    With hash_contents=False the file is not read at all and the hash is
+    None: a later build compares it by size and mtime until it changes.
+    """
+    stat = os.stat(path)
+
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime_ns:
+        digest = previous.get("hash")
+    elif hash_contents:
+        digest = file_hash(path)
+    else:
+        digest = None
+
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest}
+
+def same_fingerprint(previous: dict, current: dict) -> bool:
+    """
+    Whether two fingerprints describe the same file content. Hashes are
+    compared when both are known, otherwise size and mtime decide.
+    """
+    if previous.get("hash") and current.get("hash"):
+        return previous["hash"] == current["hash"]
+
+    return previous.get("size") == current.get("size") and previous.get("mtime") == current.get("mtime")
+
+def diff_files(paths: list, files: dict, extractor: str, hash_contents: bool = True) -> tuple[list, list, dict]:
+    """
+    Compares the files on disk with the manifest entries of a previous build.
+    Returns (paths to (re)process, names removed from disk, fresh fingerprints).
+    A file is reprocessed when it is new, its hash changed or it was
+    extracted by another extractor version. Full rebuilds pass
+    hash_contents=False: every file is processed anyway.
+    """
+    changed = []
+    fingerprints = {}
+
+    for path in paths:
+        fname = os.path.basename(path)
+        previous = files.get(fname)
+        current = fingerprint(path, previous, hash_contents)
+        fingerprints[fname] = current
+
+        if not previous or previous["hash"] != current["hash"] or previous.get("extractor") != extractor:
+            changed.append(path)
+
+    deleted = [fname for fname in files if fname not in fingerprints]
+
+    return changed, deleted, fingerprints
@@ -0,0 +1,46 @@
+import os
+
+# smaps fields (kB) -> report keys
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+    "Swap": "swap"
+}
+
+def process_memory(pid: int = None) -> dict:
+    """
+    Resident memory of a process in bytes, split into "unique" (pages only
+    this process maps, what it would free on exit) and "shared" (pages also
+    mapped by other processes, e.g. a memory-mapped model read by several
+    workers). "pss" charges each shared page proportionally. Linux only,
+    an empty dict elsewhere.
+    """
+    pid = pid or os.getpid()
+    path = f"/proc/{pid}/smaps_rollup"
+
+    if not os.path.exists(path):
+        # kernels before 4.14: sum every mapping
+        path = f"/proc/{pid}/smaps"
+        if not os.path.exists(path):
+            return {}
+
+    totals = dict.fromkeys(SMAPS_FIELDS.values(), 0)
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            field, _, value = line.partition(":")
+            if field in SMAPS_FIELDS:
+                totals[SMAPS_FIELDS[field]] += int(value.split()[0]) * 1024
+
+    return {
+        "pid": pid,
+        "rss": totals["rss"],
+        "pss": totals["pss"],
+        "unique": totals["private_clean"] + totals["private_dirty"],
+        "shared": totals["shared_clean"] + totals["shared_dirty"],
+        "swap": totals["swap"]
+    }
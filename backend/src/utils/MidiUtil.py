@@ -0,0 +1,173 @@
+import os
+import json
+import numpy as np
+from pathlib import Path
+from src.enums import MusicEnum
+
+BASE_DIR = Path(__file__).resolve().parent                                          # /app/src/utils
+FORTE_TABLE_PATH = (BASE_DIR / '..' / 'xmidi-dataset' / 'forte_tn_table.json').resolve()
+
+# pitch-class name of every MIDI pitch (0-127), e.g. PITCH_CLASS_NAMES[61] == "C#"
+PITCH_CLASS_NAMES = np.array(
+    [MusicEnum.Notes.PITCH_CLASSES.value[p % 12] for p in range(128)],
+    dtype=object
+)
+
+# Krumhansl-Kessler key profiles (same weights music21 uses for analyze("key"))
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+# music21 tonic spelling per pitch class, as (major, minor)
+KEY_TONICS = [
+    ("C", "C"), ("D-", "C#"), ("D", "D"), ("E-", "E-"), ("E", "E"), ("F", "F"),
+    ("F#", "F#"), ("G", "G"), ("A-", "G#"), ("A", "A"), ("B-", "B-"), ("B", "B")
+]
+
+_forte_table = None
+
+def note_arrays(instrument) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (starts, ends, pitches, velocities) of a pretty_midi instrument,
+    sorted by note start (stable, same order as sorted(notes, key=start)).
+    """
+    notes = instrument.notes
+    count = len(notes)
+
+    starts = np.fromiter((n.start for n in notes), dtype=np.float64, count=count)
+    ends = np.fromiter((n.end for n in notes), dtype=np.float64, count=count)
+    pitches = np.fromiter((n.pitch for n in notes), dtype=np.int16, count=count)
+    velocities = np.fromiter((n.velocity for n in notes), dtype=np.int16, count=count)
+
+    order = np.argsort(starts, kind="stable")
+
+    return starts[order], ends[order], pitches[order], velocities[order]
+
+def drop_repeated_onsets(starts: np.ndarray, pitches: np.ndarray, max_gap: float) -> np.ndarray:
+    """
+    Keep-mask that drops a note when it repeats the pitch of the last kept note
+    less than max_gap seconds after it (same rule as the old per-note loop).
+    Only runs of repeated pitches that contain a close onset are walked in
+    Python; everything else is resolved with array comparisons.
+    """
+    count = len(starts)
+    keep = np.ones(count, dtype=bool)
+
+    if count < 2:
+        return keep
+
+    positions = np.arange(count)
+    same = np.zeros(count, dtype=bool)
+    same[1:] = pitches[1:] == pitches[:-1]
+    close = np.zeros(count, dtype=bool)
+    close[1:] = same[1:] & ((starts[1:] - starts[:-1]) < max_gap)
+
+    if not close.any():
+        return keep
+
+    # a run is a streak of equal pitches; from its first close onset on, the
+    # result depends on which earlier notes were dropped
+    run_start = np.maximum.accumulate(np.where(same, 0, positions))
+    last_close = np.maximum.accumulate(np.where(close, positions, -1))
+    sequential = same & (last_close >= run_start)
+
+    last_kept = 0
+    for i in np.flatnonzero(sequential):
+        ref = i - 1 if keep[i - 1] else last_kept
+
+        if starts[i] - starts[ref] < max_gap:
+            keep[i] = False
+            last_kept = ref
+        else:
+            last_kept = i
+
+    return keep
+
+def forte_class_table() -> np.ndarray:
+    """
+    forteClassTn of every pitch-class set, indexed by its 12-bit mask
+    (bit n set = pitch class n present). Built once with music21 and cached
+    on disk, so callers only need integer pitches afterwards.
+    """
+    global _forte_table
+
+    if _forte_table is None:
+        if os.path.exists(FORTE_TABLE_PATH):
+            with open(FORTE_TABLE_PATH, "r", encoding="utf-8") as f:
+                table = json.load(f)
+        else:
+            from music21 import chord as m21Chord
+
+            print("🔧 Building Forte class table (one-off)...")
+            table = [""] + [
+                m21Chord.Chord([pc for pc in range(12) if mask >> pc & 1]).forteClassTn
+                for mask in range(1, 4096)
+            ]
+
+            os.makedirs(os.path.dirname(FORTE_TABLE_PATH), exist_ok=True)
+            with open(FORTE_TABLE_PATH, "w", encoding="utf-8") as f:
+                json.dump(table, f)
+
+        _forte_table = np.array(table, dtype=object)
+
+    return _forte_table
+
+def bucket_pitch_class_sets(starts: np.ndarray, pitches: np.ndarray, bucket_size: float) -> np.ndarray:
+    """
+    Groups notes by round(start / bucket_size) and returns the pitch-class
+    bitmask of every bucket, in time order.
+    """
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    buckets = np.round(starts / bucket_size).astype(np.int64)
+    order = np.argsort(buckets, kind="stable")
+    buckets = buckets[order]
+    bits = np.left_shift(1, pitches[order].astype(np.int64) % 12)
+
+    first = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    return np.bitwise_or.reduceat(bits, first)
+
+def estimate_key(pitches: np.ndarray, durations: np.ndarray) -> dict:
+    """
+    Krumhansl-Schmuckler key estimate from a duration-weighted pitch-class
+    histogram. Returns the same shape as MidiService.find_estimate_key.
+    """
+    histogram = np.bincount(pitches.astype(np.int64) % 12, weights=durations, minlength=12)
+
+    if not histogram.any():
+        return {"key": "", "tonic": "", "mode": ""}
+
+    # every rotation of each profile, row i = profile with tonic i
+    rotations = (np.arange(12)[None, :] - np.arange(12)[:, None]) % 12
+    best = None
+
+    for mode, profile in (("major", MAJOR_PROFILE), ("minor", MINOR_PROFILE)):
+        scores = np.array([np.corrcoef(histogram, profile[row])[0, 1] for row in rotations])
+        scores = np.nan_to_num(scores, nan=-1.0)
+        tonic_pc = int(np.argmax(scores))
+
+        if best is None or scores[tonic_pc] > best[0]:
+            best = (scores[tonic_pc], tonic_pc, mode)
+
+    _, tonic_pc, mode = best
+    tonic = KEY_TONICS[tonic_pc][0 if mode == "major" else 1]
+
+    return {
+        "key": f"{tonic if mode == 'major' else tonic.lower()} {mode}",
+        "tonic": tonic,
+        "mode": mode
+    }
+
+def dominant_tempo(midi_data) -> float:
+    """
+    Tempo (BPM) that covers the longest stretch of the MIDI tempo map.
+    """
+    change_times, tempi = midi_data.get_tempo_changes()
+
+    if len(tempi) == 0:
+        return 120.0
+
+    end_time = max(midi_data.get_end_time(), change_times[-1])
+    spans = np.diff(np.append(change_times, end_time))
+
+    return float(tempi[int(np.argmax(spans))])
@@ -0,0 +1,40 @@
+import numpy as np
+
+def class_probabilities(model, X) -> np.ndarray:
+    """
+    Class scores of a fitted classifier (or Pipeline) for every row of X, in
+    the order of model.classes_, with a single pass over the model:
+    predict_proba when it has one, otherwise the softmax of the
+    decision_function margins (LinearSVC), which ranks the classes like
+    predict but is not a calibrated probability.
+    """
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X), dtype=np.float64)
+
+    margins = np.asarray(model.decision_function(X), dtype=np.float64)
+
+    # binary classifiers return the margin of classes_[1] only
+    if margins.ndim == 1:
+        margins = np.column_stack([-margins, margins])
+
+    margins = margins - margins.max(axis=1, keepdims=True)
+    scores = np.exp(margins)
+
+    return scores / scores.sum(axis=1, keepdims=True)
+
+def emotion_result(classes, probs) -> dict:
+    """
+    {"emotion", "probabilities"} of one row, the emotion being the most
+    probable class (what predict returns for these classifiers).
+    """
+    return {
+        "emotion": str(classes[int(np.argmax(probs))]),
+        "probabilities": {str(c): float(p) for c, p in zip(classes, probs)}
+    }
+
+def predict_emotions(model, X) -> list:
+    """
+    emotion_result() of every row of X, from one class_probabilities() call.
+    """
+    probs = class_probabilities(model, X)
+    return [emotion_result(model.classes_, row) for row in probs]
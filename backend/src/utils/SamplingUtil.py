@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+def balanced_rows(labels, random_state: int = 42, sort_classes: bool = False) -> np.ndarray:
+    """
+    Row positions of a class-balanced subset: every label undersampled to
+    the minority class size, then shuffled. Same rows and order as sampling
+    each class of the DataFrame (most frequent first, or in label order with
+    sort_classes=True like a groupby) and shuffling the concatenation.
+    """
+    labels = pd.Series(np.asarray(labels))
+    counts = labels.value_counts()
+    min_size = counts.min()
+    classes = sorted(counts.index) if sort_classes else counts.index
+
+    parts = [
+        labels[labels == label].sample(n=min_size, replace=False, random_state=random_state)
+        for label in classes
+    ]
+
+    return pd.concat(parts).sample(frac=1, random_state=random_state).index.to_numpy()
+
+class BalancedBatchSampler:
+    """
+    Yields batches of row positions with the same number of rows per class
+    (batch_size // number of classes), drawn on the fly from the labels.
+
+    Without replacement an epoch walks each class in a fresh random order and
+    stops when the smallest class runs out; with replacement it lasts as long
+    as the largest class, cycling the smaller ones.
+    """
+    def __init__(self, labels, batch_size: int, replacement: bool = False, seed: int = 42):
+        labels = np.asarray(labels)
+        classes, inverse = np.unique(labels, return_inverse=True)
+
+        if len(classes) == 0:
+            raise ValueError("Cannot balance an empty dataset.")
+
+        self.per_class = batch_size // len(classes)
+        if self.per_class <= 0:
+            raise ValueError(f"batch_size must be at least the number of classes ({len(classes)}).")
+
+        self.classes = classes
+        self.class_rows = [np.flatnonzero(inverse == i) for i in range(len(classes))]
+        self.replacement = replacement
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        sizes = [len(rows) for rows in self.class_rows]
+        return (max(sizes) if self.replacement else min(sizes)) // self.per_class
+
+    def __iter__(self):
+        batches = len(self)
+        needed = batches * self.per_class
+
+        orders = []
+        for rows in self.class_rows:
+            order = self.rng.permutation(rows)
+            if len(order) < needed:
+                order = np.resize(order, needed)
+            orders.append(order[:needed].reshape(batches, self.per_class))
+
+        for b in range(batches):
+            batch = np.concatenate([order[b] for order in orders])
+            self.rng.shuffle(batch)
+            yield batch
@@ -0,0 +1,152 @@
+from collections import Counter
+import numpy as np
+import scipy.sparse as sp
+from src.utils.TokenUtil import TokenNgramVectorizer, UNKNOWN_ID, tokenize
+from src.utils.HashingUtil import HashedNgramVectorizer, token_hash
+
+def vectorizer_tokens(vectorizer, text: str) -> list:
+    """
+    Tokens of text as the vectorizer sees them: ids (None when unknown)
+    for a TokenNgramVectorizer, token hashes for a HashedNgramVectorizer,
+    preprocessed strings for a CountVectorizer.
+    """
+    if isinstance(vectorizer, HashedNgramVectorizer):
+        return [token_hash(t) for t in tokenize(text)]
+
+    if isinstance(vectorizer, TokenNgramVectorizer):
+        ids = vectorizer.token_vocabulary_.encode_text(text).astype(np.int64)
+        return [int(i) if UNKNOWN_ID < i < vectorizer.base_ else None for i in ids]
+
+    if getattr(vectorizer, "analyzer", "word") != "word":
+        raise ValueError("Only word n-gram vectorizers are supported.")
+
+    return vectorizer.build_tokenizer()(vectorizer.build_preprocessor()(text))
+
+def ngram_columns(vectorizer, grams: list) -> np.ndarray:
+    """
+    Column of every n-gram (tuple of tokens) in the vectorizer output, -1
+    when it is not a feature; looked up in one pass.
+    """
+    if isinstance(vectorizer, HashedNgramVectorizer):
+        columns = np.full(len(grams), -1, dtype=np.int64)
+        by_length = {}
+        for i, gram in enumerate(grams):
+            by_length.setdefault(len(gram), []).append(i)
+
+        for positions in by_length.values():
+            hashes = np.array([grams[i] for i in positions], dtype=np.uint64)
+            columns[positions] = vectorizer.columns(vectorizer.ngram_hashes(hashes))
+
+        return columns
+
+    if isinstance(vectorizer, TokenNgramVectorizer):
+        keys = np.full(len(grams), -1, dtype=np.int64)
+
+        for i, gram in enumerate(grams):
+            if None not in gram:
+                key = 0
+                for token in gram:
+                    key = key * vectorizer.base_ + token
+                keys[i] = key
+
+        columns = np.searchsorted(vectorizer.ngram_keys_, keys)
+        found = (keys >= 0) & (columns < len(vectorizer.ngram_keys_))
+        found[found] = vectorizer.ngram_keys_[columns[found]] == keys[found]
+
+        return np.where(found, columns, -1)
+
+    return np.array([vectorizer.vocabulary_.get(" ".join(gram), -1) for gram in grams], dtype=np.int64)
+
+def n_features(vectorizer) -> int:
+    if isinstance(vectorizer, HashedNgramVectorizer):
+        return vectorizer.n_features_out_
+
+    if isinstance(vectorizer, TokenNgramVectorizer):
+        return len(vectorizer.ngram_keys_)
+
+    return len(vectorizer.vocabulary_)
+
+def sliding_ngram_counts(vectorizer, sequence: str, suffix: str, size: int, step: int) -> tuple:
+    """
+    N-gram counts of "<window> <suffix>" for every window of `size` tokens
+    of sequence, `step` tokens apart (the last window ends with the
+    sequence), as the fitted vectorizer would count them, without
+    re-vectorizing each window: the column of every n-gram of the sequence
+    is looked up once, the counts of the n-grams inside the window are
+    updated as it slides, and only the few n-grams reaching into the
+    suffix are added per window.
+
+    Returns (CSR matrix with one row per window, [(start, end)] token
+    positions of the windows).
+    """
+    if size <= 0 or step <= 0:
+        raise ValueError("Window size and step must be greater than 0.")
+
+    tokens = vectorizer_tokens(vectorizer, sequence)
+    suffix_tokens = vectorizer_tokens(vectorizer, suffix)
+    min_n, max_n = vectorizer.ngram_range
+
+    size = min(size, len(tokens)) or len(tokens)
+    starts = list(range(0, max(len(tokens) - size, 0) + 1, step))
+    if starts and starts[-1] + size < len(tokens):
+        starts.append(len(tokens) - size)
+
+    # column of the n-gram starting at each position, for every n
+    columns = {
+        n: ngram_columns(vectorizer, [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]).tolist()
+        for n in range(min_n, max_n + 1)
+    }
+
+    # n-grams overlapping the suffix depend on the window end only
+    tails = {}
+    for start in starts or [0]:
+        end = start + size
+        if end not in tails:
+            lo = max(start, end - max_n + 1)
+            combined = tokens[lo:end] + suffix_tokens
+            tails[end] = [
+                tuple(combined[i:i + n])
+                for n in range(min_n, max_n + 1) for i in range(len(combined) - n + 1) if i + n > end - lo
+            ]
+
+    grams = [gram for tail in tails.values() for gram in tail]
+    found = iter(ngram_columns(vectorizer, grams).tolist())
+    tails = {end: Counter(c for c in (next(found) for _ in tail) if c >= 0) for end, tail in tails.items()}
+
+    def add(counts: Counter, n: int, positions, sign: int):
+        for i in positions:
+            column = columns[n][i]
+            if column >= 0:
+                counts[column] += sign
+                if counts[column] == 0:
+                    del counts[column]
+
+    inside = Counter()
+    rows, cols, values = [], [], []
+    previous = None
+
+    for row, start in enumerate(starts or [0]):
+        end = start + size
+
+        for n in range(min_n, max_n + 1):
+            # n-grams starting in [start, end - n] are the ones fully inside:
+            # drop those left behind, add those the window reached
+            if previous is None:
+                add(inside, n, range(start, max(end - n + 1, start)), 1)
+            else:
+                add(inside, n, range(previous, min(start, previous + size - n + 1)), -1)
+                add(inside, n, range(max(previous + size - n + 1, start), max(end - n + 1, start)), 1)
+
+        # duplicate (row, column) entries are summed by csr_matrix
+        for counts in (inside, tails[end]):
+            rows.extend([row] * len(counts))
+            cols.extend(counts.keys())
+            values.extend(counts.values())
+        previous = start
+
+    matrix = sp.csr_matrix(
+        (np.array(values, dtype=np.int64), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(len(starts or [0]), n_features(vectorizer))
+    )
+
+    return matrix, [(start, start + size) for start in (starts or [0])]
@@ -0,0 +1,305 @@
+import os
+import re
+import json
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# same tokenization as the CountVectorizer of the n-gram pipelines
+TOKEN_PATTERN = r"[0-9A-Za-z\-]+"
+_token_re = re.compile(TOKEN_PATTERN)
+
+UNKNOWN_ID = 0
+UNKNOWN_TOKEN = "<unk>"
+
+TOKEN_DTYPE = np.uint16
+MAX_TOKENS = np.iinfo(TOKEN_DTYPE).max + 1
+
+def tokenize(text: str) -> list:
+    return _token_re.findall(text)
+
+class Vocabulary:
+    """
+    Interned token vocabulary (Forte classes, modes, tonics) mapping every
+    token to a small integer. Append-only: interning never changes the id of
+    an existing token, so arrays encoded with an older vocabulary stay valid.
+    Id 0 is reserved for unknown tokens.
+    """
+    def __init__(self, tokens: list = None):
+        self.tokens = [UNKNOWN_TOKEN]
+        self.index = {UNKNOWN_TOKEN: UNKNOWN_ID}
+
+        for token in tokens or []:
+            self.intern(token)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token):
+        return token in self.index
+
+    def intern(self, token: str) -> int:
+        token_id = self.index.get(token)
+
+        if token_id is None:
+            if len(self.tokens) >= MAX_TOKENS:
+                raise ValueError(f"Vocabulary is full ({MAX_TOKENS} tokens).")
+
+            token_id = len(self.tokens)
+            self.tokens.append(token)
+            self.index[token] = token_id
+
+        return token_id
+
+    def id_of(self, token: str) -> int:
+        return self.index.get(token, UNKNOWN_ID)
+
+    def encode(self, tokens: list, grow: bool = False) -> np.ndarray:
+        lookup = self.intern if grow else self.id_of
+        return np.array([lookup(t) for t in tokens], dtype=TOKEN_DTYPE)
+
+    def encode_text(self, text: str, grow: bool = False) -> np.ndarray:
+        """
+        Encodes a model input string such as "3-11B,4-20 | minor | C" with the
+        same token pattern the vectorizer used, so ids line up with it.
+        """
+        return self.encode(tokenize(text), grow=grow)
+
+    def decode(self, ids) -> list:
+        return [self.tokens[i] for i in ids]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.tokens[1:], f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Vocabulary":
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+def forte_id_table(vocabulary: Vocabulary) -> np.ndarray:
+    """
+    Vocabulary id of the Forte class of every 12-bit pitch-class mask, so a
+    chord bucket can be turned into a token id without building the string.
+    """
+    from src.utils.MidiUtil import forte_class_table
+
+    return np.array([vocabulary.id_of(name) for name in forte_class_table()], dtype=TOKEN_DTYPE)
+
+def ragged_take(values: np.ndarray, offsets: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gathers the given rows of a flat (values, offsets) ragged array.
+    Returns the new (values, offsets).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+
+    new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return np.asarray(values)[positions], new_offsets
+
+def ragged_concat(parts: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise concatenation of ragged arrays with the same number of rows:
+    row i of the result is row i of every part, in order.
+    Each part is a (values, offsets) pair.
+    """
+    lengths = sum(np.diff(offsets) for _, offsets in parts)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    values = np.empty(offsets[-1], dtype=TOKEN_DTYPE)
+    written = offsets[:-1].copy()
+
+    for part_values, part_offsets in parts:
+        part_lengths = np.diff(part_offsets)
+        positions = np.repeat(written - part_offsets[:-1], part_lengths) + np.arange(part_offsets[-1])
+        values[positions] = part_values
+        written += part_lengths
+
+    return values, offsets
+
+class TokenSequences:
+    """
+    Token id sequences stored as one flat uint16 array plus int64 offsets
+    (row i = tokens[offsets[i]:offsets[i + 1]]). Both arrays can be
+    memory-mapped, see TokenStoreService.
+    """
+    def __init__(self, tokens: np.ndarray, offsets: np.ndarray, vocabulary: Vocabulary = None):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i) -> np.ndarray:
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, rows) -> "TokenSequences":
+        tokens, offsets = ragged_take(self.tokens, self.offsets, rows)
+        return TokenSequences(tokens, offsets, self.vocabulary)
+
+    @classmethod
+    def from_arrays(cls, sequences, vocabulary: Vocabulary = None) -> "TokenSequences":
+        sequences = [np.asarray(s, dtype=TOKEN_DTYPE) for s in sequences]
+
+        offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in sequences], out=offsets[1:])
+        tokens = np.concatenate(sequences) if sequences else np.zeros(0, dtype=TOKEN_DTYPE)
+
+        return cls(tokens, offsets, vocabulary)
+
+class TokenNgramVectorizer(BaseEstimator, TransformerMixin):
+    """
+    N-gram count vectorizer over token ids, a drop-in for the
+    CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False) step.
+
+    Accepts TokenSequences (e.g. memory-mapped from TokenStoreService), id
+    arrays or the usual "sequence | mode | tonic" strings. Every n-gram is
+    packed into one int64 (ids as base-len(vocabulary) digits), so counting
+    is a np.unique over integers instead of string joins and dict lookups.
+    Like CountVectorizer, n-grams with an unknown token are ignored and
+    max_features keeps the most frequent n-grams of the corpus. The counts
+    match CountVectorizer's for the same n-grams, but columns are ordered by
+    key rather than alphabetically, and n-grams tied in frequency at the
+    max_features cut are kept by key order, so the two can select different
+    n-grams among those ties.
+
+    TokenSequences encoded with another vocabulary are remapped through
+    their token strings; ids of tokens unknown at fit time count as unknown.
+    """
+    def __init__(self, vocabulary: Vocabulary = None, ngram_range=(1, 1), max_features: int = None):
+        self.vocabulary = vocabulary
+        self.ngram_range = ngram_range
+        self.max_features = max_features
+
+    def _to_sequences(self, X, grow: bool) -> TokenSequences:
+        vocabulary = self.token_vocabulary_
+
+        if isinstance(X, TokenSequences):
+            # ids of an append-only extension of the training vocabulary are
+            # used as they are: the ones added later are >= base_ (unknown)
+            if X.vocabulary is None or X.vocabulary.tokens[:len(vocabulary)] == vocabulary.tokens:
+                return X
+
+            table = np.array([vocabulary.id_of(t) for t in X.vocabulary.tokens], dtype=TOKEN_DTYPE)
+            return TokenSequences(table[np.asarray(X.tokens, dtype=np.int64)], X.offsets, vocabulary)
+
+        return TokenSequences.from_arrays(
+            [vocabulary.encode_text(x, grow=grow) if isinstance(x, str) else x for x in X]
+        )
+
+    def _ngram_keys(self, sequences: TokenSequences) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (n-gram keys, row of each key) for every n in ngram_range.
+        """
+        tokens = np.asarray(sequences.tokens, dtype=np.int64)
+        offsets = np.asarray(sequences.offsets, dtype=np.int64)
+        base = self.base_
+
+        # ids added to the vocabulary after fit are unknown for this model
+        tokens = np.where(tokens < base, tokens, UNKNOWN_ID)
+        rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+        min_n, max_n = self.ngram_range
+        keys = []
+        key_rows = []
+
+        for n in range(min_n, max_n + 1):
+            count = len(tokens) - n + 1
+            if count <= 0:
+                break
+
+            key = np.zeros(count, dtype=np.int64)
+            valid = rows[n - 1:] == rows[:count]
+
+            for k in range(n):
+                window = tokens[k:k + count]
+                valid &= window != UNKNOWN_ID
+                key = key * base + window
+
+            keys.append(key[valid])
+            key_rows.append(rows[:count][valid])
+
+        if not keys:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        return np.concatenate(keys), np.concatenate(key_rows)
+
+    def fit(self, X, y=None):
+        self.fit_transform(X, y)
+        return self
+
+    def fit_transform(self, X, y=None):
+        min_n, max_n = self.ngram_range
+        if min_n < 1 or max_n < min_n:
+            raise ValueError(f"Invalid ngram_range: {self.ngram_range}")
+
+        # stored sequences carry the vocabulary they were encoded with
+        source = X.vocabulary if isinstance(X, TokenSequences) and X.vocabulary is not None else self.vocabulary
+        self.token_vocabulary_ = Vocabulary(source.tokens[1:] if source is not None else None)
+        sequences = self._to_sequences(X, grow=True)
+
+        self.base_ = len(self.token_vocabulary_)
+        if float(self.base_) ** max_n >= 2 ** 63:
+            raise ValueError(f"{self.base_} tokens are too many to pack {max_n}-grams into int64.")
+
+        keys, rows = self._ngram_keys(sequences)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+
+        if self.max_features is not None and len(unique_keys) > self.max_features:
+            # most frequent first, ties by key so the selection is deterministic
+            top = np.argsort(-counts, kind="stable")[:self.max_features]
+            unique_keys = np.sort(unique_keys[top])
+
+        self.ngram_keys_ = unique_keys
+
+        return self._count(keys, rows, len(sequences))
+
+    def transform(self, X):
+        sequences = self._to_sequences(X, grow=False)
+        keys, rows = self._ngram_keys(sequences)
+
+        return self._count(keys, rows, len(sequences))
+
+    def _count(self, keys: np.ndarray, rows: np.ndarray, n_rows: int):
+        columns = np.searchsorted(self.ngram_keys_, keys)
+        columns = np.minimum(columns, max(len(self.ngram_keys_) - 1, 0))
+        known = self.ngram_keys_[columns] == keys if len(self.ngram_keys_) else np.zeros(len(keys), dtype=bool)
+
+        matrix = sp.csr_matrix(
+            (np.ones(int(known.sum()), dtype=np.int64), (rows[known], columns[known])),
+            shape=(n_rows, len(self.ngram_keys_))
+        )
+        matrix.sum_duplicates()
+
+        return matrix
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        names = []
+
+        for key in self.ngram_keys_.tolist():
+            ids = []
+            while key:
+                key, token_id = divmod(key, self.base_)
+                ids.append(token_id)
+
+            names.append(" ".join(self.token_vocabulary_.decode(reversed(ids))))
+
+        return np.array(names, dtype=object)
@@ -0,0 +1,49 @@
+import numpy as np
+import pretty_midi
+import pytest
+
+FORTE = ["3-11A", "3-11B", "2-5", "2-3", "3-7B", "4-20", "4-26", "4-Z29A", "1-1"]
+
+def make_corpus(rows: int, seed: int = 0, min_chords: int = 1, max_chords: int = 12, tonics: tuple = ("C", "D", "G")) -> list:
+    """
+    Random "chords | mode | tonic" model inputs over FORTE, without the
+    tonic part when tonics is empty.
+    """
+    rng = np.random.default_rng(seed)
+    texts = []
+
+    for _ in range(rows):
+        text = ",".join(rng.choice(FORTE, size=rng.integers(min_chords, max_chords))) + " | " + rng.choice(["major", "minor"])
+        if tonics:
+            text += " | " + rng.choice(tonics)
+        texts.append(text)
+
+    return texts
+
+@pytest.fixture(scope="session")
+def forte() -> list:
+    return list(FORTE)
+
+@pytest.fixture(scope="session")
+def corpus():
+    return make_corpus
+
+@pytest.fixture
+def write_midi():
+    """
+    Writes a one-instrument MIDI file playing the given chords (lists of
+    pitches), half a second each.
+    """
+    def write(path, chords: list, program: int = 0):
+        midi = pretty_midi.PrettyMIDI(initial_tempo=120)
+        instrument = pretty_midi.Instrument(program=program)
+
+        for i, pitches in enumerate(chords):
+            for pitch in pitches:
+                instrument.notes.append(pretty_midi.Note(velocity=90, pitch=pitch, start=i * 0.5, end=(i + 1) * 0.5))
+
+        midi.instruments.append(instrument)
+        midi.write(str(path))
+        return path
+
+    return write
@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+import pytest
+from src.services.DatasetService import DatasetService
+from src.utils.ManifestUtil import load_manifest
+
+C_MAJOR, A_MINOR, G_MAJOR = [60, 64, 67], [57, 60, 64], [55, 59, 62]
+GUITAR = 25
+
+@pytest.fixture
+def folders(tmp_path):
+    midi_folder = tmp_path / "midi"
+    midi_folder.mkdir()
+    return midi_folder, tmp_path / "out" / "guitar.csv"
+
+def files_in(output_path) -> list:
+    return sorted(pd.read_csv(output_path)["file"])
+
+def test_incremental_run_replaces_changed_and_deleted_files(folders, write_midi):
+    midi_folder, output_path = folders
+    write_midi(midi_folder / "a.mid", [C_MAJOR, A_MINOR], GUITAR)
+    write_midi(midi_folder / "b.mid", [G_MAJOR], GUITAR)
+    write_midi(midi_folder / "c.mid", [C_MAJOR], GUITAR)
+
+    service = DatasetService(str(midi_folder), str(output_path))
+    service.process()
+    assert files_in(output_path) == ["a.mid", "b.mid", "c.mid"]
+
+    os.remove(midi_folder / "b.mid")
+    write_midi(midi_folder / "c.mid", [G_MAJOR, A_MINOR, C_MAJOR], GUITAR)
+    write_midi(midi_folder / "d.mid", [A_MINOR], GUITAR)
+    service.process(incremental=True)
+
+    df = pd.read_csv(output_path)
+    assert sorted(df["file"]) == ["a.mid", "c.mid", "d.mid"]
+    assert df.loc[df["file"] == "c.mid", "chords"].item().count(" - ") == 2
+
+def test_incremental_run_retries_failed_files(folders, write_midi):
+    midi_folder, output_path = folders
+    write_midi(midi_folder / "a.mid", [C_MAJOR], GUITAR)
+    (midi_folder / "broken.mid").write_bytes(b"not a midi file")
+
+    service = DatasetService(str(midi_folder), str(output_path))
+    service.process()
+    assert files_in(output_path) == ["a.mid"]
+
+    write_midi(midi_folder / "broken.mid", [G_MAJOR], GUITAR)
+    service.process(incremental=True)
+
+    assert files_in(output_path) == ["a.mid", "broken.mid"]
+
+def test_incremental_run_writes_an_empty_dataset(folders, write_midi):
+    midi_folder, output_path = folders
+    write_midi(midi_folder / "a.mid", [C_MAJOR], GUITAR)
+
+    service = DatasetService(str(midi_folder), str(output_path))
+    service.process()
+
+    os.remove(midi_folder / "a.mid")
+    service.process(incremental=True)
+
+    assert files_in(output_path) == []
+    assert load_manifest(service.manifest_path)["files"] == {}
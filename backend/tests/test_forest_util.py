@@ -0,0 +1,54 @@
+import copy
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src.utils.ForestUtil import FlatForest
+
+def dataset(rows: int = 600, features: int = 12, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    y = np.array(["angry", "happy", "sad"])[(X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (X[:, 3] > 0.5)]
+
+    return X, y
+
+@pytest.fixture(scope="module")
+def forest():
+    X, y = dataset()
+    return RandomForestClassifier(n_estimators=30, min_samples_leaf=2, random_state=0).fit(X, y)
+
+def test_predict_proba_matches_sklearn(forest):
+    X, _ = dataset(rows=400, seed=1)
+    flat = FlatForest.from_sklearn(forest)
+
+    np.testing.assert_array_equal(flat.classes_, forest.classes_)
+    np.testing.assert_allclose(flat.predict_proba(X), forest.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+
+def test_rows_on_split_thresholds_take_the_same_branch(forest):
+    # every feature value sits exactly on a threshold of some split
+    thresholds = np.concatenate([e.tree_.threshold[e.tree_.feature >= 0] for e in forest.estimators_])
+    rng = np.random.default_rng(2)
+    X = rng.choice(thresholds, size=(300, forest.n_features_in_)).astype(np.float32)
+
+    np.testing.assert_allclose(FlatForest.from_sklearn(forest).predict_proba(X), forest.predict_proba(X), atol=1e-6)
+
+def test_first_trees_match_a_smaller_forest(forest):
+    X, _ = dataset(rows=200, seed=3)
+    smaller = copy.copy(forest)
+    smaller.estimators_ = forest.estimators_[:7]
+    smaller.n_estimators = 7
+
+    flat = FlatForest.from_sklearn(forest, n_estimators=7)
+
+    assert flat.n_estimators == 7
+    np.testing.assert_allclose(flat.predict_proba(X), smaller.predict_proba(X), atol=1e-6)
+
+def test_memory_mapped_copy_predicts_the_same(forest, tmp_path):
+    X, _ = dataset(rows=100, seed=4)
+    flat = FlatForest.from_sklearn(forest)
+    joblib.dump(flat, tmp_path / "flat.pkl")
+
+    mapped = joblib.load(tmp_path / "flat.pkl", mmap_mode="r")
+
+    np.testing.assert_array_equal(mapped.predict_proba(X), flat.predict_proba(X))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from src.utils.TokenUtil import TokenNgramVectorizer, TokenSequences, Vocabulary
+from src.utils.HashingUtil import CountMinSketch, HashedNgramVectorizer, mix64, token_hash
+
+@pytest.fixture(scope="module")
+def texts(corpus) -> list:
+    return corpus(2000, seed=1, max_chords=20, tonics=())
+
+@pytest.fixture(scope="module")
+def sequences(texts) -> TokenSequences:
+    vocabulary = Vocabulary()
+    return TokenSequences.from_arrays([vocabulary.encode_text(t, grow=True) for t in texts], vocabulary)
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"max_features": 500},
+    {"max_features": 500, "min_count": 3, "sketch_width": 4096}
+])
+def test_token_ids_and_strings_get_the_same_columns(texts, sequences, params):
+    # chunk_rows splits the corpus unevenly
+    vectorizer = HashedNgramVectorizer(ngram_range=(1, 5), chunk_rows=333, **params)
+    from_ids = vectorizer.fit_transform(sequences)
+
+    assert (vectorizer.transform(texts) != from_ids).nnz == 0
+
+    # bare id arrays are read with the training vocabulary
+    ids = [sequences.vocabulary.encode_text(t) for t in texts[:50]]
+    assert (vectorizer.transform(ids) != from_ids[:50]).nnz == 0
+
+def test_columns_do_not_depend_on_the_vocabulary_ids(texts, sequences):
+    vectorizer = HashedNgramVectorizer(ngram_range=(1, 3), max_features=300).fit(sequences)
+
+    shuffled = Vocabulary(["unseen", *reversed(sequences.vocabulary.tokens[1:])])
+    other = TokenSequences.from_arrays([shuffled.encode_text(t) for t in texts], shuffled)
+
+    assert (vectorizer.transform(other) != vectorizer.transform(texts)).nnz == 0
+
+def test_fitting_on_strings_or_ids_selects_the_same_buckets(texts, sequences):
+    from_ids = HashedNgramVectorizer(ngram_range=(1, 4), max_features=400).fit(sequences)
+    from_strings = HashedNgramVectorizer(ngram_range=(1, 4), max_features=400).fit(texts)
+
+    np.testing.assert_array_equal(from_ids.buckets_, from_strings.buckets_)
+
+def test_counts_match_exact_ngrams_up_to_collisions(sequences):
+    exact = TokenNgramVectorizer(ngram_range=(1, 5)).fit_transform(sequences)
+    hashed = HashedNgramVectorizer(ngram_range=(1, 5), chunk_rows=333).fit_transform(sequences)
+
+    # colliding n-grams share a column: same totals, fewer columns
+    np.testing.assert_array_equal(np.asarray(hashed.sum(axis=1)), np.asarray(exact.sum(axis=1)))
+    assert hashed.nnz <= exact.nnz
+
+    rows = np.flatnonzero(np.diff(hashed.indptr) == np.diff(exact.indptr))
+    assert len(rows) > 0.99 * len(sequences)
+    for row in rows:
+        assert sorted(exact[row].data) == sorted(hashed[row].data)
+
+def test_min_count_drops_rare_ngrams(texts, forte):
+    rare = "7-7Z"
+    vectorizer = HashedNgramVectorizer(ngram_range=(1, 1), min_count=2).fit(texts + [rare])
+
+    key = mix64(np.array([token_hash(rare)], dtype=np.uint64))
+    assert vectorizer.columns(key)[0] == -1
+
+    key = mix64(np.array([token_hash(forte[0])], dtype=np.uint64))
+    assert vectorizer.columns(key)[0] >= 0
+
+def test_count_min_sketch_never_undercounts():
+    rng = np.random.default_rng(0)
+    keys = mix64(rng.integers(0, 5000, size=50000).astype(np.uint64))
+    sketch = CountMinSketch(width=1024, depth=4)
+    sketch.add(keys)
+
+    unique, exact = np.unique(keys, return_counts=True)
+    assert (sketch.estimate(unique) >= exact).all()
@@ -0,0 +1,75 @@
+import os
+import time
+import fcntl
+import pytest
+import src.services.JobService as jobs
+from src.services.JobService import JobService, FINISHED
+
+@pytest.fixture
+def service(tmp_path, monkeypatch) -> JobService:
+    monkeypatch.setattr(jobs, "JOB_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(jobs, "JOB_SLOT_POLL_SECONDS", 0.05)
+    return JobService(str(tmp_path))
+
+@pytest.fixture
+def busy_slot(tmp_path):
+    """
+    Holds the only job slot, as a job running in another worker would, so
+    submitted jobs stay queued.
+    """
+    with open(tmp_path / "slot-0.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield lock_file
+
+def wait_finished(service: JobService, job_id: str, timeout: float = 10) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get(job_id)
+        if job["status"] in FINISHED and job["finished_at"]:
+            return job
+        time.sleep(0.05)
+
+    raise AssertionError(f"job {job_id} did not finish: {service.get(job_id)}")
+
+def test_job_waits_for_a_slot_held_by_another_worker(service, busy_slot):
+    job = service.submit("evaluate-full")
+    time.sleep(0.3)
+
+    assert service.get(job["id"])["status"] == "queued"
+    service.cancel(job["id"])
+
+def test_cancelled_queued_job_finishes_without_running(service, busy_slot):
+    job = service.submit("evaluate-full")
+    cancelled = service.cancel(job["id"])
+
+    assert cancelled["status"] == "cancelled"
+
+    job = wait_finished(service, job["id"])
+    assert job["status"] == "cancelled"
+    assert job["pid"] is None and job["started_at"] is None
+
+def test_cancel_from_another_worker_is_adopted(service, busy_slot):
+    job = service.submit("evaluate-full")
+
+    # the other worker doesn't supervise the job: it leaves a cancel marker
+    supervised = JobService._jobs.pop(job["id"])
+    try:
+        JobService(service.jobs_dir).cancel(job["id"])
+    finally:
+        JobService._jobs[job["id"]] = supervised
+
+    assert os.path.exists(service.job_paths(job["id"])["cancel"])
+
+    job = wait_finished(service, job["id"])
+    assert job["status"] == "cancelled"
+    assert job["started_at"] is None
+
+    # later updates of the supervisor can't revive it
+    assert service.update(job["id"], status="running")["status"] == "cancelled"
+
+def test_unknown_job_type_is_rejected(service):
+    with pytest.raises(ValueError):
+        service.submit("train-everything")
+
+    with pytest.raises(FileNotFoundError):
+        service.get("missing")
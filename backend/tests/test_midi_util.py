@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from src.utils.MidiUtil import drop_repeated_onsets
+
+def legacy_keep(starts, pitches, max_gap):
+    # the per-note loop drop_repeated_onsets replaced
+    keep = []
+    last_pitch = None
+    last_time = -1
+
+    for start, pitch in zip(starts, pitches):
+        if last_pitch == pitch and (start - last_time) < max_gap:
+            keep.append(False)
+            continue
+
+        keep.append(True)
+        last_pitch = pitch
+        last_time = start
+
+    return np.array(keep, dtype=bool)
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("max_gap", [0.005, 0.05, 0.5])
+def test_drop_repeated_onsets_matches_legacy_loop(seed, max_gap):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(0, 300))
+
+    # few pitches and dense onsets: long runs of repeats, chains of close notes
+    starts = np.sort(np.round(rng.exponential(0.02, size=count).cumsum(), 3))
+    pitches = rng.choice([60, 62, 64], size=count, p=[0.6, 0.3, 0.1]).astype(np.int16)
+
+    np.testing.assert_array_equal(drop_repeated_onsets(starts, pitches, max_gap), legacy_keep(starts, pitches, max_gap))
+
+def test_drop_repeated_onsets_chain_is_measured_from_last_kept_note():
+    starts = np.array([0.0, 0.003, 0.006, 0.009, 0.5])
+    pitches = np.array([60, 60, 60, 60, 60], dtype=np.int16)
+
+    # 0.006 is 0.006 after the kept note at 0.0, not 0.003 after the dropped one
+    np.testing.assert_array_equal(drop_repeated_onsets(starts, pitches, 0.005), [True, False, True, False, True])
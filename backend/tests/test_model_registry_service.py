@@ -0,0 +1,64 @@
+import os
+import itertools
+import joblib
+import pytest
+from src.services.ModelRegistryService import ModelRegistryService
+
+@pytest.fixture
+def registry(tmp_path) -> ModelRegistryService:
+    return ModelRegistryService(tmp_path)
+
+def test_publish_points_current_at_the_new_version(registry):
+    first = registry.publish("rf", {"trees": 1})
+    second = registry.publish("rf", {"trees": 2})
+
+    assert registry.current("rf")["version"] == second["version"]
+    assert registry.load("rf") == ({"trees": 2}, second["version"])
+    assert registry.load("rf", first["version"]) == ({"trees": 1}, first["version"])
+
+def test_same_content_is_one_version(registry):
+    first = registry.publish("rf", {"trees": 1})
+    again = registry.publish("rf", {"trees": 1})
+
+    assert again["version"] == first["version"]
+    assert len(registry.versions("rf")) == 1
+
+def test_set_current_switches_only_to_published_versions(registry):
+    first = registry.publish("rf", {"trees": 1})
+    registry.publish("rf", {"trees": 2})
+
+    registry.set_current("rf", first["version"])
+    assert registry.load("rf")[0] == {"trees": 1}
+
+    for name, version in [("rf", "0" * 16), ("other", first["version"]), ("rf", "../rf")]:
+        with pytest.raises(FileNotFoundError):
+            registry.set_current(name, version)
+
+    assert registry.current("rf")["version"] == first["version"]
+
+def test_prune_keeps_the_newest_versions_and_the_current_one(registry, monkeypatch):
+    # distinct created_at, versions() sorts on it
+    clock = itertools.count()
+    monkeypatch.setattr("src.services.ModelRegistryService.time.time", lambda: next(clock))
+
+    entries = [registry.publish("rf", {"trees": i}, make_current=(i == 0)) for i in range(5)]
+    registry.prune("rf", keep=2)
+
+    kept = {entry["version"] for entry in registry.versions("rf")}
+    assert kept == {entries[0]["version"], entries[3]["version"], entries[4]["version"]}
+
+    for entry in entries[1:3]:
+        assert not os.path.exists(registry.version_paths("rf", entry["version"])["model"])
+
+def test_current_registers_a_legacy_model(registry, tmp_path):
+    legacy = tmp_path / "legacy.pkl"
+    joblib.dump({"trees": 7}, legacy)
+
+    pointer = registry.current("rf", legacy_path=str(legacy))
+
+    assert registry.load("rf") == ({"trees": 7}, pointer["version"])
+    assert registry.metadata("rf", pointer["version"])["source"] == "legacy.pkl"
+
+def test_current_without_a_version_fails(registry):
+    with pytest.raises(FileNotFoundError):
+        registry.current("rf")
@@ -0,0 +1,121 @@
+import os
+import pytest
+from src.services.ModelRegistryService import ModelRegistryService
+from src.services.PipelineService import PipelineService, Stage
+
+@pytest.fixture
+def workspace(tmp_path):
+    """
+    source.txt -> [double] -> doubled.txt -> [train] -> "model" registry
+    pointer -> [evaluate], counting the runs of each stage.
+    """
+    registry = ModelRegistryService(tmp_path / "models")
+    paths = {
+        "source": tmp_path / "source.txt",
+        "doubled": tmp_path / "doubled.txt",
+        "pointer": registry.pointer_path("model")
+    }
+    runs = {"double": 0, "train": 0, "evaluate": 0}
+
+    def double(factor):
+        runs["double"] += 1
+        paths["doubled"].write_text(paths["source"].read_text() * factor)
+
+    def train():
+        runs["train"] += 1
+        return registry.publish("model", {"data": paths["doubled"].read_text()})["version"]
+
+    def evaluate():
+        runs["evaluate"] += 1
+        return registry.current("model")["version"]
+
+    stages = [
+        Stage("double", double, [paths["source"]], [paths["doubled"]], {"factor": 2}),
+        Stage("train", train, [paths["doubled"]], [paths["pointer"]]),
+        Stage("evaluate", evaluate, [paths["pointer"]])
+    ]
+
+    paths["source"].write_text("abc")
+    service = PipelineService(manifest_path=str(tmp_path / "pipeline.manifest.json"), workers=2)
+
+    return service, stages, paths, runs, registry
+
+def statuses(results: dict) -> dict:
+    return {name: result["status"] for name, result in results.items()}
+
+def test_second_run_is_cached(workspace):
+    service, stages, _, runs, _ = workspace
+
+    assert set(statuses(service.run(stages)).values()) == {"ran"}
+    assert set(statuses(service.run(stages)).values()) == {"cached"}
+    assert runs == {"double": 1, "train": 1, "evaluate": 1}
+
+def test_changed_input_reruns_its_dependents(workspace):
+    service, stages, paths, _, _ = workspace
+    service.run(stages)
+
+    paths["source"].write_text("abcd")
+    results = service.run(stages)
+
+    assert statuses(results) == {"double": "ran", "train": "ran", "evaluate": "ran"}
+    assert paths["doubled"].read_text() == "abcdabcd"
+
+def test_unchanged_output_content_stops_the_rerun(workspace):
+    service, stages, paths, runs, _ = workspace
+    service.run(stages)
+
+    # rewritten with the same content: the hash, not the mtime, is compared
+    paths["source"].write_text("abc")
+    assert set(statuses(service.run(stages)).values()) == {"cached"}
+
+    paths["doubled"].write_text("changed by hand")
+    assert statuses(service.run(stages))["double"] == "ran"
+    assert runs["train"] == 1
+
+def test_changed_params_rerun_the_stage(workspace):
+    service, stages, paths, _, _ = workspace
+    service.run(stages)
+
+    stages[0].params = {"factor": 3}
+
+    assert statuses(service.run(stages))["double"] == "ran"
+    assert paths["doubled"].read_text() == "abc" * 3
+
+def test_moving_the_pointer_does_not_retrain(workspace):
+    service, stages, _, runs, registry = workspace
+    trained = service.run(stages)["train"]["result"]
+
+    # the operator serves another version: evaluate follows it, train keeps its cache
+    other = registry.publish("model", {"data": "picked by hand"}, make_current=False)
+    registry.set_current("model", other["version"])
+    results = service.run(stages)
+
+    assert statuses(results) == {"double": "cached", "train": "cached", "evaluate": "ran"}
+    assert results["evaluate"]["result"] == other["version"]
+    assert registry.current("model")["version"] == other["version"]
+
+    # rewriting the pointer with the same version changes nothing
+    registry.set_current("model", other["version"])
+    assert statuses(service.run(stages))["evaluate"] == "cached"
+
+    # train reruns once the version it published is gone
+    for path in registry.version_paths("model", trained).values():
+        os.remove(path)
+    assert statuses(service.run(stages))["train"] == "ran"
+    assert runs["train"] == 2
+
+def test_targets_run_only_their_ancestors(workspace):
+    service, stages, _, runs, _ = workspace
+
+    assert set(service.run(stages, targets=["train"])) == {"double", "train"}
+    assert runs["evaluate"] == 0
+
+def test_cycles_and_duplicate_outputs_are_rejected(tmp_path):
+    service = PipelineService(manifest_path=str(tmp_path / "pipeline.manifest.json"))
+    a, b = tmp_path / "a", tmp_path / "b"
+
+    with pytest.raises(ValueError):
+        service.plan([Stage("x", None, [a], [b]), Stage("y", None, [b], [a])])
+
+    with pytest.raises(ValueError):
+        service.plan([Stage("x", None, [], [a]), Stage("y", None, [], [a])])
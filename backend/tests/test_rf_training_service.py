@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+import src.services.RFTrainingService as rf
+from src.services.ModelRegistryService import ModelRegistryService
+from src.services.RFTrainingService import RFTrainingService
+
+EMOTIONS = np.array(["angry", "calm", "happy"])
+BASE_TREES = 8
+
+def labeled(rows: int, seed: int) -> tuple:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 6))
+    return X, EMOTIONS[(X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5).astype(int)]
+
+@pytest.fixture
+def service(tmp_path, monkeypatch) -> RFTrainingService:
+    """
+    A full RF published in a tmp registry; the train/test/batch features are
+    served from memory instead of the datasets and the feature cache.
+    """
+    monkeypatch.setattr(rf, "RF_INCREMENTAL_REPORT_PATH", str(tmp_path / "incremental.json"))
+
+    X_train, y_train = labeled(400, seed=0)
+    X_test, y_test = labeled(200, seed=1)
+    pipeline = Pipeline([
+        ("features", FunctionTransformer()),
+        ("clf", RandomForestClassifier(n_estimators=BASE_TREES, random_state=0))
+    ]).fit(X_train, y_train)
+
+    service = RFTrainingService()
+    service.registry = ModelRegistryService(tmp_path / "models")
+    service.registry.publish(rf.RF_FULL_MODEL_NAME, pipeline)
+
+    service.replayed = []
+
+    def train_features(pipeline, sample=None, random_state=42):
+        service.replayed.append(sample)
+        rows = slice(None) if sample is None else slice(sample)
+        return X_train[rows], y_train[rows], np.ones(len(y_train[rows]))
+
+    def batch_features(pipeline, batch):
+        X, y = labeled(60, seed=int(batch.split("-")[1]))
+        return X, y, np.ones(len(y))
+
+    monkeypatch.setattr(service, "train_features", train_features)
+    monkeypatch.setattr(service, "batch_features", batch_features)
+    monkeypatch.setattr(service, "test_features", lambda pipeline: (X_test, y_test))
+    monkeypatch.setattr(service, "export_serving_engines", lambda version=None: {})
+
+    return service
+
+def thresholds(forest) -> list:
+    return [tree.tree_.threshold.tolist() for tree in forest.estimators_]
+
+def test_update_adds_trees_to_the_current_forest(service):
+    base, base_version = service.registry.load(rf.RF_FULL_MODEL_NAME)
+
+    report = service.update_full_model("batch-7", n_trees=4, replay_rows=50)
+    updated, version = service.registry.load(rf.RF_FULL_MODEL_NAME)
+    forest = updated.steps[-1][1]
+
+    assert version == report["model_version"] != base_version
+    assert report["n_estimators"] == len(forest.estimators_) == BASE_TREES + 4
+    assert forest.n_estimators == BASE_TREES + 4 and not forest.warm_start
+    # the base trees are kept as they were, the new ones follow them
+    assert thresholds(forest)[:BASE_TREES] == thresholds(base.steps[-1][1])
+
+    # only the replayed rows were featurized
+    assert service.replayed == [50]
+    assert report["replay_samples"] == 50 and report["batch_samples"] == 60
+    assert report["featurize_seconds"] >= 0 and report["fit_seconds"] >= 0
+
+    metadata = service.registry.metadata(rf.RF_FULL_MODEL_NAME, version)
+    assert metadata["incremental"]["base_version"] == base_version
+    assert metadata["incremental"]["batches"] == ["batch-7"]
+
+    # the previous version is untouched
+    previous, _ = service.registry.load(rf.RF_FULL_MODEL_NAME, base_version)
+    assert len(previous.steps[-1][1].estimators_) == BASE_TREES
+
+def test_updates_chain_and_drop_the_oldest_trees(service):
+    base = service.registry.load(rf.RF_FULL_MODEL_NAME)[0].steps[-1][1]
+
+    service.update_full_model("batch-7", n_trees=4, replay_rows=50)
+    report = service.update_full_model("batch-8", n_trees=4, replay_rows=50, max_estimators=10)
+    updated, version = service.registry.load(rf.RF_FULL_MODEL_NAME)
+    forest = updated.steps[-1][1]
+
+    assert report["n_estimators"] == len(forest.estimators_) == 10
+    # 8 base + 4 + 4 trees, the 6 oldest base trees dropped
+    assert thresholds(forest)[:2] == thresholds(base)[-2:]
+    assert service.registry.metadata(rf.RF_FULL_MODEL_NAME, version)["incremental"]["batches"] == ["batch-7", "batch-8"]
+
+def test_compare_full_retrains_on_every_applied_batch(service):
+    service.update_full_model("batch-7", n_trees=4, replay_rows=50)
+    report = service.update_full_model("batch-8", n_trees=4, replay_rows=50, compare_full=True)
+
+    assert service.replayed == [50, 50, None]
+    assert 0 <= report["agreement_with_full"] <= 1
+    assert report["accuracy_drift"] == pytest.approx(report["incremental_accuracy"] - report["full_accuracy"])
+
+def test_new_emotions_need_a_full_retrain(service, monkeypatch):
+    monkeypatch.setattr(service, "batch_features", lambda pipeline, batch: (np.zeros((2, 6)), np.array(["sad", "sad"]), np.ones(2)))
+
+    with pytest.raises(ValueError):
+        service.update_full_model("batch-9", n_trees=4, replay_rows=50)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from src.utils.TokenUtil import TOKEN_PATTERN, TokenNgramVectorizer
+from src.utils.HashingUtil import HashedNgramVectorizer
+from src.utils.TimelineUtil import sliding_ngram_counts
+
+SUFFIX = " | minor | D"
+
+VECTORIZERS = {
+    "token": lambda: TokenNgramVectorizer(ngram_range=(1, 5), max_features=3000),
+    "count": lambda: CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False, ngram_range=(1, 5), max_features=3000),
+    "hashed": lambda: HashedNgramVectorizer(ngram_range=(1, 5), n_features=4096),
+    "hashed-pruned": lambda: HashedNgramVectorizer(ngram_range=(1, 5), max_features=3000, min_count=2, sketch_width=4096),
+    "token-bigrams": lambda: TokenNgramVectorizer(ngram_range=(2, 3))
+}
+
+@pytest.fixture(scope="module", params=list(VECTORIZERS))
+def vectorizer(request, corpus):
+    return VECTORIZERS[request.param]().fit(corpus(300, seed=1, min_chords=3, max_chords=20, tonics=("C", "D", "E")))
+
+@pytest.mark.parametrize("size, step", [(4, 1), (8, 3), (5, 7), (50, 2), (1, 1), (23, 1)])
+def test_counts_match_transform_of_every_window(vectorizer, forte, size, step):
+    rng = np.random.default_rng(size * 31 + step)
+    # includes a chord the vectorizer never saw
+    chords = list(rng.choice(forte + ["9-9X"], size=23))
+
+    counts, windows = sliding_ngram_counts(vectorizer, ",".join(chords), SUFFIX, size, step)
+    expected = vectorizer.transform([",".join(chords[start:end]) + SUFFIX for start, end in windows])
+
+    assert counts.shape == expected.shape
+    assert (counts != expected).nnz == 0
+
+def test_windows_cover_the_sequence_end(vectorizer, forte):
+    chords = forte * 3
+
+    _, windows = sliding_ngram_counts(vectorizer, ",".join(chords), SUFFIX, 8, 5)
+
+    assert windows[0] == (0, 8)
+    assert windows[-1] == (len(chords) - 8, len(chords))
+    assert all(end - start == 8 for start, end in windows)
+
+def test_invalid_window_is_rejected(vectorizer, forte):
+    with pytest.raises(ValueError):
+        sliding_ngram_counts(vectorizer, ",".join(forte), SUFFIX, 0, 1)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from src.utils.TokenUtil import TOKEN_PATTERN, TokenNgramVectorizer, TokenSequences, Vocabulary
+
+def count_vectorizer(**params) -> CountVectorizer:
+    return CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False, **params)
+
+def by_name(vectorizer, matrix) -> dict:
+    # columns keyed by n-gram, CountVectorizer orders them alphabetically
+    dense = matrix.toarray()
+    return {name: dense[:, i] for i, name in enumerate(vectorizer.get_feature_names_out())}
+
+@pytest.mark.parametrize("ngram_range", [(1, 1), (1, 3), (2, 5)])
+def test_counts_match_count_vectorizer(ngram_range, corpus):
+    train, test = corpus(300, seed=1), corpus(50, seed=2) + ["9-9 | major | C", ""]
+
+    token = TokenNgramVectorizer(ngram_range=ngram_range).fit(train)
+    count = count_vectorizer(ngram_range=ngram_range).fit(train)
+
+    expected = by_name(count, count.transform(test))
+    actual = by_name(token, token.transform(test))
+
+    assert actual.keys() == expected.keys()
+    for name, column in expected.items():
+        np.testing.assert_array_equal(actual[name], column, err_msg=name)
+
+def test_max_features_differs_only_among_ties_at_the_cut(corpus):
+    train = corpus(300, seed=3)
+    max_features = 40
+
+    token = TokenNgramVectorizer(ngram_range=(1, 3), max_features=max_features).fit(train)
+    count = count_vectorizer(ngram_range=(1, 3), max_features=max_features).fit(train)
+    every = count_vectorizer(ngram_range=(1, 3))
+    totals = {name: int(column.sum()) for name, column in by_name(every, every.fit_transform(train)).items()}
+
+    token_names = set(token.get_feature_names_out())
+    count_names = set(count.get_feature_names_out())
+    cut = sorted(totals.values(), reverse=True)[max_features - 1]
+
+    assert len(token_names) == len(count_names) == max_features
+    # everything above the cut is kept by both, the rest is tied at it
+    assert {n for n in token_names | count_names if totals[n] > cut} <= token_names & count_names
+    assert all(totals[n] == cut for n in token_names ^ count_names)
+
+def test_token_sequences_match_strings(corpus):
+    train = corpus(200, seed=4)
+    vectorizer = TokenNgramVectorizer(ngram_range=(1, 4)).fit(train)
+    vocabulary = vectorizer.token_vocabulary_
+
+    sequences = TokenSequences.from_arrays([vocabulary.encode_text(x) for x in train], vocabulary)
+
+    assert (vectorizer.transform(sequences) != vectorizer.transform(train)).nnz == 0
+
+def test_token_sequences_of_another_vocabulary_are_remapped(corpus):
+    train = corpus(200, seed=5)
+    vectorizer = TokenNgramVectorizer(ngram_range=(1, 3)).fit(train)
+
+    # same tokens, other ids, plus one the model never saw
+    other = Vocabulary(["unseen", *reversed(vectorizer.token_vocabulary_.tokens[1:])])
+    sequences = TokenSequences.from_arrays([other.encode_text(x + " unseen") for x in train], other)
+
+    assert (vectorizer.transform(sequences) != vectorizer.transform(train)).nnz == 0
+
+def test_token_sequences_of_an_extended_vocabulary_are_used_as_is(corpus):
+    train = corpus(200, seed=6)
+    vectorizer = TokenNgramVectorizer(ngram_range=(1, 3)).fit(train)
+
+    extended = Vocabulary([*vectorizer.token_vocabulary_.tokens[1:], "added-later"])
+    sequences = TokenSequences.from_arrays([extended.encode_text(x + " added-later") for x in train], extended)
+
+    assert (vectorizer.transform(sequences) != vectorizer.transform(train)).nnz == 0
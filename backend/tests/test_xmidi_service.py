@@ -0,0 +1,111 @@
+import os
+import pandas as pd
+import pytest
+import src.services.XMIDIService as xmidi
+import src.utils.MidiUtil as midi_util
+from src.services.XMIDIService import XMIDIService
+
+C_MAJOR, A_MINOR, G_MAJOR = [60, 64, 67], [57, 60, 64], [55, 59, 62]
+# in processing (name) order
+FILES = ["XMIDI_angry_jazz_AAAA0001.midi", "XMIDI_happy_pop_AAAA0002.midi", "XMIDI_sad_rock_AAAA0003.midi"]
+
+class Interrupted(Exception):
+    pass
+
+@pytest.fixture(scope="session")
+def forte_table(tmp_path_factory):
+    # built with music21 over every pitch-class set (about a minute), once
+    # per session unless the app already cached it
+    default_path = midi_util.FORTE_TABLE_PATH
+    if not os.path.exists(default_path):
+        midi_util.FORTE_TABLE_PATH = str(tmp_path_factory.mktemp("forte") / "forte_tn_table.json")
+
+    yield midi_util.forte_class_table()
+    midi_util.FORTE_TABLE_PATH = default_path
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch, write_midi, forte_table):
+    out = tmp_path / "dataset"
+    monkeypatch.setattr(xmidi, "DATASET_RAW_PATH", str(out / "raw.csv"))
+    monkeypatch.setattr(xmidi, "DATASET_PARTS_DIR", str(out / "parts"))
+    monkeypatch.setattr(xmidi, "DATASET_MANIFEST_PATH", str(out / "parts" / "manifest.json"))
+    monkeypatch.setattr(xmidi, "DATASET_FILES_MANIFEST_PATH", str(out / "raw.manifest.json"))
+
+    source = tmp_path / "midi"
+    source.mkdir()
+    for fname in FILES:
+        write_midi(source / fname, [C_MAJOR, A_MINOR, G_MAJOR])
+
+    # __init__ builds the default dataset when it is missing
+    return XMIDIService.__new__(XMIDIService), source
+
+def build(service, source, **options) -> pd.DataFrame:
+    service.build_dataset(str(source), workers=1, checkpoint_every=1, **options)
+    return pd.read_csv(xmidi.DATASET_RAW_PATH)
+
+def interrupt_after(monkeypatch, checkpoints: int):
+    """
+    Makes the next build stop right after its n-th checkpoint, as a killed
+    build would.
+    """
+    write_checkpoint = XMIDIService.write_checkpoint
+    written = []
+
+    def checkpoint_then_stop(self, *args):
+        write_checkpoint(self, *args)
+        written.append(1)
+        if len(written) == checkpoints:
+            monkeypatch.setattr(XMIDIService, "write_checkpoint", write_checkpoint)
+            raise Interrupted()
+
+    monkeypatch.setattr(XMIDIService, "write_checkpoint", checkpoint_then_stop)
+
+def test_resume_keeps_each_file_once(workspace, monkeypatch):
+    service, source = workspace
+
+    interrupt_after(monkeypatch, 2)
+    with pytest.raises(Interrupted):
+        build(service, source, overwrite=True)
+
+    df = build(service, source, overwrite=True)
+
+    assert sorted(df["file"]) == sorted(FILES)
+
+def test_incremental_build_discards_a_partial_full_rebuild(workspace, monkeypatch):
+    service, source = workspace
+    build(service, source, overwrite=True)
+
+    # a full rebuild stopped after two files, its parts stay on disk
+    interrupt_after(monkeypatch, 2)
+    with pytest.raises(Interrupted):
+        build(service, source, overwrite=True)
+
+    df = build(service, source, incremental=True)
+
+    assert sorted(df["file"]) == sorted(FILES)
+
+def test_resume_reprocesses_files_edited_after_their_checkpoint(workspace, monkeypatch, write_midi):
+    service, source = workspace
+
+    interrupt_after(monkeypatch, 1)
+    with pytest.raises(Interrupted):
+        build(service, source, overwrite=True)
+
+    write_midi(source / FILES[0], [C_MAJOR, A_MINOR, G_MAJOR, C_MAJOR, A_MINOR])
+    df = build(service, source, overwrite=True)
+
+    assert sorted(df["file"]) == sorted(FILES)
+    assert df.loc[df["file"] == FILES[0], "num_chords"].item() == 5
+
+def test_incremental_build_replaces_changed_and_deleted_files(workspace, write_midi):
+    service, source = workspace
+    build(service, source, overwrite=True)
+
+    os.remove(source / FILES[1])
+    write_midi(source / FILES[2], [G_MAJOR, C_MAJOR])
+    write_midi(source / "XMIDI_warm_folk_AAAA0004.midi", [A_MINOR, C_MAJOR])
+    df = build(service, source, incremental=True)
+
+    assert sorted(df["file"]) == sorted([FILES[0], FILES[2], "XMIDI_warm_folk_AAAA0004.midi"])
+    assert df.loc[df["file"] == FILES[2], "num_chords"].item() == 2
+    assert not os.path.exists(xmidi.DATASET_PARTS_DIR)